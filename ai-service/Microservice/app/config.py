@@ -6,6 +6,84 @@ class Settings(BaseSettings):
     app_name: str = "Report Agent AI Service"
     debug: bool = True
     
+    # Parse önbelleği (bellek LRU + opsiyonel Parquet disk katmanı)
+    parse_cache_max_bytes: int = 512 * 1024 * 1024
+    parse_cache_dir: str = ""
+    parse_cache_disk_max_bytes: int = 5 * 1024 * 1024 * 1024
+    
+    # Analiz sonucu önbelleği (dosya parmak izi + analyzer sürümü)
+    analysis_cache_max_entries: int = 256
+    analysis_cache_ttl_seconds: int = 6 * 60 * 60
+    
+    # /ask cevap önbelleği: dosya parmak izi + normalize soru; benzerlik eşiği 1 ise yalnızca birebir eşleşme
+    # (varsayılan). Bulanık eşleşme (ör. 0.85) sayıları ve yön sözcükleri farklı soruları eşleştirmez
+    answer_cache_max_entries: int = 2048
+    answer_cache_ttl_seconds: int = 60 * 60
+    answer_cache_similarity: float = 1.0
+    
+    # /ask bağlamı: rapor başına yerel BM25 parça indeksi, LLM'e yalnızca ilgili parçalar bütçe içinde gider
+    ask_context_tokens: int = 1500
+    ask_top_k: int = 8
+    ask_index_cache_entries: int = 64
+    ask_index_max_rows: int = 20000  # tablo satırlarından en fazla bu kadarı indekslenir
+    
+    # Parse/analiz işleri için sınırlı çalışan havuzu
+    worker_count: int = max(2, os.cpu_count() or 2)
+    worker_queue_depth: int = 32
+    worker_use_processes: bool = False  # True ise dosya parse işlemi ayrı süreçlerde yapılır
+    
+    # /analyze/batch: aynı anda analiz edilen dosya sayısı (0 = worker_count) ve istek başına dosya sınırı
+    batch_concurrency: int = 0
+    batch_max_items: int = 500
+    
+    # Asenkron analiz işleri: job_store_path boşsa kayıt bellekte tutulur (yeniden başlatmada kaybolur)
+    job_store_path: str = ""
+    job_workers: int = 2
+    job_max_queued: int = 1000
+    job_retention_seconds: int = 7 * 24 * 60 * 60
+    
+    # Bu boyutun üzerindeki CSV'ler parça parça okunur, istatistikler artımlı hesaplanır
+    csv_stream_threshold_bytes: int = 256 * 1024 * 1024
+    csv_chunk_rows: int = 200000
+    stream_sample_rows: int = 10000
+    # Artımlı CSV: dizin verilirse bu boyutun üzerindeki CSV'ler için kontrol noktası tutulur;
+    # aynı yoldaki dosyaya satır eklendiğinde yalnızca yeni satırlar okunur
+    csv_checkpoint_dir: str = ""
+    csv_incremental_min_bytes: int = 64 * 1024 * 1024
+    
+    # Hızlı analiz modu (mode="fast"): CSV'den katmanlı, Excel'den rezervuar örneklemi
+    fast_sample_rows: int = 100000
+    fast_cluster_rows: int = 32  # CSV'de her katmandan okunan ardışık satır sayısı
+    
+    # Excel: sheet başına satır sınırı (0 = sınırsız), 'head' ilk N satırı, 'sample' rastgele N satırı alır
+    excel_row_limit: int = 0
+    excel_row_limit_mode: str = "head"
+    excel_sheet_workers: int = 1  # >1 ise sheet'ler paralel DataFrame'e dönüştürülür
+    
+    # PDF: sayfa grupları süreç havuzunda işlenir; pdf_max_pages 0 ise tüm sayfalar okunur
+    pdf_workers: int = min(4, os.cpu_count() or 1)
+    pdf_pages_per_task: int = 32
+    pdf_parallel_min_pages: int = 64
+    pdf_max_pages: int = 0
+    
+    # True ise /analyze ve /ask yanıtlarına aşama süreleri Server-Timing başlığı olarak eklenir
+    # (kapalıyken istemci "X-Stage-Timing: 1" başlığıyla isteyebilir)
+    stage_timing_headers: bool = False
+    
+    # LLM istemcisi: tüm servisler tek bağlantı havuzunu paylaşır; eşzamanlılık ve istek/dakika sınırlıdır.
+    # llm_enabled kapalıyken (veya anahtar yokken) veri tabanlı yanıtlar kullanılır.
+    llm_enabled: bool = False
+    llm_model: str = "gpt-3.5-turbo"
+    llm_max_concurrency: int = 4
+    llm_requests_per_minute: int = 60
+    llm_burst: int = 10
+    llm_timeout_seconds: float = 30.0
+    llm_max_retries: int = 3
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 20.0
+    llm_acquire_timeout_seconds: float = 10.0  # slot/jeton için en fazla bekleme, aşılırsa veri tabanlı yanıt
+    llm_max_connections: int = 20
+    
     class Config:
         env_file = ".env"
 
@@ -1,15 +1,30 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
+import asyncio
 import os
-import json
 from datetime import datetime
 
-from app.services.file_processor import FileProcessor
-from app.services.ai_analyzer import AIAnalyzer
-from app.services.openai_service import OpenAIService
-from app.models.schemas import AnalysisRequest, QuestionRequest, AnalysisResponse
+from app.services.file_processor import FileProcessor, process_file_task, init_parse_worker
+from app.services.ai_analyzer import AIAnalyzer, ANALYZER_VERSION
+from app.services.openai_service import OpenAIService, ANSWER_UNAVAILABLE_MESSAGE
+from app.services.llm_client import LLMClient
+from app.services.parse_cache import ParseCache
+from app.services.result_store import AnalysisResultStore
+from app.services.answer_cache import AnswerCache
+from app.services.chunk_index import ChunkIndex, CHUNK_INDEX_VERSION
+from app.services.worker_pool import WorkerPool, PoolSaturatedError
+from app.services.job_store import JobStore, COMPLETED
+from app.services.job_queue import JobQueue, JobQueueFullError
+from app.services.sse import sse_event, SSE_MEDIA_TYPE, SSE_HEADERS
+from app.services.analysis_records import build_response
+from app.services.fast_json import FastJSONResponse, dumps
+from app.services.metrics import registry, stage, record_input, start_request, finish_request
+from app.models.schemas import (
+    AnalysisRequest, BatchAnalysisRequest, AnalysisJobRequest, JobStatusModel, QuestionRequest, AnalysisResponse
+)
 from app.config import settings
 
 app = FastAPI(
@@ -28,9 +43,167 @@ app.add_middleware(
 )
 
 # Service instances
+worker_pool = WorkerPool(
+    max_workers=settings.worker_count,
+    queue_depth=settings.worker_queue_depth,
+    use_processes=settings.worker_use_processes,
+    process_initializer=init_parse_worker
+)
 file_processor = FileProcessor()
-ai_analyzer = AIAnalyzer()
-openai_service = OpenAIService()
+# Tek LLM istemcisi: bağlantı havuzu, eşzamanlılık ve istek/dakika sınırı tüm uç noktalarda ortak
+llm_client = LLMClient.from_settings()
+openai_service = OpenAIService(worker_pool, llm_client)
+ai_analyzer = AIAnalyzer(worker_pool, openai_service)
+parse_cache = ParseCache(
+    max_bytes=settings.parse_cache_max_bytes,
+    disk_dir=settings.parse_cache_dir,
+    disk_max_bytes=settings.parse_cache_disk_max_bytes
+)
+result_store = AnalysisResultStore(
+    max_entries=settings.analysis_cache_max_entries,
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+    version=ANALYZER_VERSION
+)
+# Cevaplar LLM modeline bağlı; LLM kapalıyken veri tabanlı cevaplar ayrı kapsamda tutulur
+answer_cache = AnswerCache(
+    max_entries=settings.answer_cache_max_entries,
+    ttl_seconds=settings.answer_cache_ttl_seconds,
+    similarity_threshold=settings.answer_cache_similarity,
+    version=f"{ANALYZER_VERSION}:{llm_client.model if llm_client.enabled else 'local'}"
+)
+# /ask için rapor başına parça indeksi (aynı parmak izi + parse seçenekleri)
+chunk_index_store = AnalysisResultStore(
+    max_entries=settings.ask_index_cache_entries,
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+    version=CHUNK_INDEX_VERSION
+)
+
+# Aşama ölçümleri toplanan uç noktalar
+INSTRUMENTED_PATHS = {"/analyze", "/ask"}
+
+def load_file(file_path: str, file_type: str = None, options: Dict[str, Any] = None):
+    """Dosyayı önbellekten getir, yoksa parse et (çalışan havuzu thread'inde çağrılır)"""
+    def parse():
+        with stage("parse"):
+            file_data = worker_pool.run_isolated(process_file_task, file_path, file_type, options)
+        record_input(file_data, file_path)
+        return file_data
+    
+    with stage("load"):
+        return parse_cache.get_or_load(file_path, parse, options=file_processor.cache_options(options))
+
+def load_chunk_index(file_path: str, file_data: Dict[str, Any], options: Dict[str, Any] = None) -> ChunkIndex:
+    """Raporun parça indeksini önbellekten getir, yoksa kur (çalışan havuzu thread'inde çağrılır)"""
+    key = chunk_index_store.key_for(file_path, file_processor.cache_options(options))
+    index = chunk_index_store.get(key)
+    if index is None:
+        with stage("index"):
+            index = ChunkIndex.from_file_data(file_data, max_rows=settings.ask_index_max_rows)
+        chunk_index_store.put(key, index)
+    return index
+
+async def load_question_inputs(file_path: str, parse_options: Dict[str, Any] = None):
+    """Soru-cevap için parse edilmiş dosya ve (LLM açıksa) parça indeksi"""
+    # Dosyayı işle (aynı dosyaya gelen takip soruları önbellekten karşılanır)
+    file_data = await worker_pool.run(load_file, file_path, None, parse_options)
+    
+    # LLM'e tüm rapor yerine soruyla ilgili parçalar gider
+    index = None
+    if file_data and openai_service.llm_enabled:
+        index = await worker_pool.run(load_chunk_index, file_path, file_data, parse_options)
+    return file_data, index
+
+# Çalışan havuzu doluysa iş beklemeye alınır ve tekrar denenir (HTTP isteğinin aksine 503 dönülmez)
+JOB_SATURATED_RETRY_SECONDS = 1.0
+
+async def result_key_when_free(request: AnalysisRequest, parse_options: Dict[str, Any] = None) -> Optional[str]:
+    """Sonuç anahtarı; parmak izi ilk çağrıda dosyanın tamamını hash'ler, bu yüzden havuzda hesaplanır (havuz doluysa tekrar denenir)"""
+    while True:
+        try:
+            return await worker_pool.run(result_store.key_for, request.file_path, file_processor.cache_options(parse_options))
+        except PoolSaturatedError:
+            await asyncio.sleep(JOB_SATURATED_RETRY_SECONDS)
+
+async def analyze_when_free(request: AnalysisRequest, report_stage: Callable[[str], None] = None) -> Dict[str, Any]:
+    """Kuyruk ve toplu analiz için tek dosya analizi; havuz doluysa bekleyip tekrar dener"""
+    parse_options = file_processor.parse_options(request.file_path, request.page_range, request.max_pages, request.mode)
+    result_key = await result_key_when_free(request, parse_options)
+    return await analyze_keyed(request, parse_options, result_key, report_stage)
+
+async def analyze_keyed(request: AnalysisRequest, parse_options: Optional[Dict[str, Any]], result_key: Optional[str],
+                        report_stage: Callable[[str], None] = None) -> Dict[str, Any]:
+    """Anahtarı hesaplanmış tek dosya analizi (önbellekte varsa oradan)"""
+    if not request.force:
+        cached_result = result_store.get(result_key)
+        if cached_result is not None:
+            return cached_result
+    
+    while True:
+        try:
+            file_data = await worker_pool.run(load_file, request.file_path, request.file_type, parse_options)
+            if report_stage:
+                report_stage("parse")
+            if not file_data:
+                raise HTTPException(status_code=400, detail="File could not be processed")
+            
+            results = {}
+            async for name, payload in ai_analyzer.analyze_stages(file_data):
+                results[name] = payload
+                if report_stage:
+                    report_stage(name)
+            break
+        except PoolSaturatedError:
+            await asyncio.sleep(JOB_SATURATED_RETRY_SECONDS)
+    
+    analysis_result = build_response(results)
+    result_store.put(result_key, analysis_result)
+    return analysis_result
+
+async def run_analysis_job(request_data: Dict[str, Any], report_stage: Callable[[str], None]) -> Dict[str, Any]:
+    """Kuyruktaki bir analiz işini çalıştır; aşamalar bittikçe ilerleme bildirilir"""
+    return await analyze_when_free(AnalysisRequest(**request_data), report_stage)
+
+job_store = JobStore(settings.job_store_path)
+job_queue = JobQueue(
+    job_store,
+    run_analysis_job,
+    workers=settings.job_workers,
+    max_queued=settings.job_max_queued,
+    retention_seconds=settings.job_retention_seconds
+)
+
+def job_status(job: Dict[str, Any]) -> JobStatusModel:
+    return JobStatusModel(job_id=job['id'], **{key: job[key] for key in JobStatusModel.model_fields if key in job})
+
+@app.on_event("startup")
+async def start_jobs():
+    worker_pool.warm_up()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await job_queue.stop()
+    job_store.close()
+    worker_pool.shutdown()
+    await llm_client.close()
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """İstek süresi, aşama dökümü ve tepe bellek ölçümü"""
+    if request.url.path not in INSTRUMENTED_PATHS:
+        return await call_next(request)
+    
+    trace, token = start_request(request.url.path)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        finish_request(trace, token, status_code)
+    
+    if settings.stage_timing_headers or request.headers.get("x-stage-timing") == "1":
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
 
 @app.get("/")
 async def root():
@@ -42,17 +215,30 @@ async def analyze_report(request: AnalysisRequest):
     Raporu analiz et ve özet, KPI, trend ve action items çıkar
     """
     try:
+        parse_options = file_processor.parse_options(request.file_path, request.page_range, request.max_pages, request.mode)
+        
+        # Aynı dosya daha önce analiz edildiyse sonucu tekrar hesaplama (anahtar havuzda hesaplanır: içerik hash'i)
+        result_key = await worker_pool.run(result_store.key_for, request.file_path, file_processor.cache_options(parse_options))
+        if not request.force:
+            cached_result = result_store.get(result_key)
+            if cached_result is not None:
+                return FastJSONResponse(cached_result)
+        
         # Dosyayı işle ve veriyi çıkar
-        file_data = file_processor.process_file(request.file_path, request.file_type)
+        file_data = await worker_pool.run(load_file, request.file_path, request.file_type, parse_options)
         
         if not file_data:
             raise HTTPException(status_code=400, detail="File could not be processed")
         
         # AI analizi yap
         analysis_result = await ai_analyzer.analyze_data(file_data)
+        result_store.put(result_key, analysis_result)
         
-        return analysis_result
+        # Sonuç analiz kodundan geldiği için response_model doğrulaması yapılmadan yazılır
+        return FastJSONResponse(analysis_result)
         
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"Service busy: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
@@ -62,17 +248,231 @@ async def ask_question(request: QuestionRequest):
     Rapor hakkında doğal dilde soru sor
     """
     try:
-        # Dosyayı işle
-        file_data = file_processor.process_file(request.file_path)
+        parse_options = file_processor.parse_options(request.file_path, request.page_range, request.max_pages)
+        
+        # Aynı dosyaya daha önce sorulmuş (veya çok benzer) soru varsa cevabı tekrar üretme
+        answer_scope = await worker_pool.run(answer_cache.scope_for, request.file_path, file_processor.cache_options(parse_options))
+        if not request.force:
+            cached_answer = answer_cache.get(answer_scope, request.question)
+            if cached_answer is not None:
+                return {"answer": cached_answer}
+        
+        file_data, index = await load_question_inputs(request.file_path, parse_options)
         
         # OpenAI ile soru-cevap
-        answer = await openai_service.ask_question(file_data, request.question)
+        with stage("answer"):
+            answer = await openai_service.ask_question(file_data, request.question, index=index)
+        
+        if answer != ANSWER_UNAVAILABLE_MESSAGE:
+            answer_cache.put(answer_scope, request.question, answer)
         
         return {"answer": answer}
         
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"Service busy: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Question answering failed: {str(e)}")
 
+@app.post("/analyze/stream")
+async def analyze_report_stream(request: AnalysisRequest):
+    """
+    /analyze'ın Server-Sent Events hali: kpis, trends, action_items ve summary olayları
+    hazır oldukça gönderilir; son olarak 'done' tam sonucu taşır, hata 'error' olayıdır
+    """
+    return StreamingResponse(analysis_events(request), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+async def analysis_events(request: AnalysisRequest):
+    try:
+        parse_options = file_processor.parse_options(request.file_path, request.page_range, request.max_pages, request.mode)
+        
+        result_key = await worker_pool.run(result_store.key_for, request.file_path, file_processor.cache_options(parse_options))
+        if not request.force:
+            cached_result = result_store.get(result_key)
+            if cached_result is not None:
+                for name in ("kpis", "trends", "action_items", "summary"):
+                    yield sse_event(name, cached_result[name])
+                yield sse_event("done", cached_result)
+                return
+        
+        yield sse_event("progress", {"stage": "parse"})
+        file_data = await worker_pool.run(load_file, request.file_path, request.file_type, parse_options)
+        if not file_data:
+            yield sse_event("error", {"status": 400, "detail": "File could not be processed"})
+            return
+        
+        yield sse_event("progress", {"stage": "analysis"})
+        results = {}
+        async for name, payload in ai_analyzer.analyze_stages(file_data):
+            results[name] = payload
+            yield sse_event(name, payload)
+        
+        analysis_result = build_response(results)
+        result_store.put(result_key, analysis_result)
+        yield sse_event("done", analysis_result)
+        
+    except PoolSaturatedError as e:
+        yield sse_event("error", {"status": 503, "detail": f"Service busy: {str(e)}"})
+    except Exception as e:
+        yield sse_event("error", {"status": 500, "detail": f"Analysis failed: {str(e)}"})
+
+# /analyze/batch yanıtı: her satır bir dosyanın sonucu (JSON Lines)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@app.post("/analyze/batch")
+async def analyze_report_batch(request: BatchAnalysisRequest):
+    """
+    Birden çok raporu tek çağrıda analiz et: aynı içerikli dosyalar bir kez analiz edilir,
+    sonuçlar bittikçe satır satır (NDJSON) gönderilir; bir dosyanın hatası diğerlerini durdurmaz
+    """
+    if len(request.items) > settings.batch_max_items:
+        raise HTTPException(status_code=413, detail=f"Batch is limited to {settings.batch_max_items} items")
+    return StreamingResponse(batch_results(request.items), media_type=NDJSON_MEDIA_TYPE)
+
+async def batch_results(items: List[AnalysisRequest]):
+    semaphore = asyncio.Semaphore(settings.batch_concurrency or settings.worker_count)
+    # Aynı parmak izi + parse seçenekleri tek analize bağlanır; sonucu tüm sıralarına yazılır
+    shared: Dict[str, asyncio.Task] = {}
+    
+    async def run_shared(item: AnalysisRequest, parse_options: Optional[Dict[str, Any]], result_key: Optional[str]) -> Dict[str, Any]:
+        async with semaphore:
+            return await analyze_keyed(item, parse_options, result_key)
+    
+    async def analyze_item(index: int, item: AnalysisRequest) -> Dict[str, Any]:
+        parse_options = file_processor.parse_options(item.file_path, item.page_range, item.max_pages, item.mode)
+        # Parmak izi her öğenin kendi görevinde, havuzda hesaplanır; ilk satır tüm dosyaların hash'ini beklemez
+        async with semaphore:
+            result_key = await result_key_when_free(item, parse_options)
+        dedupe_key = f"{result_key}:{item.force}" if result_key is not None else f"unreadable:{index}"
+        task = shared.get(dedupe_key)
+        if task is None:
+            task = shared[dedupe_key] = asyncio.ensure_future(run_shared(item, parse_options, result_key))
+        # Ortak analiz, onu bekleyen öğelerden biri iptal edilince durmasın
+        return await asyncio.shield(task)
+    
+    tasks = {asyncio.ensure_future(analyze_item(index, item)): index for index, item in enumerate(items)}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.get):
+                index = tasks[task]
+                yield batch_line(index, items[index], task)
+    finally:
+        for task in pending:
+            task.cancel()
+        for task in shared.values():
+            task.cancel()
+
+def batch_line(index: int, item: AnalysisRequest, task: asyncio.Task) -> str:
+    line = {"index": index, "file_path": item.file_path}
+    error = task.exception()
+    if error is None:
+        line.update(status=200, result=task.result())
+    elif isinstance(error, HTTPException):
+        line.update(status=error.status_code, error=error.detail)
+    else:
+        line.update(status=500, error=f"Analysis failed: {str(error)}")
+    return dumps(line).decode("utf-8") + "\n"
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    /ask'in Server-Sent Events hali: cevap 'token' olaylarıyla geldikçe gönderilir,
+    'done' tam cevabı taşır, hata 'error' olayıdır
+    """
+    return StreamingResponse(answer_events(request), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+async def answer_events(request: QuestionRequest):
+    try:
+        parse_options = file_processor.parse_options(request.file_path, request.page_range, request.max_pages)
+        
+        answer_scope = await worker_pool.run(answer_cache.scope_for, request.file_path, file_processor.cache_options(parse_options))
+        if not request.force:
+            cached_answer = answer_cache.get(answer_scope, request.question)
+            if cached_answer is not None:
+                yield sse_event("token", {"text": cached_answer})
+                yield sse_event("done", {"answer": cached_answer})
+                return
+        
+        file_data, index = await load_question_inputs(request.file_path, parse_options)
+        
+        parts = []
+        with stage("answer"):
+            async for delta in openai_service.stream_answer(file_data, request.question, index=index):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+        
+        answer = ''.join(parts)
+        if answer != ANSWER_UNAVAILABLE_MESSAGE:
+            answer_cache.put(answer_scope, request.question, answer)
+        yield sse_event("done", {"answer": answer})
+        
+    except PoolSaturatedError as e:
+        yield sse_event("error", {"status": 503, "detail": f"Service busy: {str(e)}"})
+    except Exception as e:
+        yield sse_event("error", {"status": 500, "detail": f"Question answering failed: {str(e)}"})
+
+@app.post("/jobs/analyze", status_code=202, response_model=JobStatusModel)
+async def submit_analysis_job(request: AnalysisJobRequest):
+    """
+    Analizi kuyruğa al ve hemen iş kimliği dön; durum /jobs/{job_id}, sonuç /jobs/{job_id}/result
+    """
+    payload = request.model_dump(exclude={"user_id", "priority"})
+    try:
+        job = job_queue.submit(request.user_id, request.priority, payload)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"Job queue full: {str(e)}")
+    return job_status(job)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusModel)
+async def get_job(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/jobs/{job_id}/result", response_model=AnalysisResponse)
+async def get_job_result(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}" + (f": {job['error']}" if job['error'] else ""))
+    return FastJSONResponse(job['result'])
+
+@app.delete("/jobs/{job_id}", response_model=JobStatusModel)
+async def cancel_job(job_id: str):
+    """Sıradaki ya da çalışan işi iptal et (bitmiş işler değişmeden döner)"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "parse_cache": parse_cache.stats(),
+        "analysis_cache": result_store.stats(),
+        "answer_cache": answer_cache.stats(),
+        "chunk_index_cache": chunk_index_store.stats(),
+        "csv_checkpoints": file_processor.checkpoint_store.stats() if file_processor.checkpoint_store else None,
+        "worker_pool": worker_pool.stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metin biçiminde aşama/istek metrikleri ve önbellek sayaçları"""
+    body = registry.render({
+        "report_agent_parse_cache": parse_cache.stats(),
+        "report_agent_analysis_cache": result_store.stats(),
+        "report_agent_answer_cache": answer_cache.stats(),
+        "report_agent_chunk_index_cache": chunk_index_store.stats(),
+        "report_agent_worker_pool": worker_pool.stats(),
+        "report_agent_llm": llm_client.stats(),
+        "report_agent_jobs": job_queue.stats(),
+    })
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now()}
@@ -1,13 +1,42 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
+from app.services.pdf_extractor import PAGE_RANGE_PATTERN
+
 class AnalysisRequest(BaseModel):
     file_path: str
     file_type: str
+    force: bool = False  # True ise önbellekteki sonuç yok sayılır ve analiz yeniden yapılır
+    page_range: Optional[str] = Field(None, pattern=PAGE_RANGE_PATTERN)  # PDF: "1-20,35", 1 tabanlı
+    max_pages: Optional[int] = Field(None, ge=1)  # PDF: en fazla işlenecek sayfa sayısı
+    mode: str = Field("exact", pattern="^(exact|fast)$")  # fast: CSV/Excel/Parquet/Arrow örneklemden, sonuçlar yaklaşık
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[AnalysisRequest] = Field(..., min_length=1)
+
+class AnalysisJobRequest(AnalysisRequest):
+    user_id: str = "anonymous"  # kullanıcılar arası adil sıralama için
+    priority: int = Field(0, ge=-10, le=10)  # yüksek öncelikli işler önce çalışır
+
+class JobStatusModel(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed, failed, cancelled
+    user_id: str
+    priority: int
+    stage: Optional[str] = None  # en son tamamlanan aşama
+    stages: List[Dict[str, Any]] = []  # tamamlanan aşamalar ve süreleri (saniye)
+    progress: float = 0.0  # yüzde
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 class QuestionRequest(BaseModel):
     file_path: str
     question: str
+    force: bool = False  # True ise önbellekteki cevap yok sayılır
+    page_range: Optional[str] = Field(None, pattern=PAGE_RANGE_PATTERN)
+    max_pages: Optional[int] = Field(None, ge=1)
 
 class KPIModel(BaseModel):
     name: str
@@ -27,8 +56,18 @@ class ActionItemModel(BaseModel):
     priority: str  # High, Medium, Low
     category: str
 
+class SamplingModel(BaseModel):
+    method: str  # stratified (CSV bayt katmanları), reservoir (Excel) veya random (Parquet/Arrow)
+    sample_rows: int
+    estimated_total_rows: int
+    confidence_level: float
+    strata: Optional[int] = None
+
 class AnalysisResponse(BaseModel):
     summary: str
     kpis: List[KPIModel]
     trends: List[TrendModel]
-    action_items: List[ActionItemModel]
\ No newline at end of file
+    action_items: List[ActionItemModel]
+    approximate: bool = False  # True ise sonuçlar örneklemden hesaplandı (mode="fast")
+    sampling: Optional[SamplingModel] = None
+    confidence_intervals: Dict[str, List[float]] = {}  # KPI adı -> [alt, üst]
\ No newline at end of file
@@ -1,52 +1,109 @@
 import pandas as pd
 import numpy as np
+import asyncio
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, Tuple
 from datetime import datetime
-import re
 
-from app.models.schemas import AnalysisResponse, KPIModel, TrendModel, ActionItemModel
+from app.services.analysis_records import KPIRecord, TrendRecord, ActionItemRecord, build_response
 from app.services.openai_service import OpenAIService
+from app.services.analysis_context import AnalysisContext, SampledSheet, CONFIDENCE_LEVEL
+from app.services.column_schema import ENERGY_UNITS
+from app.services.profiling import top_correlations, categorical_profile
+from app.services.text_stats import analyze_pages, iter_page_texts
+from app.services.tabular import TABLE_FILE_TYPES
+from app.services.worker_pool import WorkerPool, PoolSaturatedError, run_blocking
+from app.services.metrics import stage, timed
 
 # Logger'ı ayarla
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Analiz mantığı değiştiğinde artırın - önbellekteki eski sonuçlar geçersiz olur
+ANALYZER_VERSION = "1.1"
+
+# LLM'in döndürebildiği öncelik yazımları -> High/Medium/Low (bilinmeyen ya da boş değer Medium sayılır)
+PRIORITY_ALIASES = {
+    'high': 'High', 'yüksek': 'High', 'critical': 'High', 'kritik': 'High', 'urgent': 'High', 'acil': 'High',
+    'medium': 'Medium', 'orta': 'Medium', 'normal': 'Medium',
+    'low': 'Low', 'düşük': 'Low',
+}
+
+
+def normalize_priority(value: Any) -> str:
+    return PRIORITY_ALIASES.get(str(value or '').strip().lower(), 'Medium')
+
 class AIAnalyzer:
-    def __init__(self):
-        self.openai_service = OpenAIService()
+    def __init__(self, worker_pool: WorkerPool = None, openai_service: OpenAIService = None):
+        # main.py paylaşılan servisi verir; böylece tek LLM bağlantı havuzu ve limit kullanılır
+        self.openai_service = openai_service if openai_service is not None else OpenAIService(worker_pool)
+        self.worker_pool = worker_pool
     
-    async def analyze_data(self, file_data: Dict[str, Any]) -> AnalysisResponse:
+    async def analyze_data(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Dosya verisini analiz et ve yapay zeka ile insights çıkar
+        Dosya verisini analiz et ve yapay zeka ile insights çıkar (AnalysisResponse biçiminde sözlük)
         """
         try:
-            # 1. Temel analiz
-            basic_analysis = self._perform_basic_analysis(file_data)
-            
-            # 2. AI ile gelişmiş analiz
-            ai_insights = await self._perform_ai_analysis(file_data, basic_analysis)
-            
-            # 3. KPI'ları çıkar
-            kpis = self._extract_kpis(file_data, basic_analysis)
-            
-            # 4. Trend'leri belirle
-            trends = self._identify_trends(file_data, basic_analysis)
+            results = {}
+            async for name, payload in self.analyze_stages(file_data):
+                results[name] = payload
             
-            # 5. Action items oluştur
-            action_items = await self._generate_action_items(ai_insights, kpis, trends)
-            
-            return AnalysisResponse(
-                summary=ai_insights.get('summary', 'Analiz tamamlandı.'),
-                kpis=kpis,
-                trends=trends,
-                action_items=action_items
-            )
+            return build_response(results)
             
+        except PoolSaturatedError:
+            raise
         except Exception as e:
             raise Exception(f"AI analysis failed: {e}")
     
-    def _perform_basic_analysis(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_stages(self, file_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Analiz aşamalarını bittikçe (aşama adı, sonuç) olarak verir:
+        'kpis', 'trends', ardından hangisi önce biterse 'summary' / 'action_items'.
+        Veri örneklemden okunduysa KPI'lardan sonra 'approximate', 'sampling' ve 'confidence_intervals' gelir.
+        """
+        # Sheet DataFrame'leri bir kez oluşturulur ve tüm aşamalarda paylaşılır
+        context = AnalysisContext(file_data)
+        
+        # 1. Temel analiz (pandas yoğun aşamalar çalışan havuzunda yürütülür)
+        with stage('basic_analysis'):
+            basic_analysis = await run_blocking(self.worker_pool, self._perform_basic_analysis, file_data, context)
+        
+        # 2. KPI'ları çıkar
+        with stage('kpis'):
+            kpis = await run_blocking(self.worker_pool, self._extract_kpis, context, basic_analysis)
+        yield 'kpis', kpis
+        if context.approximate:
+            yield 'approximate', True
+            sampling = {key: value for key, value in context.sampling.items() if key != 'cluster_sizes'}
+            yield 'sampling', dict(sampling, confidence_level=CONFIDENCE_LEVEL)
+            yield 'confidence_intervals', context.confidence_intervals
+        
+        # 3. Trend'leri belirle
+        with stage('trends'):
+            trends = await run_blocking(self.worker_pool, self._identify_trends, context, basic_analysis)
+        yield 'trends', trends
+        
+        # 4-5. Özet ve action items birbirinden bağımsız - LLM istekleri eşzamanlı gider
+        summary_task = asyncio.ensure_future(timed('ai_summary', self._perform_ai_analysis(file_data, basic_analysis)))
+        actions_task = asyncio.ensure_future(timed('action_items', self._generate_action_items(kpis, trends)))
+        pending = {summary_task: 'summary', actions_task: 'action_items'}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (summary_task, actions_task):
+                    if task not in done or task not in pending:
+                        continue
+                    name = pending.pop(task)
+                    if name == 'summary':
+                        yield name, task.result().get('summary', 'Analiz tamamlandı.')
+                    else:
+                        yield name, task.result()
+        finally:
+            # İstemci akışı erken kapatırsa bekleyen LLM istekleri iptal edilir
+            for task in pending:
+                task.cancel()
+    
+    def _perform_basic_analysis(self, file_data: Dict[str, Any], context: AnalysisContext) -> Dict[str, Any]:
         """Temel istatistiksel analiz"""
         analysis = {
             'file_type': file_data.get('file_type'),
@@ -55,31 +112,21 @@ class AIAnalyzer:
             'patterns': []
         }
         
-        if file_data['file_type'] == 'excel':
-            # Excel dosyası için analiz
-            for sheet_name, sheet_data in file_data['sheets'].items():
-                if 'data' in sheet_data and sheet_data['data']:
-                    df = pd.DataFrame(sheet_data['data'])
-                    analysis['data_overview'][sheet_name] = self._analyze_dataframe(df)
-        
-        elif file_data['file_type'] == 'csv':
-            # CSV dosyası için analiz
-            if 'data' in file_data and file_data['data']:
-                df = pd.DataFrame(file_data['data'])
-                analysis['data_overview']['main'] = self._analyze_dataframe(df)
+        if file_data['file_type'] == 'excel' or file_data['file_type'] in TABLE_FILE_TYPES:
+            # Excel sheet'leri / CSV, Parquet, Arrow, JSON ('main') için analiz
+            for sheet_name, sheet in context.sheets.items():
+                overview = self._analyze_dataframe(sheet.df)
+                # Parça parça okunan dosyalarda boyut/istatistikler örneklemden değil tüm veriden gelir
+                overview.update(sheet.overview_overrides())
+                analysis['data_overview'][sheet_name] = overview
         
         elif file_data['file_type'] == 'pdf':
             # PDF dosyası için metin analizi
-            analysis['text_analysis'] = self._analyze_text(file_data.get('text_content', ''))
+            analysis['text_analysis'] = self._analyze_text(file_data)
             
             # Tablolar varsa analiz et
-            if 'tables' in file_data and file_data['tables']:
-                table_analysis = []
-                for table in file_data['tables']:
-                    if table['data']:
-                        df = pd.DataFrame(table['data'][1:], columns=table['data'][0])  # İlk satır header
-                        table_analysis.append(self._analyze_dataframe(df))
-                analysis['table_analysis'] = table_analysis
+            if context.tables:
+                analysis['table_analysis'] = [self._analyze_dataframe(table.df) for table in context.tables]
         
         return analysis
     
@@ -99,48 +146,28 @@ class AIAnalyzer:
             if numeric_cols:
                 analysis['statistics'] = df[numeric_cols].describe().to_dict()
                 
-                # Korelasyon analizi
+                # Korelasyon analizi - tüm matris yerine en güçlü çiftler
                 if len(numeric_cols) > 1:
-                    correlation = df[numeric_cols].corr()
-                    analysis['correlations'] = correlation.to_dict()
+                    analysis['correlations'] = top_correlations(df, numeric_cols)
             
-            # Kategorik sütunlar için analiz
+            # Kategorik sütunlar için sınırlı profil (farklı değer tahmini + en sık değerler)
             categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
             if categorical_cols:
                 analysis['categorical_summary'] = {}
                 for col in categorical_cols:
-                    analysis['categorical_summary'][col] = df[col].value_counts().to_dict()
+                    analysis['categorical_summary'][col] = categorical_profile(df[col])
             
             return analysis
             
         except Exception as e:
             return {'error': str(e)}
     
-    def _analyze_text(self, text: str) -> Dict[str, Any]:
-        """PDF metni için analiz"""
+    def _analyze_text(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+        """PDF metni için analiz - çıkarım sırasında biriktirilen özet, yoksa sayfa sayfa tek geçiş"""
         try:
-            # Kelime sayısı
-            word_count = len(text.split())
-            
-            # Sayısal değerleri bul
-            numbers = re.findall(r'\d+(?:\.\d+)?', text)
-            numeric_values = [float(n) for n in numbers if n]
-            
-            # Para birimi değerleri
-            currency_pattern = r'[\$€£¥₺]\s*\d+(?:,\d{3})*(?:\.\d{2})?'
-            currency_values = re.findall(currency_pattern, text)
-            
-            # Yüzde değerleri
-            percentage_pattern = r'\d+(?:\.\d+)?%'
-            percentages = re.findall(percentage_pattern, text)
-            
-            return {
-                'word_count': word_count,
-                'numeric_values': numeric_values,
-                'currency_values': currency_values,
-                'percentages': percentages,
-                'has_financial_data': len(currency_values) > 0 or any('revenue' in text.lower() or 'profit' in text.lower() or 'income' in text.lower())
-            }
+            if file_data.get('text_stats'):
+                return file_data['text_stats']
+            return analyze_pages(iter_page_texts(file_data))
             
         except Exception as e:
             return {'error': str(e)}
@@ -151,6 +178,13 @@ class AIAnalyzer:
             # Gerçek veri analizine dayalı özet oluştur
             summary = self._generate_real_summary(file_data, basic_analysis)
             
+            # LLM açıksa yorum özete eklenir; kullanılamazsa veri tabanlı özet yeterli
+            if self.openai_service.llm_enabled:
+                prompt = self._prepare_analysis_prompt(file_data, basic_analysis)
+                llm_summary = await self.openai_service.get_analysis_insights(prompt, fallback=False)
+                if llm_summary:
+                    summary += f"\n\n🤖 **AI Değerlendirmesi**:\n{llm_summary}"
+            
             return {
                 'summary': summary,
                 'ai_generated': True
@@ -259,48 +293,35 @@ class AIAnalyzer:
         
         return prompt
     
-    def _extract_kpis(self, file_data: Dict[str, Any], basic_analysis: Dict[str, Any]) -> List[KPIModel]:
+    def _extract_kpis(self, context: AnalysisContext, basic_analysis: Dict[str, Any]) -> List[KPIRecord]:
         """KPI'ları çıkar - gerçek veriye dayalı"""
         kpis = []
         
         try:
-            logger.info(f"KPI Extraction - file_type: {file_data.get('file_type')}")
+            logger.info(f"KPI Extraction - file_type: {context.file_type}")
             
-            if file_data['file_type'] == 'csv' and 'data' in file_data:
-                # CSV verilerini pandas DataFrame'e çevir
-                df = pd.DataFrame(file_data['data'])
-                logger.info(f"CSV DataFrame shape: {df.shape}")
-                logger.info(f"CSV columns: {list(df.columns)}")
+            if context.file_type in TABLE_FILE_TYPES and context.main is not None:
+                # Paylaşılan sheet (sayısal dönüşümler ve istatistikler bir kez hesaplanır)
+                sheet = context.main
+                logger.debug(f"CSV DataFrame shape: {(sheet.row_count, sheet.column_count)}")
+                logger.debug(f"CSV columns: {list(sheet.df.columns)}")
                 
-                # Numerik sütunları tespit et
-                numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-                logger.info(f"Numeric columns found: {numeric_cols}")
+                # Numerik sütunlar (yoksa sayıya çevrilebilen string sütunlar)
+                numeric_cols = sheet.numeric_columns
                 
-                if not numeric_cols:
-                    # Eğer numerik sütun yoksa, string sütunları numerik'e çevirmeyi dene
-                    for col in df.columns:
-                        if df[col].dtype == 'object':
-                            try:
-                                # Virgülleri nokta yap ve sayıya çevir
-                                df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '.'), errors='coerce')
-                                if not df[col].isna().all():
-                                    numeric_cols.append(col)
-                            except:
-                                continue
+                logger.debug(f"Final numeric columns: {numeric_cols}")
                 
-                logger.info(f"Final numeric columns: {numeric_cols}")
+                # Tüm sayısal sütunların istatistikleri tek seferde (NaN'lar hariç)
+                stats_table = sheet.numeric_summary(numeric_cols).to_dict('index')
                 
                 # KPI'ları oluştur
-                for col in numeric_cols:
-                    # NaN değerleri temizle
-                    clean_data = df[col].dropna()
-                    
-                    if len(clean_data) > 0:
+                for col, stats in stats_table.items():
+                    if stats['count'] > 0:
                         # Ortalama KPI
-                        mean_val = clean_data.mean()
-                        unit = "MWh" if 'mwh' in col.lower() else ""
+                        mean_val = stats['mean']
+                        unit = sheet.schema.unit(col)
                         
-                        kpis.append(KPIModel(
+                        kpis.append(KPIRecord(
                             name=f"{col.replace('_', ' ').title()} Ortalaması",
                             value=round(float(mean_val), 2),
                             unit=unit,
@@ -308,8 +329,8 @@ class AIAnalyzer:
                         ))
                         
                         # Toplam KPI
-                        total_val = clean_data.sum()
-                        kpis.append(KPIModel(
+                        total_val = stats['sum']
+                        kpis.append(KPIRecord(
                             name=f"{col.replace('_', ' ').title()} Toplamı",
                             value=round(float(total_val), 2),
                             unit=unit,
@@ -317,8 +338,8 @@ class AIAnalyzer:
                         ))
                         
                         # En yüksek değer
-                        max_val = clean_data.max()
-                        kpis.append(KPIModel(
+                        max_val = stats['max']
+                        kpis.append(KPIRecord(
                             name=f"{col.replace('_', ' ').title()} Maksimum",
                             value=round(float(max_val), 2),
                             unit=unit,
@@ -326,71 +347,83 @@ class AIAnalyzer:
                         ))
                         
                         # En düşük değer
-                        min_val = clean_data.min()
-                        kpis.append(KPIModel(
+                        min_val = stats['min']
+                        kpis.append(KPIRecord(
                             name=f"{col.replace('_', ' ').title()} Minimum",
                             value=round(float(min_val), 2),
                             unit=unit,
                             category="Minimum"
                         ))
                 
+                # Hızlı modda ortalama/toplam KPI'ları için güven aralıkları
+                if isinstance(sheet, SampledSheet):
+                    for col, stats in stats_table.items():
+                        if stats['count'] > 0:
+                            title = col.replace('_', ' ').title()
+                            context.add_interval(f"{title} Ortalaması", sheet.mean_interval(col))
+                            context.add_interval(f"{title} Toplamı", sheet.sum_interval(col))
+                
                 # Kategorik veriler için KPI'lar
-                categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+                categorical_cols = sheet.categorical_columns
                 if categorical_cols:
                     for col in categorical_cols[:2]:  # İlk 2 kategorik sütun
-                        unique_count = df[col].nunique()
-                        kpis.append(KPIModel(
+                        unique_count, _, _ = sheet.category_profile(col)
+                        kpis.append(KPIRecord(
                             name=f"{col.replace('_', ' ').title()} Çeşit Sayısı",
                             value=float(unique_count),
                             unit="adet",
                             category="Çeşitlilik"
                         ))
+                        if isinstance(sheet, SampledSheet):
+                            context.add_interval(kpis[-1].name, sheet.distinct_interval(col))
                 
-            elif file_data['file_type'] == 'excel' and 'sheets' in file_data:
+            elif context.file_type == 'excel':
                 # Excel dosyaları için sheet bazlı işlem
-                for sheet_name, sheet_data in file_data['sheets'].items():
-                    if 'data' in sheet_data and sheet_data['data']:
-                        df = pd.DataFrame(sheet_data['data'])
-                        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-                        
-                        for col in numeric_cols:
-                            clean_data = df[col].dropna()
-                            if len(clean_data) > 0:
-                                mean_val = clean_data.mean()
-                                kpis.append(KPIModel(
-                                    name=f"{sheet_name} - {col.replace('_', ' ').title()} Ortalaması",
-                                    value=round(float(mean_val), 2),
-                                    unit="MWh" if 'mwh' in col.lower() else "",
-                                    category="Ortalama"
-                                ))
+                for sheet_name, sheet in context.sheets.items():
+                    numeric_cols = sheet.native_numeric_columns
+                    stats_table = sheet.numeric_summary(numeric_cols).to_dict('index')
+                    
+                    for col, stats in stats_table.items():
+                        if stats['count'] > 0:
+                            mean_val = stats['mean']
+                            kpis.append(KPIRecord(
+                                name=f"{sheet_name} - {col.replace('_', ' ').title()} Ortalaması",
+                                value=round(float(mean_val), 2),
+                                unit=sheet.schema.unit(col),
+                                category="Ortalama"
+                            ))
+                            if isinstance(sheet, SampledSheet):
+                                context.add_interval(kpis[-1].name, sheet.mean_interval(col))
             
             # Genel veri KPI'ları ekle
-            if 'data' in file_data:
-                df = pd.DataFrame(file_data['data'])
+            if context.main is not None:
+                sheet = context.main
                 
                 # Toplam kayıt sayısı
-                kpis.append(KPIModel(
+                kpis.append(KPIRecord(
                     name="Toplam Kayıt Sayısı",
-                    value=float(len(df)),
+                    value=float(sheet.row_count),
                     unit="adet",
                     category="Genel"
                 ))
                 
                 # Veri kalitesi (eksik veri oranı)
-                missing_ratio = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
-                kpis.append(KPIModel(
+                missing_ratio = (sheet.missing_cells / (sheet.row_count * sheet.column_count)) * 100
+                kpis.append(KPIRecord(
                     name="Veri Tamlık Oranı",
                     value=round(100 - missing_ratio, 2),
                     unit="%",
                     category="Kalite"
                 ))
+                if isinstance(sheet, SampledSheet):
+                    context.add_interval("Veri Tamlık Oranı", sheet.completeness_interval())
             
             logger.info(f"Successfully generated {len(kpis)} KPIs")
             
             # Eğer hiç KPI oluşturulamamışsa varsayılan değerler
             if not kpis:
                 kpis = [
-                    KPIModel(
+                    KPIRecord(
                         name="Veri Analizi Tamamlandı",
                         value=100.0,
                         unit="%",
@@ -405,7 +438,7 @@ class AIAnalyzer:
             
             # Hata durumunda varsayılan KPI
             kpis = [
-                KPIModel(
+                KPIRecord(
                     name="Analiz Hatası",
                     value=0.0,
                     unit="hata",
@@ -415,52 +448,31 @@ class AIAnalyzer:
         
         return kpis
     
-    def _identify_trends(self, file_data: Dict[str, Any], basic_analysis: Dict[str, Any]) -> List[TrendModel]:
+    def _identify_trends(self, context: AnalysisContext, basic_analysis: Dict[str, Any]) -> List[TrendRecord]:
         """Trendleri belirle - gerçek veriye dayalı"""
         trends = []
         
         try:
-            logger.info(f"Trend analysis starting for {file_data.get('file_type')}")
+            logger.info(f"Trend analysis starting for {context.file_type}")
             
-            if file_data['file_type'] == 'csv' and 'data' in file_data:
-                # CSV verilerini analiz et
-                df = pd.DataFrame(file_data['data'])
-                logger.info(f"DataFrame shape for trends: {df.shape}")
+            if context.file_type in TABLE_FILE_TYPES and context.main is not None:
+                # CSV verilerini analiz et (KPI aşamasıyla aynı sheet ve istatistikler)
+                sheet = context.main
+                logger.debug(f"DataFrame shape for trends: {(sheet.row_count, sheet.column_count)}")
                 
-                # Numerik sütunları tespit et
-                numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-                
-                # Eğer numerik sütun yoksa çevirmeyi dene
-                if not numeric_cols:
-                    for col in df.columns:
-                        if df[col].dtype == 'object':
-                            try:
-                                df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '.'), errors='coerce')
-                                if not df[col].isna().all():
-                                    numeric_cols.append(col)
-                            except:
-                                continue
-                
-                logger.info(f"Analyzing trends for columns: {numeric_cols}")
+                numeric_cols = sheet.numeric_columns
+                logger.debug(f"Analyzing trends for columns: {numeric_cols}")
                 
                 # Zaman serisi sütunu bul (tarih içeren)
-                date_col = None
-                for col in df.columns:
-                    if any(word in col.lower() for word in ['tarih', 'date', 'time', 'zaman']):
-                        try:
-                            df[col] = pd.to_datetime(df[col], errors='coerce')
-                            date_col = col
-                            break
-                        except:
-                            continue
+                date_col = sheet.date_column
                 
                 for col in numeric_cols:
-                    clean_data = df[col].dropna()
+                    stats = sheet.column_stats(col)
                     
-                    if len(clean_data) > 1:
+                    if stats['count'] > 1:
                         # Temel istatistiksel trend analizi
-                        mean_val = clean_data.mean()
-                        std_val = clean_data.std()
+                        mean_val = stats['mean']
+                        std_val = stats['std']
                         
                         if mean_val != 0:
                             cv = (std_val / mean_val) * 100  # Varyasyon katsayısı
@@ -468,14 +480,11 @@ class AIAnalyzer:
                             # Zaman serisi trend analizi (eğer tarih sütunu varsa)
                             if date_col is not None:
                                 try:
-                                    # Tarih sütununa göre sırala ve trend belirle
-                                    df_sorted = df.sort_values(date_col)
-                                    values = df_sorted[col].dropna()
+                                    # Tarih sütununa göre sıralı değerlerin ilk ve son %25'lik dilimi
+                                    quarters = sheet.quarter_means(col, date_col)
                                     
-                                    if len(values) > 5:
-                                        # İlk ve son %25'lik dilimi karşılaştır
-                                        first_quarter = values.head(len(values)//4).mean()
-                                        last_quarter = values.tail(len(values)//4).mean()
+                                    if quarters is not None and quarters[2] > 5:
+                                        first_quarter, last_quarter, _ = quarters
                                         
                                         if last_quarter > first_quarter * 1.1:  # %10'dan fazla artış
                                             direction = "Up"
@@ -487,7 +496,7 @@ class AIAnalyzer:
                                             direction = "Stable"
                                             change = round(abs(((last_quarter - first_quarter) / first_quarter) * 100), 2)
                                     else:
-                                        # Yeterli veri yoksa istatistiksel analiz yap
+                                        # Yeterli veri yoksa (ya da sıralama bilinmiyorsa) istatistiksel analiz yap
                                         if cv > 30:
                                             direction = "Up"
                                         elif cv < 10:
@@ -501,9 +510,7 @@ class AIAnalyzer:
                                     change = round(cv, 2)
                             else:
                                 # Zaman serisi yoksa istatistiksel analiz
-                                q1 = clean_data.quantile(0.25)
-                                q3 = clean_data.quantile(0.75)
-                                median = clean_data.median()
+                                q1, median, q3 = sheet.quantiles(col)
                                 
                                 if cv > 50:  # Yüksek değişkenlik
                                     direction = "Up"
@@ -521,56 +528,54 @@ class AIAnalyzer:
                                     direction = "Stable"
                                     change = round(cv, 2)
                             
-                            trends.append(TrendModel(
+                            trends.append(TrendRecord(
                                 metric_name=col.replace('_', ' ').title(),
                                 direction=direction,
                                 change_percentage=abs(change),
                                 time_frame="Veri Seti Dönemi" if date_col else "Analiz Dönemi"
                             ))
                             
-                            logger.info(f"{col} trend: {direction}, change: {change}%")
+                            logger.debug(f"{col} trend: {direction}, change: {change}%")
                 
-            elif file_data['file_type'] == 'excel' and 'sheets' in file_data:
+            elif context.file_type == 'excel':
                 # Excel dosyaları için sheet bazlı işlem
-                for sheet_name, sheet_data in file_data['sheets'].items():
-                    if 'data' in sheet_data and sheet_data['data']:
-                        df = pd.DataFrame(sheet_data['data'])
-                        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-                        
-                        for col in numeric_cols:
-                            clean_data = df[col].dropna()
-                            if len(clean_data) > 1:
-                                mean_val = clean_data.mean()
-                                std_val = clean_data.std()
+                for sheet_name, sheet in context.sheets.items():
+                    numeric_cols = sheet.native_numeric_columns
+                    
+                    for col in numeric_cols:
+                        stats = sheet.column_stats(col)
+                        if stats['count'] > 1:
+                            mean_val = stats['mean']
+                            std_val = stats['std']
+                            
+                            if mean_val != 0:
+                                cv = (std_val / mean_val) * 100
                                 
-                                if mean_val != 0:
-                                    cv = (std_val / mean_val) * 100
-                                    
-                                    if cv > 25:
-                                        direction = "Up"
-                                    elif cv < 10:
-                                        direction = "Stable"
-                                    else:
-                                        direction = "Down"
-                                    
-                                    trends.append(TrendModel(
-                                        metric_name=f"{sheet_name} - {col.replace('_', ' ').title()}",
-                                        direction=direction,
-                                        change_percentage=round(cv, 2),
-                                        time_frame="Sheet Analizi"
-                                    ))
+                                if cv > 25:
+                                    direction = "Up"
+                                elif cv < 10:
+                                    direction = "Stable"
+                                else:
+                                    direction = "Down"
+                                
+                                trends.append(TrendRecord(
+                                    metric_name=f"{sheet_name} - {col.replace('_', ' ').title()}",
+                                    direction=direction,
+                                    change_percentage=round(cv, 2),
+                                    time_frame="Sheet Analizi"
+                                ))
             
             # Kategorik trendler (opsiyonel)
-            if file_data['file_type'] == 'csv' and 'data' in file_data:
-                df = pd.DataFrame(file_data['data'])
-                categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            if context.file_type in TABLE_FILE_TYPES and context.main is not None:
+                sheet = context.main
+                categorical_cols = sheet.object_columns
                 
                 # En fazla 2 kategorik sütun için trend analizi
                 for col in categorical_cols[:2]:
-                    value_counts = df[col].value_counts()
-                    if len(value_counts) > 1:
+                    distinct_count, _, top_count = sheet.category_profile(col)
+                    if distinct_count > 1:
                         # En yaygın kategorinin oranı
-                        dominant_ratio = (value_counts.iloc[0] / len(df)) * 100
+                        dominant_ratio = (top_count / sheet.row_count) * 100
                         
                         if dominant_ratio > 70:
                             direction = "Stable"
@@ -582,7 +587,7 @@ class AIAnalyzer:
                             direction = "Up"
                             change = round(dominant_ratio, 2)
                         
-                        trends.append(TrendModel(
+                        trends.append(TrendRecord(
                             metric_name=f"{col.replace('_', ' ').title()} Dağılımı",
                             direction=direction,
                             change_percentage=change,
@@ -594,7 +599,7 @@ class AIAnalyzer:
             # Eğer hiç trend bulunamazsa varsayılan ekle
             if not trends:
                 trends = [
-                    TrendModel(
+                    TrendRecord(
                         metric_name="Genel Veri Trendi",
                         direction="Stable",
                         change_percentage=10.0,
@@ -608,7 +613,7 @@ class AIAnalyzer:
             logger.error(traceback.format_exc())
             
             trends = [
-                TrendModel(
+                TrendRecord(
                     metric_name="Trend Analizi Hatası",
                     direction="Stable",
                     change_percentage=0.0,
@@ -618,10 +623,34 @@ class AIAnalyzer:
         
         return trends
     
-    async def _generate_action_items(self, ai_insights: Dict[str, Any], kpis: List[KPIModel], trends: List[TrendModel]) -> List[ActionItemModel]:
+    def _prepare_action_items_prompt(self, kpis: List[KPIRecord], trends: List[TrendRecord]) -> str:
+        """LLM eylem önerileri için prompt hazırla"""
+        prompt = "Aşağıdaki KPI ve trendlere göre en fazla 3 somut eylem önerisi yaz.\n\n"
+        
+        prompt += "KPI'lar:\n"
+        for kpi in kpis[:10]:
+            prompt += f"- {kpi.name}: {kpi.value:,.2f} {kpi.unit} ({kpi.category})\n"
+        
+        prompt += "Trendler:\n"
+        for trend in trends[:10]:
+            prompt += f"- {trend.metric_name}: {trend.direction} %{trend.change_percentage:.1f}\n"
+        
+        prompt += '\nYanıtı yalnızca şu biçimde JSON dizi olarak ver: '
+        prompt += '[{"title": "...", "description": "...", "priority": "High|Medium|Low", "category": "..."}]\n'
+        
+        return prompt
+    
+    async def _generate_action_items(self, kpis: List[KPIRecord], trends: List[TrendRecord]) -> List[ActionItemRecord]:
         """Action items oluştur - gerçek veriye dayalı"""
         action_items = []
         
+        # LLM önerileri kural tabanlı eylemler üretilirken arka planda istenir
+        llm_task = None
+        if self.openai_service.llm_enabled:
+            llm_task = asyncio.ensure_future(
+                self.openai_service.suggest_action_items(self._prepare_action_items_prompt(kpis, trends))
+            )
+        
         try:
             logger.info(f"Generating action items from {len(kpis)} KPIs and {len(trends)} trends")
             
@@ -632,7 +661,7 @@ class AIAnalyzer:
             
             # Yüksek değerli KPI'lar için izleme
             for kpi in high_value_kpis[:3]:  # En fazla 3 tane
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title=f"{kpi.name} Performans Takibi",
                     description=f"{kpi.name} yüksek değerde ({kpi.value:,.0f} {kpi.unit}). Bu kritik metriği düzenli olarak izleyin ve optimizasyon fırsatlarını değerlendirin.",
                     priority="High",
@@ -641,7 +670,7 @@ class AIAnalyzer:
             
             # Düşük değerli KPI'lar için iyileştirme
             for kpi in low_value_kpis[:2]:  # En fazla 2 tane
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title=f"{kpi.name} İyileştirme Planı",
                     description=f"{kpi.name} düşük seviyede ({kpi.value:,.2f} {kpi.unit}). Bu metriği artırmak için stratejik planlar oluşturun.",
                     priority="Medium",
@@ -651,7 +680,7 @@ class AIAnalyzer:
             # Veri kalitesi KPI'larına dayalı eylemler
             for kpi in quality_kpis:
                 if kpi.value < 90:  # %90'dan düşük veri kalitesi
-                    action_items.append(ActionItemModel(
+                    action_items.append(ActionItemRecord(
                         title="Veri Kalitesi İyileştirme",
                         description=f"Veri tamlık oranı %{kpi.value:.1f}. Eksik verileri tamamlayın ve veri toplama süreçlerini gözden geçirin.",
                         priority="High",
@@ -672,7 +701,7 @@ class AIAnalyzer:
                     priority = "Medium"
                     description = f"{trend.metric_name} %{trend.change_percentage:.1f} artış eğiliminde. Bu gelişimi destekleyen faktörleri belirleyin."
                 
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title=f"{trend.metric_name} Artış Stratejisi",
                     description=description,
                     priority=priority,
@@ -690,7 +719,7 @@ class AIAnalyzer:
                     category = "Risk Yönetimi"
                     description = f"{trend.metric_name} %{trend.change_percentage:.1f} azalma eğiliminde. Önleyici tedbirleri değerlendirin."
                 
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title=f"{trend.metric_name} Düşüş Müdahalesi",
                     description=description,
                     priority=priority,
@@ -700,7 +729,7 @@ class AIAnalyzer:
             # Stabil trendler için sürdürülebilirlik
             if len(stable_trends) > 0 and len(action_items) < 5:
                 best_stable = stable_trends[0]  # İlk stabil trend
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title=f"{best_stable.metric_name} Stabilitesini Koruyun",
                     description=f"{best_stable.metric_name} stabil performans sergiliyor. Bu istikrarlı durumu koruyan faktörleri belirleyip sürdürülebilirlik planları oluşturun.",
                     priority="Low",
@@ -710,7 +739,7 @@ class AIAnalyzer:
             # Genel strateji önerisi
             if len(kpis) > 3:
                 total_categories = len(set(kpi.category for kpi in kpis))
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title="Kapsamlı Performans Değerlendirmesi",
                     description=f"Toplam {len(kpis)} KPI ve {total_categories} farklı kategori analiz edildi. Tüm metrikleri bütüncül olarak değerlendirerek stratejik kararlar alın.",
                     priority="Medium",
@@ -718,25 +747,43 @@ class AIAnalyzer:
                 ))
             
             # Özel sektör önerileri (veri türüne göre)
-            energy_related = any('mwh' in kpi.unit.lower() or 'enerji' in kpi.name.lower() for kpi in kpis)
+            energy_related = any(kpi.unit in ENERGY_UNITS or 'enerji' in kpi.name.lower() for kpi in kpis)
             if energy_related:
-                action_items.append(ActionItemModel(
+                action_items.append(ActionItemRecord(
                     title="Enerji Verimliliği Analizi",
                     description="Enerji tüketim verileri tespit edildi. Enerji verimliliği projelerini değerlendirin ve tasarruf potansiyellerini araştırın.",
                     priority="Medium",
                     category="Enerji Yönetimi"
                 ))
             
+            # LLM önerileri (aynı başlıklı olanlar atlanır)
+            if llm_task is not None:
+                titles = {item.title for item in action_items}
+                for suggestion in await llm_task:
+                    item = ActionItemRecord(
+                        title=str(suggestion.get('title', '')).strip(),
+                        description=str(suggestion.get('description', '')),
+                        priority=normalize_priority(suggestion.get('priority')),
+                        category=str(suggestion.get('category', ''))
+                    )
+                    if not item.title or item.title in titles:
+                        continue
+                    titles.add(item.title)
+                    if item.priority == "High":
+                        action_items.insert(0, item)
+                    else:
+                        action_items.append(item)
+            
             # Eğer hiç eylem maddesi oluşturulamamışsa varsayılan ekle
             if not action_items:
                 action_items = [
-                    ActionItemModel(
+                    ActionItemRecord(
                         title="Veri Analizi Değerlendirmesi",
                         description="Analiz sonuçları gözden geçirin ve iş süreçlerinizle entegre edin. Düzenli raporlama sistemi kurun.",
                         priority="Medium",
                         category="Genel Değerlendirme"
                     ),
-                    ActionItemModel(
+                    ActionItemRecord(
                         title="Veri Toplama Süreçlerini İyileştirin",
                         description="Daha kaliteli ve kapsamlı veri analizi için veri toplama metodlarınızı gözden geçirin.",
                         priority="Low",
@@ -751,18 +798,20 @@ class AIAnalyzer:
             
         except Exception as e:
             logger.error(f"Action items generation error: {str(e)}")
+            if llm_task is not None:
+                llm_task.cancel()
             import traceback
             logger.error(traceback.format_exc())
             
             # Hata durumunda varsayılan action items
             action_items = [
-                ActionItemModel(
+                ActionItemRecord(
                     title="Analiz Sonuçlarını İnceleyin",
                     description="Veri analizi tamamlandı. Sonuçları detaylı olarak gözden geçirin ve aksiyon planlarınızı oluşturun.",
                     priority="Medium",
                     category="Genel"
                 ),
-                ActionItemModel(
+                ActionItemRecord(
                     title="Veri Kalitesini Kontrol Edin",
                     description="Daha doğru analizler için veri kalitesini düzenli olarak kontrol edin ve gerekirse veri temizleme işlemleri yapın.",
                     priority="Low",
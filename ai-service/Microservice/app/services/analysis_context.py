@@ -0,0 +1,495 @@
+import warnings
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.services.tabular import as_frame, TABLE_FILE_TYPES
+from app.services.column_schema import SheetSchema, infer_schema
+
+STAT_FIELDS = ['count', 'sum', 'mean', 'std', 'min', 'max']
+# Örneklem sonuçları için %95 güven aralığı (normal yaklaşım)
+CONFIDENCE_LEVEL = 0.95
+CONFIDENCE_Z = 1.96
+
+
+class SheetFrame:
+    """Tek bir sheet/tablo için tipli DataFrame - dönüşümler istek başına bir kez yapılır"""
+
+    def __init__(self, name: str, df: pd.DataFrame):
+        self.name = name
+        self.df = df
+        self._native_numeric: Optional[List[str]] = None
+        self._coerced: Dict[str, pd.Series] = {}
+        self._schema: Optional[SheetSchema] = None
+        self._parsed_dates: Dict[str, pd.Series] = {}
+        self._frames: Dict[Tuple[str, ...], pd.DataFrame] = {}
+        self._stats: Optional[pd.DataFrame] = None
+        self._quantiles: Optional[pd.DataFrame] = None
+
+    @property
+    def native_numeric_columns(self) -> List[str]:
+        """Okuma sırasında zaten sayısal gelen sütunlar"""
+        if self._native_numeric is None:
+            self._native_numeric = self.df.select_dtypes(include=['number']).columns.tolist()
+        return list(self._native_numeric)
+
+    def coerce_numeric(self, col: str) -> pd.Series:
+        """Object sütunu virgülleri nokta yaparak sayıya çevir (sonuç önbelleğe alınır)"""
+        if col not in self._coerced:
+            self._coerced[col] = pd.to_numeric(
+                self.df[col].astype(str).str.replace(',', '.'), errors='coerce'
+            )
+        return self._coerced[col]
+
+    @property
+    def schema(self) -> SheetSchema:
+        """Sütun rolleri, birimleri ve tarih biçimleri (örneklem üzerinden bir kez çıkarılır)"""
+        if self._schema is None:
+            self._schema = infer_schema(self.df)
+        return self._schema
+
+    @property
+    def convertible_columns(self) -> List[str]:
+        """Örneklemde sayıya çevrilebilen değer içeren object sütunlar"""
+        return list(self.schema.convertible_columns)
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        """KPI/trend sütunları: sayısal sütun yoksa çevrilebilen object sütunlar"""
+        return self.native_numeric_columns or self.convertible_columns
+
+    def frame_with(self, numeric_cols: List[str]) -> pd.DataFrame:
+        """Verilen sütunları sayıya çevrilmiş halde içeren DataFrame (önbellekli)"""
+        key = tuple(col for col in numeric_cols if col in self.convertible_columns)
+        if not key:
+            return self.df
+        if key not in self._frames:
+            frame = self.df.copy()
+            for col in key:
+                frame[col] = self.coerce_numeric(col)
+            self._frames[key] = frame
+        return self._frames[key]
+
+    @property
+    def typed(self) -> pd.DataFrame:
+        """KPI/trend aşamalarının paylaştığı tipli DataFrame"""
+        return self.frame_with(self.numeric_columns)
+
+    @property
+    def date_candidates(self) -> List[str]:
+        """Adı tarih/zaman içeren sütunlar"""
+        return list(self.schema.date_candidates)
+
+    def parse_dates(self, col: str) -> pd.Series:
+        """Sütunu şemadaki biçimle tarihe çevir (sonuç önbelleğe alınır)"""
+        if col not in self._parsed_dates:
+            self._parsed_dates[col] = pd.to_datetime(self.df[col], format=self.schema.date_format(col), errors='coerce')
+        return self._parsed_dates[col]
+
+    @property
+    def date_column(self) -> Optional[str]:
+        """Trend analizinde kullanılan ilk tarih sütunu"""
+        return self.schema.date_column
+
+    @property
+    def date_columns(self) -> List[str]:
+        """Örneklemde geçerli tarih değeri içeren tarih sütunları"""
+        return list(self.schema.date_columns)
+
+    def sorted_by(self, date_col: str, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """DataFrame'i parse edilmiş tarih sütununa göre sırala"""
+        df = self.typed if df is None else df
+        order = np.argsort(self.parse_dates(date_col).to_numpy(), kind='stable')  # NaT en sona
+        return df.iloc[order]
+
+    # --- KPI/trend aşamalarının kullandığı sütun istatistikleri ---
+
+    @property
+    def row_count(self) -> int:
+        return len(self.df)
+
+    @property
+    def column_count(self) -> int:
+        return len(self.df.columns)
+
+    @property
+    def missing_cells(self) -> int:
+        """Ham veride eksik hücre sayısı"""
+        return int(self.df.isnull().sum().sum())
+
+    @property
+    def object_columns(self) -> List[str]:
+        """Ham veride object tipli sütunlar"""
+        return self.df.select_dtypes(include=['object']).columns.tolist()
+
+    @property
+    def categorical_columns(self) -> List[str]:
+        """Sayısal dönüşümden sonra object kalan sütunlar"""
+        return self.typed.select_dtypes(include=['object']).columns.tolist()
+
+    def numeric_series(self, col: str) -> pd.Series:
+        """Sütunun sayısal hali (gerekirse virgül -> nokta dönüşümüyle)"""
+        if col in self.native_numeric_columns:
+            return self.df[col]
+        return self.coerce_numeric(col)
+
+    def numeric_block(self, cols: List[str]) -> np.ndarray:
+        """Sütunları tek bir float64 matriste topla (satır x sütun)"""
+        native = set(self.native_numeric_columns)
+        if all(col in native for col in cols):
+            # Homojen sayısal bloklar kopyasız gelir
+            return self.df[cols].to_numpy(dtype='float64', na_value=np.nan)
+        block = np.empty((len(self.df), len(cols)), dtype='float64', order='F')
+        for index, col in enumerate(cols):
+            block[:, index] = self.numeric_series(col).to_numpy(dtype='float64', na_value=np.nan)
+        return block
+
+    def _summarize(self, cols: List[str]) -> pd.DataFrame:
+        block = self.numeric_block(cols)
+        valid = ~np.isnan(block)
+        count = valid.sum(axis=0)
+        total = np.where(valid, block, 0.0).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            deviation = np.where(valid, block - mean, 0.0)
+            std = np.sqrt((deviation * deviation).sum(axis=0) / (count - 1))
+        std[count < 2] = np.nan
+        # fmin/fmax NaN'ları atlar; tamamen boş sütun NaN döner
+        minimum = np.fmin.reduce(block, axis=0) if len(block) else np.full(len(cols), np.nan)
+        maximum = np.fmax.reduce(block, axis=0) if len(block) else np.full(len(cols), np.nan)
+        return pd.DataFrame(
+            {'count': count, 'sum': total, 'mean': mean, 'std': std, 'min': minimum, 'max': maximum},
+            index=pd.Index(cols, dtype=object)
+        )
+
+    def numeric_summary(self, cols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Sütun başına NaN'lar hariç count/sum/mean/std/min/max tablosu.
+        Tüm sayısal blok tek seferde, nan-aware NumPy indirgemeleriyle hesaplanır (önbellekli).
+        """
+        cols = self.numeric_columns if cols is None else cols
+        missing = [col for col in cols if self._stats is None or col not in self._stats.index]
+        if missing:
+            computed = self._summarize(missing)
+            self._stats = computed if self._stats is None else pd.concat([self._stats, computed])
+        if not cols:
+            return self._summarize([])
+        return self._stats.loc[cols]
+
+    def column_stats(self, col: str) -> Dict[str, float]:
+        """NaN'lar hariç count/sum/mean/std/min/max"""
+        stats = self.numeric_summary([col]).loc[col].to_dict()
+        stats['count'] = int(stats['count'])
+        return stats
+
+    def quantiles(self, col: str) -> Tuple[float, float, float]:
+        """Q1, medyan, Q3"""
+        if self._quantiles is None or col not in self._quantiles.index:
+            cols = [c for c in self.numeric_columns if c != col] + [col]
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                values = np.nanquantile(self.numeric_block(cols), [0.25, 0.5, 0.75], axis=0)
+            self._quantiles = pd.DataFrame(values.T, index=pd.Index(cols, dtype=object), columns=['q1', 'median', 'q3'])
+        q1, median, q3 = self._quantiles.loc[col].tolist()
+        return q1, median, q3
+
+    def quarter_means(self, col: str, date_col: str) -> Optional[Tuple[float, float, int]]:
+        """Tarihe göre sıralı değerlerin ilk/son %25 ortalaması ve değer sayısı"""
+        order = np.argsort(self.parse_dates(date_col).to_numpy(), kind='stable')
+        values = self.numeric_series(col).iloc[order].dropna()
+        quarter = len(values) // 4
+        return values.head(quarter).mean(), values.tail(quarter).mean(), len(values)
+
+    def category_profile(self, col: str) -> Tuple[int, Any, int]:
+        """(farklı değer sayısı, en yaygın değer, en yaygın değerin adedi)"""
+        counts = self.df[col].value_counts()
+        if counts.empty:
+            return 0, None, 0
+        return len(counts), counts.index[0], int(counts.iloc[0])
+
+    def overview_overrides(self) -> Dict[str, Any]:
+        """Temel analiz çıktısında örneklem yerine tüm veriden gelen alanlar"""
+        return {}
+
+
+class StreamedSheet(SheetFrame):
+    """
+    Parça parça okunan büyük CSV: istatistikler tek geçişte biriktirilen özetten,
+    satır gerektiren işlemler ise rastgele örneklemden (self.df) yapılır.
+    """
+
+    def __init__(self, name: str, sample_df: pd.DataFrame, stream_stats: Dict[str, Any]):
+        super().__init__(name, sample_df)
+        self.stream_stats = stream_stats
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        return list(self.stream_stats['numeric_columns'])
+
+    @property
+    def date_column(self) -> Optional[str]:
+        return self.stream_stats.get('date_column')
+
+    @property
+    def row_count(self) -> int:
+        return self.stream_stats['row_count']
+
+    @property
+    def column_count(self) -> int:
+        return len(self.stream_stats['columns'])
+
+    @property
+    def missing_cells(self) -> int:
+        return int(sum(self.stream_stats['null_counts'].values()))
+
+    @property
+    def object_columns(self) -> List[str]:
+        return list(self.stream_stats['object_columns'])
+
+    @property
+    def categorical_columns(self) -> List[str]:
+        coerced = set(self.stream_stats['coerced_columns'])
+        return [col for col in self.stream_stats['object_columns'] if col not in coerced]
+
+    def numeric_summary(self, cols: Optional[List[str]] = None) -> pd.DataFrame:
+        cols = self.numeric_columns if cols is None else cols
+        streamed = self.stream_stats['numeric_stats']
+        if not all(col in streamed for col in cols):
+            return super().numeric_summary(cols)
+        return pd.DataFrame(
+            [[streamed[col][field] for field in STAT_FIELDS] for col in cols],
+            index=pd.Index(cols, dtype=object), columns=STAT_FIELDS
+        )
+
+    def column_stats(self, col: str) -> Dict[str, float]:
+        stats = self.stream_stats['numeric_stats'].get(col)
+        return stats if stats is not None else super().column_stats(col)
+
+    def quantiles(self, col: str) -> Tuple[float, float, float]:
+        stats = self.stream_stats['numeric_stats'].get(col)
+        if stats is None:
+            return super().quantiles(col)
+        return stats['q1'], stats['median'], stats['q3']
+
+    def quarter_means(self, col: str, date_col: str) -> Optional[Tuple[float, float, int]]:
+        # Çeyrek ortalamaları dosya sırasıyla biriktirildi; yalnızca dosya tarihe göre sıralıysa geçerli
+        stats = self.stream_stats['numeric_stats'].get(col)
+        if stats is None or not self.stream_stats.get('date_sorted') or date_col != self.date_column:
+            return None
+        return stats['first_quarter_mean'], stats['last_quarter_mean'], stats['count']
+
+    def category_profile(self, col: str) -> Tuple[int, Any, int]:
+        stats = self.stream_stats['categorical_stats'].get(col)
+        if stats is None:
+            return super().category_profile(col)
+        if not stats['top_values']:
+            return stats['distinct'], None, 0
+        top_value, top_count = stats['top_values'][0]
+        return stats['distinct'], top_value, top_count
+
+    def overview_overrides(self) -> Dict[str, Any]:
+        statistics = {}
+        for col, stats in self.stream_stats['numeric_stats'].items():
+            statistics[col] = {
+                'count': stats['count'], 'mean': stats['mean'], 'std': stats['std'], 'min': stats['min'],
+                '25%': stats['q1'], '50%': stats['median'], '75%': stats['q3'], 'max': stats['max'],
+            }
+        return {
+            'shape': (self.row_count, self.column_count),
+            'missing_data': dict(self.stream_stats['null_counts']),
+            'statistics': statistics,
+            'categorical_summary': dict(self.stream_stats.get('categorical_stats', {})),
+            'sampled_rows': len(self.df),
+        }
+
+
+class SampledSheet(SheetFrame):
+    """
+    Hızlı mod: sheet'in örneklemi. Ortalama, oran ve dağılım istatistikleri örneklemden,
+    toplamlar ve satır sayısı tahmini toplam satıra ölçeklenerek hesaplanır.
+    Örneklem ardışık satır kümelerinden oluşuyorsa (`cluster_sizes`, katman başına bir küme)
+    güven aralıkları küme toplamlarından hesaplanır; aksi halde basit rastgele örneklem varsayılır.
+    """
+
+    def __init__(self, name: str, sample_df: pd.DataFrame, total_rows: int,
+                 cluster_sizes: Optional[List[int]] = None):
+        super().__init__(name, sample_df)
+        self.total_rows = max(total_rows, len(sample_df))
+        # Satır -> küme numarası; boyutlar örneklemle eşleşmiyorsa (ör. tırnak içi satır sonu) kullanılmaz
+        self.clusters: Optional[np.ndarray] = None
+        if cluster_sizes and sum(cluster_sizes) == len(sample_df):
+            self.clusters = np.repeat(np.arange(len(cluster_sizes)), cluster_sizes)
+
+    @property
+    def scale(self) -> float:
+        return self.total_rows / len(self.df) if len(self.df) else 1.0
+
+    @property
+    def row_count(self) -> int:
+        return self.total_rows
+
+    @property
+    def missing_cells(self) -> int:
+        return int(round(super().missing_cells * self.scale))
+
+    def _summarize(self, cols: List[str]) -> pd.DataFrame:
+        table = super()._summarize(cols)
+        table['count'] = (table['count'] * self.scale).round()
+        table['sum'] = table['sum'] * self.scale
+        return table
+
+    def category_profile(self, col: str) -> Tuple[int, Any, int]:
+        # Farklı değer sayısı örneklemden tüm veriye tahmin edilir; en yaygın değerin adedi ölçeklenir
+        _, most_common, most_common_count = super().category_profile(col)
+        _, estimate, _ = self.distinct_estimate(col)
+        return int(round(estimate)), most_common, int(round(most_common_count * self.scale))
+
+    def distinct_estimate(self, col: str) -> Tuple[int, float, float]:
+        """
+        (örneklemdeki farklı değer sayısı, Shlosser tahmini, GEE üst sınırı). Tahminler örneklemde
+        bir kez görülen değerlerin oranından tüm veriye ölçeklenir ve dolu satır sayısını aşmaz.
+        """
+        counts = self.df[col].value_counts()
+        observed = len(counts)
+        sample_count = int(counts.sum())
+        population = sample_count * self.scale
+        # frequencies[i]: örneklemde tam i kez görülen değer sayısı
+        frequencies = np.bincount(counts.to_numpy())
+        singletons = int(frequencies[1]) if len(frequencies) > 1 else 0
+        # Tek görülen değer yoksa örneklem tüm değerleri yakalamıştır
+        if not singletons or population <= sample_count:
+            return observed, float(observed), float(observed)
+
+        times = np.arange(len(frequencies))
+        q = sample_count / population
+        shlosser = observed + singletons * (np.sum((1 - q) ** times * frequencies)
+                                            / np.sum(times * q * (1 - q) ** (times - 1) * frequencies))
+        upper = singletons * population / sample_count + (observed - singletons)
+        estimate = min(float(shlosser), population)
+        return observed, estimate, min(max(upper, estimate), population)
+
+    def distinct_interval(self, col: str) -> Optional[Tuple[float, float]]:
+        """Farklı değer sayısı aralığı: örneklemde görülen (kesin alt sınır) - GEE üst sınırı"""
+        observed, _, upper = self.distinct_estimate(col)
+        return (observed, upper) if observed else None
+
+    def _ratio_variance(self, numerator: np.ndarray, denominator: np.ndarray) -> Optional[float]:
+        """
+        sum(numerator) / sum(denominator) oranının varyansı (sonlu popülasyon düzeltmesi hariç).
+        Kümeli örneklemde katman başına tek küme olduğundan komşu katmanlar ikişer birleştirilir
+        (tek sayıda katmanda son üçlü) ve küme toplamlarının grup içi farklarından tahmin edilir.
+        """
+        total = float(denominator.sum())
+        if total <= 0:
+            return None
+        ratio = float(numerator.sum()) / total
+        residuals = numerator - ratio * denominator
+        if self.clusters is None:
+            if len(residuals) < 2:
+                return None
+            return len(residuals) * float(np.var(residuals, ddof=1)) / total ** 2
+
+        cluster_count = int(self.clusters[-1]) + 1 if len(self.clusters) else 0
+        if cluster_count < 2:
+            return None
+        residuals = np.bincount(self.clusters, weights=residuals, minlength=cluster_count)
+        groups = np.arange(cluster_count) // 2
+        if cluster_count % 2:
+            groups[-1] = groups[-2]
+        sizes = np.bincount(groups)
+        group_means = np.bincount(groups, weights=residuals) / sizes
+        squares = np.bincount(groups, weights=(residuals - group_means[groups]) ** 2)
+        return float(np.sum(sizes / (sizes - 1) * squares)) / total ** 2
+
+    def _correction(self, sample_count: int) -> float:
+        """Sonlu popülasyon düzeltmesi (örneklenen pay arttıkça aralık daralır)"""
+        population = max(sample_count, int(round(sample_count * self.scale)))
+        return (population - sample_count) / (population - 1) if population > 1 else 0.0
+
+    def mean_interval(self, col: str) -> Optional[Tuple[float, float]]:
+        """Ortalama için güven aralığı (küme yapısına ve sonlu popülasyona göre düzeltilmiş)"""
+        values = self.numeric_series(col).to_numpy(dtype='float64', na_value=np.nan)
+        present = ~np.isnan(values)
+        sample_count = int(present.sum())
+        if sample_count < 2:
+            return None
+        variance = self._ratio_variance(np.where(present, values, 0.0), present.astype('float64'))
+        if variance is None:
+            return None
+        margin = CONFIDENCE_Z * np.sqrt(variance * self._correction(sample_count))
+        mean = float(values[present].mean())
+        return mean - margin, mean + margin
+
+    def sum_interval(self, col: str) -> Optional[Tuple[float, float]]:
+        """Toplam için güven aralığı: ortalama aralığı x tahmini dolu değer sayısı"""
+        interval = self.mean_interval(col)
+        if interval is None:
+            return None
+        count = self.numeric_series(col).notna().sum() * self.scale
+        return interval[0] * count, interval[1] * count
+
+    def completeness_interval(self) -> Optional[Tuple[float, float]]:
+        """Dolu hücre oranı (%) için güven aralığı"""
+        cells = self.df.size
+        if not cells:
+            return None
+        ratio = 1 - super().missing_cells / cells
+        filled = self.df.notna().sum(axis=1).to_numpy(dtype='float64')
+        variance = self._ratio_variance(filled, np.full(len(filled), float(self.df.shape[1])))
+        margin = CONFIDENCE_Z * np.sqrt((variance or 0.0) * self._correction(len(self.df)))
+        return 100 * max(0.0, ratio - margin), 100 * min(1.0, ratio + margin)
+
+    def overview_overrides(self) -> Dict[str, Any]:
+        return {
+            'shape': (self.row_count, self.column_count),
+            'sampled_rows': len(self.df),
+        }
+
+
+class AnalysisContext:
+    """Bir analiz isteği boyunca tüm aşamaların paylaştığı sheet DataFrame'leri"""
+
+    def __init__(self, file_data: Dict[str, Any]):
+        self.file_type = file_data.get('file_type')
+        self.sheets: Dict[str, SheetFrame] = {}
+        self.tables: List[SheetFrame] = []
+        # Hızlı modda örneklem bilgisi; KPI aşaması güven aralıklarını (KPI adı -> [alt, üst]) buraya yazar
+        self.sampling: Optional[Dict[str, Any]] = file_data.get('sampling')
+        self.confidence_intervals: Dict[str, List[float]] = {}
+
+        if self.file_type == 'excel':
+            for sheet_name, sheet_data in file_data.get('sheets', {}).items():
+                if 'data' in sheet_data and sheet_data['data']:
+                    if self.sampling and sheet_data.get('sampled'):
+                        self.sheets[sheet_name] = SampledSheet(sheet_name, as_frame(sheet_data['data']), sheet_data['total_rows'])
+                    else:
+                        self.sheets[sheet_name] = SheetFrame(sheet_name, as_frame(sheet_data['data']))
+
+        elif self.file_type in TABLE_FILE_TYPES:
+            if file_data.get('stream_stats'):
+                self.sheets['main'] = StreamedSheet('main', as_frame(file_data['data']), file_data['stream_stats'])
+            elif self.sampling and file_data.get('data'):
+                self.sheets['main'] = SampledSheet('main', as_frame(file_data['data']), self.sampling['estimated_total_rows'],
+                                                   self.sampling.get('cluster_sizes'))
+            elif 'data' in file_data and file_data['data']:
+                self.sheets['main'] = SheetFrame('main', as_frame(file_data['data']))
+
+        elif self.file_type == 'pdf':
+            for index, table in enumerate(file_data.get('tables') or []):
+                if table['data']:
+                    df = pd.DataFrame(table['data'][1:], columns=table['data'][0])  # İlk satır header
+                    self.tables.append(SheetFrame(f"table_{index + 1}", df))
+
+    @property
+    def main(self) -> Optional[SheetFrame]:
+        """Tek tablolu dosyaların (CSV, Parquet, Arrow, JSON) tek sheet'i"""
+        return self.sheets.get('main')
+
+    @property
+    def approximate(self) -> bool:
+        return self.sampling is not None
+
+    def add_interval(self, kpi_name: str, interval: Optional[Tuple[float, float]]):
+        """Örneklemden hesaplanan KPI'nın güven aralığını kaydet"""
+        if interval is not None and all(np.isfinite(interval)):
+            self.confidence_intervals[kpi_name] = [round(float(interval[0]), 2), round(float(interval[1]), 2)]
@@ -0,0 +1,65 @@
+from typing import Any, Dict
+
+
+class KPIRecord:
+    """Analiz sırasında üretilen KPI - yanıt sözlüğüne yalnızca sınırda (build_response) bir kez çevrilir"""
+    __slots__ = ('name', 'value', 'unit', 'category')
+
+    def __init__(self, name: str, value: float, unit: str, category: str):
+        self.name = name
+        self.value = float(value)
+        self.unit = unit
+        self.category = category
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'value': self.value, 'unit': self.unit, 'category': self.category}
+
+
+class TrendRecord:
+    __slots__ = ('metric_name', 'direction', 'change_percentage', 'time_frame')
+
+    def __init__(self, metric_name: str, direction: str, change_percentage: float, time_frame: str):
+        self.metric_name = metric_name
+        self.direction = direction
+        self.change_percentage = float(change_percentage)
+        self.time_frame = time_frame
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'metric_name': self.metric_name, 'direction': self.direction,
+                'change_percentage': self.change_percentage, 'time_frame': self.time_frame}
+
+
+class ActionItemRecord:
+    __slots__ = ('title', 'description', 'priority', 'category')
+
+    def __init__(self, title: str, description: str, priority: str, category: str):
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.category = category
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'title': self.title, 'description': self.description, 'priority': self.priority, 'category': self.category}
+
+
+def build_response(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aşama sonuçlarından AnalysisResponse biçiminde, JSON'a hazır sözlük. Veriler analiz kodundan
+    geldiği ve kayıtlar tipleri kurucuda sabitlediği için pydantic modeli kurulmaz ve doğrulanmaz.
+    """
+    sampling = results.get('sampling')
+    return {
+        'summary': results['summary'],
+        'kpis': [kpi.as_dict() for kpi in results['kpis']],
+        'trends': [trend.as_dict() for trend in results['trends']],
+        'action_items': [item.as_dict() for item in results['action_items']],
+        'approximate': results.get('approximate', False),
+        'sampling': {
+            'method': sampling['method'],
+            'sample_rows': sampling['sample_rows'],
+            'estimated_total_rows': sampling['estimated_total_rows'],
+            'confidence_level': sampling['confidence_level'],
+            'strata': sampling.get('strata'),
+        } if sampling else None,
+        'confidence_intervals': results.get('confidence_intervals', {}),
+    }
@@ -0,0 +1,200 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional, Set, Tuple
+
+from app.services.fingerprint import file_fingerprint
+
+# Cevabı değiştirmeyen soru kalıpları (soru ekleri, nezaket sözcükleri)
+QUESTION_FILLER_WORDS = frozenset({
+    'ne', 'neler', 'nedir', 'nelerdir', 'nedirler', 'mi', 'mu', 'mü', 'midir', 'mudur', 'müdür',
+    'acaba', 'lütfen', 'bana', 'bize', 'söyle', 'söyler', 'söyleyin', 'misin', 'misiniz', 'var', 'varmi',
+    'peki', 'şu', 'bu', 'bir',
+})
+# Sorunun yönünü belirleyen sözcükler (katlanmış yazımla): trigram benzerliği "en yüksek" ile
+# "en düşük" sorularını ayıramaz; bulanık eşleşme için bu sınıfların kümesi aynı olmalı
+_DIRECTION_WORDS = {
+    'max': ('highest', 'higher', 'high', 'most', 'max', 'maximum', 'largest', 'larger', 'biggest', 'bigger',
+            'greatest', 'top', 'peak', 'best'),
+    'min': ('lowest', 'lower', 'low', 'least', 'min', 'minimum', 'smallest', 'smaller', 'fewest', 'bottom',
+            'worst', 'az'),
+    'up': ('increase', 'increased', 'increases', 'increasing', 'rise', 'rises', 'rising', 'rose', 'grow',
+           'grows', 'growing', 'grew', 'growth', 'up'),
+    'down': ('decrease', 'decreased', 'decreases', 'decreasing', 'decline', 'declined', 'declining', 'drop',
+             'dropped', 'fall', 'falling', 'fell', 'reduction', 'down'),
+    'not': ('not', 'no', 'never', 'without'),
+}
+# Türkçe kökler ekli hallerle eşleşir (yüksekliği, düşüşü, artışın ...); ilk eşleşen kök geçerlidir
+_DIRECTION_STEMS = (
+    ('yüksel', 'up'), ('yüksek', 'max'), ('fazla', 'max'), ('büyük', 'max'), ('zirve', 'max'),
+    ('düşüş', 'down'), ('düşen', 'down'), ('düşm', 'down'), ('azal', 'down'), ('geril', 'down'),
+    ('düşük', 'min'), ('küçük', 'min'), ('dip', 'min'),
+    ('artiş', 'up'), ('artan', 'up'), ('artm', 'up'), ('artt', 'up'),
+    ('değil', 'not'), ('olmayan', 'not'), ('hariç', 'not'),
+)
+_DIRECTION_BY_WORD = {word: label for label, words in _DIRECTION_WORDS.items() for word in words}
+_TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+# Noktalı/noktasız i ayrımı anahtarda yok sayılır ("KPI", "kpi" ve "kpı" aynı soru)
+_FOLD_DOTTED_I = str.maketrans({'I': 'i', 'İ': 'i', 'ı': 'i'})
+
+
+def fold_text(text: str) -> str:
+    """Küçük harf; noktalı/noktasız i ayrımı olmadan"""
+    return text.translate(_FOLD_DOTTED_I).lower()
+
+
+def normalize_question(question: str) -> str:
+    """Küçük harf, noktalama ve soru kalıpları atılmış, tek boşluklu soru metni"""
+    tokens = _TOKEN_PATTERN.findall(fold_text(question))
+    meaningful = [token for token in tokens if token not in QUESTION_FILLER_WORDS]
+    return ' '.join(meaningful or tokens)
+
+
+def question_directions(normalized: str) -> frozenset:
+    """Normalize sorudaki yön sınıfları (max/min/up/down/not)"""
+    labels = set()
+    for token in normalized.split():
+        label = _DIRECTION_BY_WORD.get(token)
+        if label is None:
+            label = next((label for stem, label in _DIRECTION_STEMS if token.startswith(stem)), None)
+        if label is not None:
+            labels.add(label)
+    return frozenset(labels)
+
+
+def _trigram_vector(text: str) -> Tuple[Counter, float]:
+    """Kelime sınırlarıyla doldurulmuş karakter trigram sayımları ve vektör normu"""
+    grams: Counter = Counter()
+    for token in text.split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams, math.sqrt(sum(count * count for count in grams.values()))
+
+
+def _cosine(a: Counter, a_norm: float, b: Counter, b_norm: float) -> float:
+    if not a_norm or not b_norm:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(count * b.get(gram, 0) for gram, count in a.items()) / (a_norm * b_norm)
+
+
+class _Entry:
+    __slots__ = ('scope', 'normalized', 'answer', 'stored_at', 'vector', 'norm', 'numbers', 'directions')
+
+    def __init__(self, scope: str, normalized: str, answer: Any):
+        self.scope = scope
+        self.normalized = normalized
+        self.answer = answer
+        self.stored_at = time.monotonic()
+        self.vector, self.norm = _trigram_vector(normalized)
+        self.numbers = frozenset(_NUMBER_PATTERN.findall(normalized))
+        self.directions = question_directions(normalized)
+
+
+class AnswerCache:
+    """Dosya parmak izi + normalize soru anahtarlı, trigram benzerliğiyle bulanık eşleşen TTL'li LRU cevap önbelleği"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity_threshold: float, version: str):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version = version
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._by_scope: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'fuzzy_hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def scope_for(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Dosya içeriği, parse seçenekleri ve cevaplayıcıya göre kapsam; dosya okunamıyorsa None"""
+        try:
+            fingerprint = file_fingerprint(file_path)
+        except OSError:
+            return None
+        extra = ','.join(f"{k}={options[k]}" for k in sorted(options)) if options else ''
+        return f"{fingerprint.digest}:{fingerprint.size}:{self.version}:{extra}"
+
+    def get(self, scope: Optional[str], question: str) -> Optional[Any]:
+        """Önce birebir normalize soru, sonra aynı dosyadaki en benzer soru (eşik üzerindeyse)"""
+        if scope is None or self.max_entries <= 0:
+            return None
+        normalized = normalize_question(question)
+        with self._lock:
+            entry = self._live_entry((scope, normalized))
+            if entry is not None:
+                self._stats['hits'] += 1
+                return entry.answer
+
+            entry = self._nearest(scope, normalized) if self.similarity_threshold < 1 else None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            self._stats['fuzzy_hits'] += 1
+            return entry.answer
+
+    def put(self, scope: Optional[str], question: str, answer: Any):
+        if scope is None or self.max_entries <= 0:
+            return
+        entry = _Entry(scope, normalize_question(question), answer)
+        key = (scope, entry.normalized)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._by_scope.setdefault(scope, set()).add(entry.normalized)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._forget(evicted)
+                self._stats['evictions'] += 1
+
+    def _live_entry(self, key: Tuple[str, str]) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl_seconds and time.monotonic() - entry.stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self._forget(entry)
+            self._stats['expired'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, scope: str, normalized: str) -> Optional[_Entry]:
+        """Aynı kapsamdaki girdiler arasında trigram kosinüs benzerliği en yüksek olan"""
+        candidates = self._by_scope.get(scope)
+        if not candidates:
+            return None
+        vector, norm = _trigram_vector(normalized)
+        numbers = frozenset(_NUMBER_PATTERN.findall(normalized))
+        directions = question_directions(normalized)
+        best_key, best_score = None, self.similarity_threshold
+        for candidate in list(candidates):
+            entry = self._entries[(scope, candidate)]
+            # "2023 satışları" ile "2024 satışları", "en yüksek" ile "en düşük" benzer görünse de farklı sorulardır
+            if entry.numbers != numbers or entry.directions != directions:
+                continue
+            score = _cosine(vector, norm, entry.vector, entry.norm)
+            if score >= best_score:
+                best_key, best_score = (scope, candidate), score
+        return self._live_entry(best_key) if best_key is not None else None
+
+    def _forget(self, entry: _Entry):
+        scoped = self._by_scope.get(entry.scope)
+        if scoped is not None:
+            scoped.discard(entry.normalized)
+            if not scoped:
+                del self._by_scope[entry.scope]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            stats['ttl_seconds'] = self.ttl_seconds
+            stats['similarity_threshold'] = self.similarity_threshold
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
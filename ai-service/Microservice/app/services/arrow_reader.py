@@ -0,0 +1,102 @@
+import math
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import pyarrow.types as pat
+
+# Uzantı -> file_type
+ARROW_FORMATS = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'arrow',
+}
+
+
+def _value_type(data_type: pa.DataType) -> pa.DataType:
+    return data_type.value_type if pat.is_dictionary(data_type) else data_type
+
+
+def analyzable(field: pa.Field) -> bool:
+    """Analiz aşamalarının kullandığı tipler; iç içe, ikili ve null sütunlar okunmaz"""
+    data_type = _value_type(field.type)
+    return (pat.is_integer(data_type) or pat.is_floating(data_type) or pat.is_boolean(data_type)
+            or pat.is_decimal(data_type) or pat.is_string(data_type) or pat.is_large_string(data_type)
+            or pat.is_temporal(data_type))
+
+
+def to_frame(data) -> pd.DataFrame:
+    """
+    Arrow tablo/partisini DataFrame'e çevir. split_blocks ile null içermeyen sayısal sütunlar
+    Arrow tamponlarını kopyasız paylaşır; decimal sütunlar float64'e çevrilir.
+    """
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])
+    for index, field in enumerate(data.schema):
+        if pat.is_decimal(field.type):
+            data = data.set_column(index, field.name, data.column(index).cast(pa.float64()))
+    return data.to_pandas(split_blocks=True, self_destruct=True)
+
+
+class ArrowSource:
+    """
+    Parquet ya da Arrow IPC (Feather v2, .arrow) dosyası. Dosya bellek eşlemeli açılır ve
+    yalnızca analizde kullanılabilen sütunlar okunur; IPC partileri eşlenen sayfalardan kopyasız gelir.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.file_type = ARROW_FORMATS[Path(file_path).suffix.lower()]
+        if self.file_type == 'parquet':
+            self._parquet = pq.ParquetFile(file_path, memory_map=True)
+            schema = self._parquet.schema_arrow
+            metadata = self._parquet.metadata
+            self.num_rows = metadata.num_rows
+            # Sıkıştırılmamış boyut - akış eşiğiyle karşılaştırılır
+            self.data_bytes = sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+        else:
+            self._ipc = ipc.open_file(pa.memory_map(file_path, 'r'))
+            schema = self._ipc.schema
+            self.num_rows = sum(self._ipc.get_batch(i).num_rows for i in range(self._ipc.num_record_batches))
+            self.data_bytes = Path(file_path).stat().st_size
+        self.columns: List[str] = [field.name for field in schema if analyzable(field)]
+        self.skipped_columns: List[str] = [field.name for field in schema if not analyzable(field)]
+
+    def read(self) -> pa.Table:
+        if self.file_type == 'parquet':
+            return self._parquet.read(columns=self.columns)
+        return self._ipc.read_all().select(self.columns)
+
+    def iter_batches(self, batch_rows: int) -> Iterator[pa.RecordBatch]:
+        """Sabit boyutlu partiler - bellek kullanımı dosya boyutundan bağımsız"""
+        if self.file_type == 'parquet':
+            yield from self._parquet.iter_batches(batch_size=batch_rows, columns=self.columns)
+            return
+        for index in range(self._ipc.num_record_batches):
+            batch = self._ipc.get_batch(index).select(self.columns)
+            for start in range(0, batch.num_rows, batch_rows):
+                yield batch.slice(start, batch_rows)
+
+    def sample(self, sample_rows: int, seed: int = 0) -> pa.Table:
+        """
+        Basit rastgele örneklem. IPC dosyalarında satırlar eşlenen dosyadan doğrudan alınır;
+        Parquet'te önce eşit aralıklı row group'lar okunur, örneklem bunların içinden çekilir.
+        """
+        rng = np.random.default_rng(seed)
+        if self.file_type == 'parquet':
+            groups = self._parquet.metadata.num_row_groups
+            rows_per_group = self.num_rows / max(groups, 1)
+            # Örneklemin en az iki katı satır içeren row group'lar okunur
+            wanted = min(groups, max(1, math.ceil(2 * sample_rows / max(rows_per_group, 1))))
+            picked = sorted(set(np.linspace(0, groups - 1, wanted).astype('int64').tolist()))
+            table = self._parquet.read_row_groups(picked, columns=self.columns)
+        else:
+            table = self.read()
+        if table.num_rows <= sample_rows:
+            return table
+        indices = np.sort(rng.choice(table.num_rows, sample_rows, replace=False))
+        return table.take(pa.array(indices))
@@ -0,0 +1,221 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+import pandas as pd
+
+from app.services.analysis_context import AnalysisContext, SheetFrame
+from app.services.answer_cache import fold_text, QUESTION_FILLER_WORDS
+from app.services.tabular import TABLE_FILE_TYPES
+
+# İndeks yapısı değiştiğinde artırın - önbellekteki eski indeksler geçersiz olur
+CHUNK_INDEX_VERSION = "1"
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+_PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
+# Türkçe eklemeli dil: ilk 5 karakter kökü (F5) "satışları" ile "satış"ı eşleştirir
+STEM_LENGTH = 5
+CHARS_PER_TOKEN = 4
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25 terimleri: küçük harf, kısaltılmış kök, soru kalıpları hariç"""
+    return [token[:STEM_LENGTH] for token in _TOKEN_PATTERN.findall(fold_text(text))
+            if token not in QUESTION_FILLER_WORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class Chunk:
+    __slots__ = ('source', 'text', 'length')
+
+    def __init__(self, source: str, text: str):
+        self.source = source
+        self.text = text
+        self.length = 0
+
+
+class ChunkIndex:
+    """
+    Bir rapor için yerel BM25 indeksi: PDF sayfa metinleri, tablo dilimleri ve sütun istatistikleri.
+    /ask yalnızca soruyla ilgili parçaları token bütçesi içinde LLM'e gönderir.
+    """
+
+    def __init__(self, overview: str, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.overview = overview
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for chunk_id, chunk in enumerate(chunks):
+            terms = Counter(tokenize(chunk.text))
+            chunk.length = sum(terms.values())
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, []).append((chunk_id, frequency))
+        self._average_length = (sum(chunk.length for chunk in chunks) / len(chunks)) if chunks else 0.0
+
+    @classmethod
+    def from_file_data(cls, file_data: Dict[str, Any], chunk_chars: int = 1200, table_rows: int = 25,
+                       max_rows: int = 20000) -> "ChunkIndex":
+        """Parse edilmiş dosyadan indeks kur (çalışan havuzunda çağrılır)"""
+        context = AnalysisContext(file_data)
+        chunks: List[Chunk] = []
+
+        if context.file_type == 'pdf':
+            chunks.extend(_pdf_text_chunks(file_data, chunk_chars))
+            for sheet, table in zip(context.tables, file_data.get('tables') or []):
+                source = f"Tablo (sayfa {table.get('page', '?')})"
+                chunks.extend(_frame_chunks(sheet, source, table_rows, max_rows))
+        else:
+            for sheet_name, sheet in context.sheets.items():
+                source = 'Veri' if context.file_type in TABLE_FILE_TYPES else f"Sheet '{sheet_name}'"
+                chunks.extend(_column_chunks(sheet, source))
+                chunks.extend(_frame_chunks(sheet, source, table_rows, max_rows))
+
+        return cls(_overview(file_data, context), chunks)
+
+    def search(self, query: str, top_k: int = 8) -> List[Tuple[float, Chunk]]:
+        """BM25 skoruna göre en ilgili parçalar"""
+        if not self.chunks:
+            return []
+        scores: Dict[int, float] = {}
+        chunk_count = len(self.chunks)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, frequency in postings:
+                length_norm = 1 - self.b + self.b * self.chunks[chunk_id].length / (self._average_length or 1)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(score, self.chunks[chunk_id]) for chunk_id, score in ranked]
+
+    def build_context(self, query: str, token_budget: int = 1500, top_k: int = 8) -> str:
+        """Genel bakış + ilgili parçalar; bütçeyi aşan parçalar kısaltılır ya da atlanır"""
+        parts = [self.overview]
+        remaining = token_budget - estimate_tokens(self.overview)
+        hits = self.search(query, top_k)
+
+        # Eşleşme yoksa belgenin başından parçalar (genel sorular için)
+        chunks = [chunk for _, chunk in hits] if hits else self.chunks[:top_k]
+        for chunk in chunks:
+            if remaining <= 0:
+                break
+            text = f"[{chunk.source}]\n{chunk.text}"
+            if estimate_tokens(text) > remaining:
+                text = text[:remaining * CHARS_PER_TOKEN]
+            parts.append(text)
+            remaining -= estimate_tokens(text)
+        return '\n\n'.join(parts)
+
+    def size(self) -> int:
+        return len(self.chunks)
+
+
+def _overview(file_data: Dict[str, Any], context: AnalysisContext) -> str:
+    lines = [f"Dosya Türü: {file_data.get('file_type', 'Bilinmiyor')}"]
+    if context.file_type == 'pdf':
+        lines.append(f"Sayfa sayısı: {file_data.get('page_count', 0)}, tablo sayısı: {len(context.tables)}")
+    for sheet_name, sheet in context.sheets.items():
+        columns = ', '.join(str(col) for col in sheet.df.columns[:30])
+        lines.append(f"{sheet_name}: {sheet.row_count} satır, {sheet.column_count} sütun ({columns})")
+    return '\n'.join(lines)
+
+
+def _split_text(text: str, chunk_chars: int) -> List[str]:
+    """Paragraf sınırlarında, yaklaşık chunk_chars uzunluğunda parçalar"""
+    pieces: List[str] = []
+    current = ''
+    for paragraph in _PARAGRAPH_PATTERN.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > chunk_chars:
+            cut = paragraph.rfind(' ', 0, chunk_chars)
+            cut = cut if cut > chunk_chars // 2 else chunk_chars
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        if current and len(current) + len(paragraph) + 1 > chunk_chars:
+            pieces.append(current)
+            current = ''
+        current = f"{current}\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _pdf_text_chunks(file_data: Dict[str, Any], chunk_chars: int) -> List[Chunk]:
+    text = file_data.get('text_content') or ''
+    offsets = file_data.get('page_offsets') or [[1, 0]]
+    chunks = []
+    for index, (page_number, start) in enumerate(offsets):
+        end = offsets[index + 1][1] if index + 1 < len(offsets) else len(text)
+        for piece in _split_text(text[start:end], chunk_chars):
+            chunks.append(Chunk(f"Sayfa {page_number}", piece))
+    return chunks
+
+
+def _format_value(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def _frame_chunks(sheet: SheetFrame, source: str, table_rows: int, max_rows: int) -> List[Chunk]:
+    """Satır dilimleri; her dilim başlık satırını tekrar eder"""
+    df = sheet.df.head(max_rows) if max_rows else sheet.df
+    if df.empty:
+        return []
+    header = ' | '.join(str(col) for col in df.columns)
+    rows = df.astype(object).where(pd.notna(df), None).values.tolist()
+    chunks = []
+    for start in range(0, len(rows), table_rows):
+        body = '\n'.join(' | '.join(_format_value(value) for value in row) for row in rows[start:start + table_rows])
+        end = min(start + table_rows, len(rows))
+        chunks.append(Chunk(f"{source}, satır {start + 1}-{end}", f"{header}\n{body}"))
+    return chunks
+
+
+def _column_chunks(sheet: SheetFrame, source: str) -> List[Chunk]:
+    """Sütun başına istatistik özeti (tüm veriden)"""
+    chunks = []
+    # Sayıya çevrilebilen string sütunlar (virgüllü ondalık) da istatistik olarak indekslenir
+    numeric_cols = list(dict.fromkeys(sheet.numeric_columns + sheet.convertible_columns))
+    if numeric_cols:
+        for col, stats in sheet.numeric_summary(numeric_cols).to_dict('index').items():
+            if not stats['count']:
+                continue
+            chunks.append(Chunk(
+                f"{source}, sütun '{col}'",
+                f"{col}: {int(stats['count'])} değer, toplam {stats['sum']:,.2f}, ortalama {stats['mean']:,.2f}, "
+                f"std {stats['std']:,.2f}, en düşük {stats['min']:,.2f}, en yüksek {stats['max']:,.2f}"
+            ))
+
+    date_cols = sheet.date_columns
+    for col in date_cols:
+        dates = sheet.parse_dates(col).dropna()
+        if not dates.empty:
+            chunks.append(Chunk(
+                f"{source}, sütun '{col}'",
+                f"{col}: tarih aralığı {dates.min():%Y-%m-%d} - {dates.max():%Y-%m-%d}"
+            ))
+
+    for col in sheet.categorical_columns:
+        if col in numeric_cols or col in date_cols:
+            continue
+        unique_count, most_common, most_common_count = sheet.category_profile(col)
+        if unique_count:
+            chunks.append(Chunk(
+                f"{source}, sütun '{col}'",
+                f"{col}: {unique_count} farklı değer, en yaygın '{most_common}' ({most_common_count} kez)"
+            ))
+    return chunks
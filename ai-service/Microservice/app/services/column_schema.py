@@ -0,0 +1,139 @@
+import re
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Sütun adında geçtiğinde tarih/zaman adayı sayılır
+DATE_NAME_PATTERN = re.compile(r"tarih|date|time|zaman")
+# Sütun adından çıkarılan birimler (ilk eşleşen kullanılır)
+UNIT_PATTERNS: Tuple[Tuple[re.Pattern, str], ...] = (
+    (re.compile(r"gwh"), "GWh"),
+    (re.compile(r"mwh"), "MWh"),
+    (re.compile(r"kwh"), "kWh"),
+)
+ENERGY_UNITS = frozenset(unit for _, unit in UNIT_PATTERNS)
+# Rol tespiti sütunun tamamı yerine bu kadar dolu değer üzerinde yapılır (sütun boyunca eşit aralıklı)
+SCHEMA_SAMPLE_ROWS = 1000
+
+# Sütun rolleri
+ROLE_DATE = 'date'
+ROLE_NUMERIC = 'numeric'
+ROLE_NUMERIC_TEXT = 'numeric_text'  # virgüllü ondalık gibi sayıya çevrilebilen metin
+ROLE_CATEGORICAL = 'categorical'
+ROLE_OTHER = 'other'
+
+
+class ColumnSchema:
+    __slots__ = ('name', 'dtype', 'role', 'unit', 'date_format', 'date_named', 'convertible', 'parses_as_date')
+
+    def __init__(self, name: str, dtype: str, unit: str, date_named: bool):
+        self.name = name
+        self.dtype = dtype
+        self.unit = unit
+        self.date_named = date_named
+        self.date_format: Optional[str] = None
+        self.convertible = False
+        self.parses_as_date = False
+        self.role = ROLE_OTHER
+
+
+class SheetSchema:
+    """Bir sheet'in sütun rolleri, birimleri ve tarih biçimleri - sheet başına bir kez çıkarılır"""
+
+    def __init__(self, columns: Dict[str, ColumnSchema]):
+        self.columns = columns
+        self.convertible_columns = [col for col, schema in columns.items() if schema.convertible]
+        self.date_candidates = [col for col, schema in columns.items() if schema.date_named]
+        self.date_columns = [col for col in self.date_candidates if columns[col].parses_as_date]
+
+    @property
+    def date_column(self) -> Optional[str]:
+        """Trend analizinde kullanılan ilk geçerli tarih sütunu"""
+        return self.date_columns[0] if self.date_columns else None
+
+    def unit(self, col: str) -> str:
+        schema = self.columns.get(col)
+        return schema.unit if schema is not None else ""
+
+    def date_format(self, col: str) -> Optional[str]:
+        schema = self.columns.get(col)
+        return schema.date_format if schema is not None else None
+
+
+def _spread(values: pd.Series, sample_rows: int) -> pd.Series:
+    if len(values) <= sample_rows:
+        return values
+    return values.iloc[np.linspace(0, len(values) - 1, sample_rows).astype('int64')]
+
+
+def _sample(series: pd.Series, sample_rows: int) -> pd.Series:
+    """Sütun boyunca eşit aralıklı dolu değerler; seyrek sütunlarda örneklem dolu değerlerden alınır"""
+    picked = _spread(series, sample_rows).dropna()
+    if len(series) <= sample_rows or len(picked) >= sample_rows // 10:
+        return picked
+    return _spread(series.dropna(), sample_rows)
+
+
+def _first_value(series: pd.Series, sample_rows: int):
+    head = series.iloc[:sample_rows].dropna()
+    return head.iloc[0] if len(head) else series.dropna().iloc[0]
+
+
+def column_unit(name: str) -> str:
+    lowered = name.lower()
+    for pattern, unit in UNIT_PATTERNS:
+        if pattern.search(lowered):
+            return unit
+    return ""
+
+
+def infer_schema(df: pd.DataFrame, sample_rows: int = SCHEMA_SAMPLE_ROWS) -> SheetSchema:
+    """
+    Sütun rollerini dtype ve örneklem üzerinden çıkar. Tam sütun to_numeric/to_datetime
+    denemeleri yalnızca rolü belli olan ve kullanılan sütunlarda yapılır.
+    """
+    columns: Dict[str, ColumnSchema] = {}
+    for col in df.columns:
+        series = df[col]
+        name = str(col)
+        schema = ColumnSchema(name, str(series.dtype), column_unit(name), bool(DATE_NAME_PATTERN.search(name.lower())))
+        columns[col] = schema
+        values = _sample(series, sample_rows)
+        is_object = series.dtype == 'object'
+
+        if schema.date_named and len(values):
+            if pd.api.types.is_datetime64_any_dtype(series):
+                schema.parses_as_date = True
+            else:
+                # pandas biçimi ilk dolu değerden çıkarır; aynı biçim sütunun tamamında kullanılır
+                first = _first_value(series, sample_rows)
+                if isinstance(first, str):
+                    schema.date_format = guess_datetime_format(first)
+                try:
+                    parsed = pd.to_datetime(values, format=schema.date_format, errors='coerce')
+                    schema.parses_as_date = bool(parsed.notna().any())
+                except Exception:
+                    schema.parses_as_date = False
+
+        if is_object and len(values):
+            try:
+                sample = values.astype(str).str.replace(',', '.')
+                schema.convertible = bool(pd.to_numeric(sample, errors='coerce').notna().any())
+            except Exception:
+                schema.convertible = False
+
+        if schema.parses_as_date:
+            schema.role = ROLE_DATE
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            schema.role = ROLE_NUMERIC
+        elif schema.convertible:
+            schema.role = ROLE_NUMERIC_TEXT
+        elif is_object:
+            schema.role = ROLE_CATEGORICAL
+    return SheetSchema(columns)
@@ -0,0 +1,134 @@
+import hashlib
+import io
+import logging
+import os
+import pickle
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.streaming_stats import CsvStreamAccumulator
+
+logger = logging.getLogger(__name__)
+
+# Biriktirici yapısı değiştiğinde artırın - eski kontrol noktaları yok sayılır
+CHECKPOINT_VERSION = "2"
+# Dosyanın yalnızca sonuna ekleme yapıldığını doğrulamak için hash'lenen bölge boyutu
+GUARD_BYTES = 64 * 1024
+
+
+class ByteRangeReader(io.RawIOBase):
+    """Açık dosyanın bulunduğu konumdan itibaren en fazla `length` baytını okutan sarmalayıcı"""
+
+    def __init__(self, file, length: int):
+        self._file = file
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class CsvCheckpoint:
+    """Bir CSV'nin işlenmiş kısmı: bayt konumu, doğrulama hash'leri ve sütun biriktiricisi"""
+
+    def __init__(self, offset: int, head_digest: str, tail_digest: str, sample_rows: int,
+                 accumulator: CsvStreamAccumulator):
+        self.version = CHECKPOINT_VERSION
+        self.offset = offset
+        self.head_digest = head_digest
+        self.tail_digest = tail_digest
+        self.sample_rows = sample_rows
+        self.accumulator = accumulator
+
+
+def _digest_range(file, start: int, length: int) -> str:
+    file.seek(start)
+    return hashlib.blake2b(file.read(length), digest_size=20).hexdigest()
+
+
+def guard_digests(file, offset: int) -> Tuple[str, str]:
+    """Dosyanın başı ve `offset`ten önceki son bölgesi - ikisi de değişmediyse dosyaya yalnızca ekleme yapılmıştır"""
+    head = _digest_range(file, 0, min(offset, GUARD_BYTES))
+    tail_start = max(0, offset - GUARD_BYTES)
+    return head, _digest_range(file, tail_start, offset - tail_start)
+
+
+def complete_length(file, size: int) -> int:
+    """Son satır sonu dahil uzunluk - yazılmakta olan yarım son satır bir sonraki çalıştırmaya kalır"""
+    position = size
+    while position > 0:
+        start = max(0, position - GUARD_BYTES)
+        file.seek(start)
+        block = file.read(position - start)
+        newline = block.rfind(b'\n')
+        if newline != -1:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+class CsvCheckpointStore:
+    """
+    Sonuna satır eklenen CSV'ler için kontrol noktaları (dosya yolu başına bir pickle).
+    Aynı yoldaki dosya büyüdüğünde yalnızca yeni satırlar okunur; baş veya son işlenen
+    bölge değiştiyse kontrol noktası geçersiz sayılır ve dosya baştan işlenir.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, file_path: str) -> str:
+        key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def load(self, file_path: str, file, size: int, sample_rows: int) -> Optional[CsvCheckpoint]:
+        """Dosyaya uyan kontrol noktası; yoksa, eskiyse ya da dosya ekleme dışında değiştiyse None"""
+        path = self._path(file_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as checkpoint_file:
+                checkpoint: CsvCheckpoint = pickle.load(checkpoint_file)
+        except Exception as e:
+            logger.warning(f"CSV checkpoint unreadable ({path}): {e}")
+            return None
+
+        if checkpoint.version != CHECKPOINT_VERSION or checkpoint.sample_rows != sample_rows:
+            return None
+        if checkpoint.offset > size:
+            logger.info(f"CSV checkpoint discarded, file shrank: {file_path}")
+            return None
+        if guard_digests(file, checkpoint.offset) != (checkpoint.head_digest, checkpoint.tail_digest):
+            logger.info(f"CSV checkpoint discarded, processed rows changed: {file_path}")
+            return None
+        return checkpoint
+
+    def save(self, file_path: str, file, offset: int, sample_rows: int, accumulator: CsvStreamAccumulator):
+        head_digest, tail_digest = guard_digests(file, offset)
+        checkpoint = CsvCheckpoint(offset, head_digest, tail_digest, sample_rows, accumulator)
+        path = self._path(file_path)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, 'wb') as checkpoint_file:
+                pickle.dump(checkpoint, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"CSV checkpoint write skipped ({path}): {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self) -> Dict[str, Any]:
+        names = [name for name in os.listdir(self.directory) if name.endswith('.pkl')]
+        return {
+            'checkpoints': len(names),
+            'bytes': sum(os.path.getsize(os.path.join(self.directory, name)) for name in names),
+        }
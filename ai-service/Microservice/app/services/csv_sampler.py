@@ -0,0 +1,69 @@
+import io
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Satır uzunluğu bu kadar baştan okunan veriyle tahmin edilir; dosya örneklemden küçükse tamamı okunur
+_PROBE_BYTES = 1024 * 1024
+
+
+def sample_csv(file_path: str, sample_rows: int, cluster_rows: int = 32, seed: int = 0) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Büyük CSV'den katmanlı örneklem: dosya eşit bayt aralıklarına (katman) bölünür, her katmanda
+    rastgele bir konumdan başlayan `cluster_rows` satır okunur. Dosyanın yalnızca örneklenen
+    kısımları diskten okunduğundan süre dosya boyutundan bağımsızdır.
+    Toplam satır sayısı, örneklenen satırların ortalama bayt uzunluğundan tahmin edilir.
+    Her kümenin satır sayısı `cluster_sizes` ile döner; güven aralıkları küme yapısına göre hesaplanır.
+    Not: tırnak içinde satır sonu içeren CSV'lerde katman başı yanlış satıra denk gelebilir.
+    """
+    with open(file_path, 'rb') as file:
+        size = file.seek(0, io.SEEK_END)
+        file.seek(0)
+        header = file.readline()
+        data_start = len(header)
+        probe = file.read(_PROBE_BYTES)
+        probe_rows = probe.count(b'\n')
+        row_bytes = len(probe) / probe_rows if probe_rows else float(len(probe) or 1)
+
+        if (size - data_start) / row_bytes <= sample_rows * 1.2:
+            df = pd.read_csv(file_path)
+            return df, {'method': 'full', 'sample_rows': len(df), 'estimated_total_rows': len(df)}
+
+        strata = max(1, math.ceil(sample_rows / cluster_rows))
+        stratum_bytes = (size - data_start) / strata
+        rng = np.random.default_rng(seed)
+        lines: List[bytes] = []
+        cluster_sizes: List[int] = []
+        sampled_bytes = 0
+        for index in range(strata):
+            stratum_start = data_start + index * stratum_bytes
+            # Küme katman içinde kalacak şekilde rastgele başlangıç
+            span = max(0.0, stratum_bytes - cluster_rows * row_bytes)
+            file.seek(int(stratum_start + rng.random() * span))
+            file.readline()  # yarım satırı atla
+            cluster_start = len(lines)
+            for _ in range(cluster_rows):
+                line = file.readline()
+                if not line:
+                    break
+                # Boş satırları pandas da atlar; küme boyutları DataFrame satırlarıyla eşleşmeli
+                if not line.strip():
+                    continue
+                if not line.endswith(b'\n'):
+                    line += b'\n'
+                lines.append(line)
+                sampled_bytes += len(line)
+            cluster_sizes.append(len(lines) - cluster_start)
+
+    df = pd.read_csv(io.BytesIO(header + b''.join(lines)))
+    average_row_bytes = sampled_bytes / len(lines) if lines else row_bytes
+    estimated_rows = int(round((size - data_start) / average_row_bytes))
+    return df, {
+        'method': 'stratified',
+        'sample_rows': len(df),
+        'estimated_total_rows': max(estimated_rows, len(df)),
+        'strata': strata,
+        'cluster_sizes': cluster_sizes,
+    }
@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """orjson ile UTF-8 JSON; analiz kayıtları (KPIRecord vb.) as_dict ile yazılır"""
+    return orjson.dumps(data, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Uç noktadan doğrudan döndürülür; FastAPI'nin response_model doğrulaması ve
+    jsonable_encoder dolaşımı atlanır (response_model yalnızca dokümantasyon için kalır)
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
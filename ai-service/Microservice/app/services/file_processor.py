@@ -1,25 +1,62 @@
 import pandas as pd
 import numpy as np
 import openpyxl
-import fitz
 import csv
-import json
+import io
+import logging
+import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from app.config import settings
+from app.services.tabular import TabularData
+from app.services.streaming_stats import CsvStreamAccumulator
+from app.services.csv_checkpoint import CsvCheckpointStore, ByteRangeReader, complete_length
+from app.services.csv_sampler import sample_csv
+from app.services.workbook_loader import WorkbookLoader
+from app.services.pdf_extractor import PdfExtractor
+from app.services.arrow_reader import ArrowSource, to_frame
+from app.services.json_records import iter_records, iter_frames, flatten_records, RECORD_CHUNK_ROWS
+
+logger = logging.getLogger(__name__)
+
 class FileProcessor:
-    def __init__(self):
+    def __init__(self, stream_threshold_bytes: int = None, chunk_rows: int = None, sample_rows: int = None):
+        self.stream_threshold_bytes = stream_threshold_bytes or settings.csv_stream_threshold_bytes
+        self.chunk_rows = chunk_rows or settings.csv_chunk_rows
+        self.sample_rows = sample_rows or settings.stream_sample_rows
+        # Kontrol noktası dizini verilmişse büyük CSV'lerde yalnızca sona eklenen satırlar okunur
+        self.checkpoint_store = CsvCheckpointStore(settings.csv_checkpoint_dir) if settings.csv_checkpoint_dir else None
+        self.incremental_min_bytes = settings.csv_incremental_min_bytes
+        self.workbook_loader = WorkbookLoader(
+            row_limit=settings.excel_row_limit,
+            limit_mode=settings.excel_row_limit_mode,
+            sheet_workers=settings.excel_sheet_workers
+        )
+        self.pdf_extractor = PdfExtractor(
+            workers=settings.pdf_workers,
+            pages_per_task=settings.pdf_pages_per_task,
+            parallel_min_pages=settings.pdf_parallel_min_pages,
+            max_pages=settings.pdf_max_pages
+        )
         self.supported_formats = {
             '.xlsx': self._process_excel,
             '.xls': self._process_excel,
             '.csv': self._process_csv,
             '.pdf': self._process_pdf,
-            '.json': self._process_json
+            '.json': self._process_json,
+            '.ndjson': self._process_json,
+            '.jsonl': self._process_json,
+            '.parquet': self._process_arrow,
+            '.feather': self._process_arrow,
+            '.arrow': self._process_arrow
         }
     
-    def process_file(self, file_path: str, file_type: str = None) -> Optional[Dict[str, Any]]:
+    def process_file(self, file_path: str, file_type: str = None,
+                     options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
-        Dosyayı işler ve yapılandırılmış veri döner
+        Dosyayı işler ve yapılandırılmış veri döner.
+        options: parse_options ile üretilen, işlemciye geçirilecek seçenekler
         """
         try:
             path = Path(file_path)
@@ -32,45 +69,94 @@ class FileProcessor:
                 raise ValueError(f"Unsupported file format: {extension}")
             
             processor = self.supported_formats[extension]
-            return processor(file_path)
+            return processor(file_path, **(options or {}))
             
         except Exception as e:
-            print(f"Error processing file: {e}")
+            logger.error(f"Error processing file {file_path}: {e}")
             return None
     
-    def _process_excel(self, file_path: str) -> Dict[str, Any]:
+    def parse_options(self, file_path: str, page_range: Optional[str] = None,
+                      max_pages: Optional[int] = None, mode: str = 'exact') -> Optional[Dict[str, Any]]:
+        """İstekten gelen, dosya türüne uygun parse seçenekleri"""
+        options = {}
+        extension = Path(file_path).suffix.lower()
+        if extension == '.pdf':
+            if page_range:
+                options['page_range'] = page_range
+            if max_pages:
+                options['max_pages'] = max_pages
+        elif mode == 'fast' and extension in ('.csv', '.xlsx', '.xls', '.parquet', '.feather', '.arrow'):
+            # Hızlı mod: tablo verisi örneklemden okunur, sonuçlar yaklaşık işaretlenir
+            options['sample_rows'] = settings.fast_sample_rows
+        return options or None
+    
+    def cache_options(self, options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Parse sonucunu etkileyen seçenek ve ayarlar (parse önbelleği anahtarına eklenir)"""
+        merged = dict(options or {})
+        if self.workbook_loader.row_limit:
+            merged.update({'excel_row_limit': self.workbook_loader.row_limit, 'excel_row_limit_mode': self.workbook_loader.limit_mode})
+        if self.pdf_extractor.max_pages:
+            merged.setdefault('pdf_max_pages', self.pdf_extractor.max_pages)
+        return merged or None
+    
+    def _process_excel(self, file_path: str, sample_rows: Optional[int] = None) -> Dict[str, Any]:
         """Excel dosyasını işle"""
         try:
-            # Tüm sheet'leri oku
-            excel_file = pd.ExcelFile(file_path)
+            # Çalışma kitabı tek seferde okunur; hızlı modda sheet başına rezervuar örneklemi tutulur
+            loader = self.workbook_loader
+            if sample_rows:
+                loader = WorkbookLoader(row_limit=sample_rows, limit_mode='sample',
+                                        sheet_workers=self.workbook_loader.sheet_workers)
             data = {}
             
-            for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+            for sheet_name, sheet in loader.load(file_path).items():
+                df = sheet.frame
                 data[sheet_name] = {
-                    'data': df.to_dict('records'),
+                    'data': TabularData(df),
                     'columns': df.columns.tolist(),
                     'shape': df.shape,
                     'summary': self._get_dataframe_summary(df)
                 }
+                if sheet.truncated:
+                    data[sheet_name].update({
+                        'truncated': True,
+                        'sampled': sheet.sampled,
+                        'total_rows': sheet.total_rows
+                    })
             
-            return {
+            result = {
                 'file_type': 'excel',
                 'sheets': data,
                 'total_sheets': len(data)
             }
+            if any(sheet.get('sampled') for sheet in data.values()):
+                sampled_rows = sum(sheet['shape'][0] for sheet in data.values())
+                result['sampling'] = {
+                    'method': 'reservoir',
+                    'sample_rows': sampled_rows,
+                    'estimated_total_rows': sum(sheet.get('total_rows', sheet['shape'][0]) for sheet in data.values()),
+                }
+            return result
             
         except Exception as e:
             raise Exception(f"Excel processing error: {e}")
     
-    def _process_csv(self, file_path: str) -> Dict[str, Any]:
+    def _process_csv(self, file_path: str, sample_rows: Optional[int] = None) -> Dict[str, Any]:
         """CSV dosyasını işle"""
+        if sample_rows:
+            return self._process_csv_sampled(file_path, sample_rows)
+        size = os.path.getsize(file_path)
+        if self.checkpoint_store is not None and size >= self.incremental_min_bytes:
+            return self._process_csv_incremental(file_path)
+        if size >= self.stream_threshold_bytes:
+            return self._process_csv_streaming(file_path)
+        
         try:
             df = pd.read_csv(file_path)
             
             return {
                 'file_type': 'csv',
-                'data': df.to_dict('records'),
+                'data': TabularData(df),
                 'columns': df.columns.tolist(),
                 'shape': df.shape,
                 'summary': self._get_dataframe_summary(df)
@@ -79,52 +165,193 @@ class FileProcessor:
         except Exception as e:
             raise Exception(f"CSV processing error: {e}")
     
-    def _process_pdf(self, file_path: str) -> Dict[str, Any]:
-        """PDF dosyasını işle"""
+    def _process_csv_sampled(self, file_path: str, sample_rows: int) -> Dict[str, Any]:
+        """Hızlı mod: dosyanın tamamı yerine katmanlı örneklem okunur (küçük dosyalar tam okunur)"""
+        try:
+            df, sampling = sample_csv(file_path, sample_rows, cluster_rows=settings.fast_cluster_rows)
+            result = {
+                'file_type': 'csv',
+                'data': TabularData(df),
+                'columns': df.columns.tolist(),
+                'shape': df.shape,
+                'summary': self._get_dataframe_summary(df)
+            }
+            if sampling['method'] != 'full':
+                result['sampling'] = sampling
+            return result
+            
+        except Exception as e:
+            raise Exception(f"CSV sampling error: {e}")
+    
+    def _process_csv_streaming(self, file_path: str) -> Dict[str, Any]:
+        """Büyük CSV'yi parça parça oku - bellek kullanımı dosya boyutundan bağımsız"""
         try:
-            doc = fitz.open(file_path)
-            text_content = ""
-            tables = []
+            accumulator = CsvStreamAccumulator(sample_rows=self.sample_rows)
+            for chunk in pd.read_csv(file_path, chunksize=self.chunk_rows):
+                accumulator.update(chunk)
+            
+            return self._streaming_result(accumulator)
             
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text_content += page.get_text()
+        except Exception as e:
+            raise Exception(f"CSV streaming error: {e}")
+    
+    def _process_csv_incremental(self, file_path: str) -> Dict[str, Any]:
+        """
+        Sonuna satır eklenen CSV: önceki çalıştırmanın biriktiricisi kontrol noktasından yüklenir,
+        yalnızca kaldığı bayttan sonraki satırlar okunur
+        """
+        try:
+            with open(file_path, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                checkpoint = self.checkpoint_store.load(file_path, file, size, self.sample_rows)
+                if checkpoint is not None and checkpoint.accumulator.columns:
+                    accumulator, offset = checkpoint.accumulator, checkpoint.offset
+                else:
+                    accumulator, offset = CsvStreamAccumulator(sample_rows=self.sample_rows), 0
                 
-                # Tablolar varsa çıkar
-                page_tables = page.find_tables()
-                for table in page_tables:
-                    table_data = table.extract()
-                    tables.append({
-                        'page': page_num + 1,
-                        'data': table_data
-                    })
+                # Kontrol noktası tam satır sonunda tutulur; satır sonu olmayan son satır
+                # sonuca eklenir ama kaydedilen duruma girmez (sonraki eklemede tamamlanabilir)
+                end = complete_length(file, size)
+                previous_rows = accumulator.row_count
+                if end > offset:
+                    self._read_csv_range(file, offset, end, accumulator)
+                    self.checkpoint_store.save(file_path, file, end, self.sample_rows, accumulator)
+                if size > max(end, offset):
+                    self._read_csv_range(file, max(end, offset), size, accumulator)
             
-            doc.close()
+            logger.info(f"Incremental CSV {file_path}: {accumulator.row_count - previous_rows} new rows "
+                        f"from byte {offset} ({previous_rows} rows reused)")
+            return self._streaming_result(accumulator)
             
-            return {
-                'file_type': 'pdf',
-                'text_content': text_content,
-                'tables': tables,
-                'page_count': len(doc)
+        except Exception as e:
+            raise Exception(f"CSV incremental error: {e}")
+    
+    def _read_csv_range(self, file, start: int, end: int, accumulator: CsvStreamAccumulator):
+        """[start, end) bayt aralığındaki satırları biriktiriciye ekle (start > 0 ise başlık satırı yoktur)"""
+        file.seek(start)
+        reader = io.BufferedReader(ByteRangeReader(file, end - start))
+        if start and accumulator.columns:
+            chunks = pd.read_csv(reader, chunksize=self.chunk_rows, header=None, names=accumulator.columns)
+        else:
+            chunks = pd.read_csv(reader, chunksize=self.chunk_rows)
+        for chunk in chunks:
+            accumulator.update(chunk)
+    
+    def _process_arrow(self, file_path: str, sample_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Parquet/Feather/Arrow dosyasını işle. Dosya bellek eşlemeli açılır, yalnızca analiz edilebilen
+        sütunlar okunur; büyük dosyalar CSV gibi partiler halinde biriktiriciden geçirilir.
+        """
+        try:
+            source = ArrowSource(file_path)
+            if sample_rows:
+                df = to_frame(source.sample(sample_rows))
+            elif source.data_bytes >= self.stream_threshold_bytes:
+                accumulator = CsvStreamAccumulator(sample_rows=self.sample_rows)
+                for batch in source.iter_batches(self.chunk_rows):
+                    accumulator.update(to_frame(batch))
+                result = self._streaming_result(accumulator, file_type=source.file_type)
+                if source.skipped_columns:
+                    result['skipped_columns'] = source.skipped_columns
+                return result
+            else:
+                df = to_frame(source.read())
+            
+            result = {
+                'file_type': source.file_type,
+                'data': TabularData(df),
+                'columns': df.columns.tolist(),
+                'shape': df.shape,
+                'summary': self._get_dataframe_summary(df)
             }
+            if source.skipped_columns:
+                result['skipped_columns'] = source.skipped_columns
+            if len(df) < source.num_rows:
+                result['sampling'] = {
+                    'method': 'random',
+                    'sample_rows': len(df),
+                    'estimated_total_rows': source.num_rows,
+                }
+            return result
+            
+        except Exception as e:
+            raise Exception(f"{Path(file_path).suffix.lstrip('.').capitalize()} processing error: {e}")
+    
+    def _streaming_result(self, accumulator: CsvStreamAccumulator, file_type: str = 'csv') -> Dict[str, Any]:
+        """Biriktiriciden analiz aşamalarının beklediği tek tablo çıktısı"""
+        stream_stats = accumulator.finalize()
+        shape = (stream_stats['row_count'], len(stream_stats['columns']))
+        statistics = {
+            col: {
+                'count': stats['count'], 'mean': stats['mean'], 'std': stats['std'], 'min': stats['min'],
+                '25%': stats['q1'], '50%': stats['median'], '75%': stats['q3'], 'max': stats['max']
+            }
+            for col, stats in stream_stats['numeric_stats'].items()
+        }
+        
+        return {
+            'file_type': file_type,
+            'streaming': True,
+            'data': TabularData(accumulator.sample_frame()),  # Rastgele satır örneklemi
+            'columns': stream_stats['columns'],
+            'shape': shape,
+            'summary': {
+                'row_count': shape[0],
+                'column_count': shape[1],
+                'numeric_columns': stream_stats['numeric_columns'],
+                'null_counts': stream_stats['null_counts'],
+                'data_types': stream_stats['data_types'],
+                'statistics': statistics
+            },
+            'stream_stats': stream_stats
+        }
+    
+    def _process_pdf(self, file_path: str, page_range: Optional[str] = None, max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """PDF dosyasını işle"""
+        try:
+            return self.pdf_extractor.extract(file_path, page_range=page_range, max_pages=max_pages)
             
         except Exception as e:
             raise Exception(f"PDF processing error: {e}")
     
     def _process_json(self, file_path: str) -> Dict[str, Any]:
-        """JSON dosyasını işle"""
+        """
+        JSON / NDJSON dosyasını kayıt kayıt işle. İç içe alanlar noktalı sütunlara düzleştirilir;
+        büyük dosyalar CSV gibi partiler halinde biriktiriciden geçirilir.
+        """
+        file_type = 'ndjson' if Path(file_path).suffix.lower() in ('.ndjson', '.jsonl') else 'json'
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
+            if os.path.getsize(file_path) >= self.stream_threshold_bytes:
+                return self._process_json_streaming(file_path, file_type)
+            
+            df = flatten_records(list(iter_records(file_path)))
             
             return {
-                'file_type': 'json',
-                'data': data
+                'file_type': file_type,
+                'data': TabularData(df),
+                'columns': df.columns.tolist(),
+                'shape': df.shape,
+                'summary': self._get_dataframe_summary(df)
             }
             
         except Exception as e:
             raise Exception(f"JSON processing error: {e}")
     
+    def _process_json_streaming(self, file_path: str, file_type: str) -> Dict[str, Any]:
+        """Sonraki partilerde ilk kez görülen alanlar sütun olarak eklenir, eksik alanlar boş sayılır"""
+        accumulator = CsvStreamAccumulator(sample_rows=self.sample_rows)
+        chunk_rows = min(self.chunk_rows, RECORD_CHUNK_ROWS)
+        late_fields = []
+        for frame in iter_frames(file_path, chunk_rows):
+            if accumulator.columns:
+                late_fields.extend(accumulator.add_columns(frame))
+                frame = frame.reindex(columns=accumulator.columns)
+            accumulator.update(frame)
+        if late_fields:
+            logger.info(f"JSON {file_path}: {len(late_fields)} fields first seen after record {chunk_rows} "
+                        f"were added, earlier records counted as missing")
+        return self._streaming_result(accumulator, file_type=file_type)
+    
     def _get_dataframe_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
         """DataFrame özet istatistikleri"""
         try:
@@ -144,4 +371,15 @@ class FileProcessor:
             return summary
             
         except Exception as e:
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
+
+
+def process_file_task(file_path: str, file_type: str = None,
+                      options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Süreç havuzunda çalıştırılabilen (pickle edilebilir) parse fonksiyonu"""
+    return FileProcessor().process_file(file_path, file_type, options)
+
+
+def init_parse_worker():
+    """Süreç havuzu başlatıcısı: parser'lar (pandas, openpyxl, fitz) ilk dosyadan önce yüklenir"""
+    FileProcessor()
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+HASH_BLOCK_SIZE = 1024 * 1024
+_MAX_MEMO_ENTRIES = 4096
+
+# (path, mtime_ns, size) -> içerik hash'i; dosya değişmedikçe yeniden okunmaz
+_digest_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+class FileFingerprint:
+    """Dosya yolu, mtime, boyut ve içerik hash'inden oluşan kimlik"""
+
+    __slots__ = ('path', 'mtime_ns', 'size', 'digest')
+
+    def __init__(self, path: str, mtime_ns: int, size: int, digest: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+
+    @property
+    def key(self) -> str:
+        return f"{self.path}:{self.mtime_ns}:{self.size}:{self.digest}"
+
+    def __repr__(self) -> str:
+        return f"FileFingerprint({self.path!r}, size={self.size}, digest={self.digest[:12]})"
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def file_fingerprint(file_path: str) -> FileFingerprint:
+    """Dosyanın parmak izini hesapla - içerik hash'i stat değişmedikçe tekrar hesaplanmaz"""
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    stat_key = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _memo_lock:
+        digest = _digest_memo.get(stat_key)
+        if digest is not None:
+            _digest_memo.move_to_end(stat_key)
+
+    if digest is None:
+        digest = _hash_file(path)
+        with _memo_lock:
+            _digest_memo[stat_key] = digest
+            while len(_digest_memo) > _MAX_MEMO_ENTRIES:
+                _digest_memo.popitem(last=False)
+
+    return FileFingerprint(path, stat.st_mtime_ns, stat.st_size, digest)
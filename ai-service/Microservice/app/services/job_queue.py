@@ -0,0 +1,192 @@
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from app.services.job_store import JobStore, QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED, FINISHED_STATES
+
+logger = logging.getLogger(__name__)
+
+# İlerleme yüzdesi bu aşamaların tamamlanma oranından hesaplanır
+JOB_STAGES = ('parse', 'kpis', 'trends', 'summary', 'action_items')
+
+# Bitmiş işlerin saklama süresi dolanlar bu aralıkla silinir
+PURGE_INTERVAL_SECONDS = 3600
+
+# runner(request, report_stage) -> JSON'a çevrilebilir sonuç
+JobRunner = Callable[[Dict[str, Any], Callable[[str], None]], Awaitable[Any]]
+
+
+class JobQueueFullError(Exception):
+    """Sırada bekleyen iş sayısı sınıra ulaştı"""
+
+
+class JobQueue:
+    """
+    Öncelikli ve kullanıcılar arası adil analiz iş kuyruğu.
+    En yüksek öncelikli iş seçilir; eşitlikte o an en az işi çalışan, sonra en uzun süredir
+    sırası gelmemiş kullanıcı öne geçer. En fazla `workers` iş aynı anda çalışır.
+    """
+
+    def __init__(self, store: JobStore, runner: JobRunner, workers: int = 2, max_queued: int = 1000,
+                 retention_seconds: float = 7 * 24 * 3600):
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self._queues: Dict[str, List[Tuple[int, int, str]]] = {}  # kullanıcı -> (-öncelik, sıra, iş) heap'i
+        # Sırada bekleyen iş kimlikleri; iptal ve dağıtımda yalnızca buradan çıkan iş sayılır
+        self._queued_ids: Set[str] = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._running_by_user: Dict[str, int] = {}
+        self._last_served: Dict[str, int] = {}
+        self._dispatches = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self):
+        """Yarım kalan ve sıradaki işleri kayıttan yükle, çalışanları başlat"""
+        interrupted = self.store.requeue_interrupted()
+        purged = self.store.purge_finished(self.retention_seconds)
+        for job in self.store.pending():
+            self._enqueue(job)
+        if interrupted or self._queued_ids:
+            logger.info(f"Job queue restored {len(self._queued_ids)} queued jobs ({interrupted} interrupted, {purged} purged)")
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._worker_tasks.append(asyncio.ensure_future(self._purge_periodically()))
+
+    async def stop(self):
+        """Çalışanları durdur; yarım kalan işler kayıtta 'running' kalır ve sonraki başlangıçta yeniden sıraya girer"""
+        self._stopping = True
+        tasks = self._worker_tasks + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, user_id: str, priority: int, request: Dict[str, Any]) -> Dict[str, Any]:
+        if len(self._queued_ids) >= self.max_queued:
+            raise JobQueueFullError(f"{len(self._queued_ids)} jobs already queued")
+        job = self.store.create(uuid.uuid4().hex, user_id, priority, request)
+        self._enqueue(job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Sıradaki işi iptal et ya da çalışan işi durdur; bitmiş işler olduğu gibi döner"""
+        job = self.store.get(job_id)
+        if job is None or job['status'] in FINISHED_STATES:
+            return job
+        # Heap'ten hemen silinmez; çalışan sırası geldiğinde durumu görüp atlar. Çalışanın aldığı
+        # ama henüz başlamamış (kayıtta hâlâ 'queued' olan) iş tekrar düşülmez
+        self._queued_ids.discard(job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        return self.store.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'queued': len(self._queued_ids),
+            'running': len(self._running),
+            'max_queued': self.max_queued,
+            'users_waiting': sum(1 for heap in self._queues.values() if heap),
+        }
+
+    def _enqueue(self, job: Dict[str, Any]):
+        heapq.heappush(self._queues.setdefault(job['user_id'], []), (-job['priority'], job['seq'], job['id']))
+        self._queued_ids.add(job['id'])
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pick(self) -> Optional[Tuple[str, str]]:
+        """Sıradaki (kullanıcı, iş): öncelik > kullanıcının çalışan iş sayısı > en eski hizmet > ekleme sırası"""
+        best_user, best_key = None, None
+        for user_id, heap in self._queues.items():
+            if not heap:
+                continue
+            negative_priority, seq, _ = heap[0]
+            key = (negative_priority, self._running_by_user.get(user_id, 0), self._last_served.get(user_id, 0), seq)
+            if best_key is None or key < best_key:
+                best_user, best_key = user_id, key
+        if best_user is None:
+            return None
+        _, _, job_id = heapq.heappop(self._queues[best_user])
+        if not self._queues[best_user]:
+            del self._queues[best_user]
+        return best_user, job_id
+
+    async def _worker(self):
+        while True:
+            picked = self._pick()
+            if picked is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            user_id, job_id = picked
+            job = self.store.get(job_id)
+            if job is None or job['status'] != QUEUED:
+                continue  # iptal edilmiş
+            self._queued_ids.discard(job_id)
+            self._dispatches += 1
+            self._last_served[user_id] = self._dispatches
+            self._running_by_user[user_id] = self._running_by_user.get(user_id, 0) + 1
+
+            task = asyncio.ensure_future(self._run(job))
+            self._running[job_id] = task
+            try:
+                # İptal edilen işin CancelledError'ı çalışanı durdurmasın diye wait kullanılır
+                await asyncio.wait([task])
+            finally:
+                self._running.pop(job_id, None)
+                self._running_by_user[user_id] -= 1
+                if not self._running_by_user[user_id]:
+                    del self._running_by_user[user_id]
+
+    async def _purge_periodically(self):
+        """Uzun süre çalışan serviste saklama süresi dolan bitmiş işleri düzenli olarak sil"""
+        while True:
+            await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+            try:
+                purged = self.store.purge_finished(self.retention_seconds)
+            except Exception as e:
+                logger.warning(f"Job purge failed: {e}")
+                continue
+            if purged:
+                logger.info(f"Job queue purged {purged} finished jobs")
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job['id']
+        started = time.time()
+        self.store.update(job_id, status=RUNNING, started_at=started, stage=None, stages=[], progress=0)
+        completed: List[Dict[str, Any]] = []
+        last = time.perf_counter()
+
+        def report_stage(stage: str):
+            nonlocal last
+            now = time.perf_counter()
+            completed.append({'stage': stage, 'seconds': round(now - last, 3)})
+            last = now
+            done = sum(1 for item in completed if item['stage'] in JOB_STAGES)
+            self.store.update(job_id, stage=stage, stages=completed,
+                              progress=round(100.0 * min(done, len(JOB_STAGES)) / len(JOB_STAGES), 1))
+
+        try:
+            result = await self.runner(job['request'], report_stage)
+            self.store.update(job_id, status=COMPLETED, result=result, progress=100.0, finished_at=time.time())
+        except asyncio.CancelledError:
+            if self._stopping:
+                raise
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time())
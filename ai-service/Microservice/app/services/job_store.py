@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# İş durumları
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    stage TEXT,
+    stages TEXT NOT NULL DEFAULT '[]',
+    progress REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq);
+"""
+
+_JSON_COLUMNS = ('request', 'stages', 'result')
+
+
+class JobStore:
+    """
+    Analiz işlerinin SQLite kaydı: servis yeniden başladığında sıradaki işler kaybolmaz.
+    Tüm erişim tek bağlantı üzerinden ve kilitle yapılır (yazmalar küçük ve seyrek).
+    Yol boşsa kayıt bellekte tutulur ve yeniden başlatmada kaybolur.
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = path or ':memory:'
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+
+    def create(self, job_id: str, user_id: str, priority: int, request: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            seq = self._conn.execute('SELECT COALESCE(MAX(seq), 0) + 1 FROM jobs').fetchone()[0]
+            self._conn.execute(
+                'INSERT INTO jobs (id, seq, user_id, priority, status, request, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, seq, user_id, priority, QUEUED, json.dumps(request, ensure_ascii=False), now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def update(self, job_id: str, **fields):
+        """Verilen alanları güncelle (request/stages/result JSON olarak yazılır)"""
+        if not fields:
+            return
+        values = [json.dumps(value, ensure_ascii=False) if key in _JSON_COLUMNS and value is not None else value
+                  for key, value in fields.items()]
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*values, job_id))
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Sıradaki işler (ekleme sırasıyla) - başlangıçta kuyruğu yeniden kurmak için"""
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM jobs WHERE status = ? ORDER BY seq', (QUEUED,)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def requeue_interrupted(self) -> int:
+        """Servis kapanırken yarım kalan işleri tekrar sıraya al"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE jobs SET status = ?, stage = NULL, stages = ?, progress = 0, started_at = NULL WHERE status = ?',
+                (QUEUED, '[]', RUNNING)
+            )
+        return cursor.rowcount
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Süresi dolmuş tamamlanmış/başarısız/iptal edilmiş işleri sil"""
+        cutoff = time.time() - older_than_seconds
+        placeholders = ', '.join('?' for _ in FINISHED_STATES)
+        with self._lock:
+            cursor = self._conn.execute(
+                f'DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?', (*FINISHED_STATES, cutoff)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for key in _JSON_COLUMNS:
+            if job.get(key) is not None:
+                job[key] = json.loads(job[key])
+        return job
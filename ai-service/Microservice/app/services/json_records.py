@@ -0,0 +1,205 @@
+import json
+from itertools import chain, islice
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+
+# Dosyadan bir seferde okunan karakter sayısı
+BLOCK_CHARS = 1024 * 1024
+_WHITESPACE = ' \t\r\n'
+# Akışlı okumada parti boyutu: kayıtlar Python nesnesi olduğundan CSV partisinden küçük tutulur
+RECORD_CHUNK_ROWS = 50000
+# Liste hücreleri için paylaşılan kodlayıcı (json.dumps her çağrıda yenisini kurar)
+_LIST_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+# Tamamı tampondaki blokta olmayan değer için işaret
+_INCOMPLETE = object()
+
+
+class _JsonReader:
+    """
+    Dosyadan blok blok okunan metin üzerinde sıradaki JSON değerleri. Tampon yalnızca henüz
+    işlenmemiş metni tutar; bloktan uzun bir değerde okunan miktar her denemede ikiye katlanır,
+    böylece büyük değerler de baştan tekrar tekrar çözülmez (toplam maliyet doğrusal kalır).
+    """
+
+    def __init__(self, file, block_chars: int = BLOCK_CHARS):
+        self.file = file
+        self.block_chars = block_chars
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self._fill(block_chars)
+
+    def _fill(self, chars: int):
+        more = self.file.read(chars)
+        self.eof = not more
+        self.buffer, self.pos = self.buffer[self.pos:] + more, 0
+
+    def peek(self, skip: str = _WHITESPACE) -> str:
+        """`skip` karakterlerinden sonraki ilk karakter; dosya sonunda ''"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill(self.block_chars)
+
+    def advance(self):
+        self.pos += 1
+
+    def buffered_value(self) -> Any:
+        """Sıradaki değer tampona tamamen sığıyorsa onu döner, sığmıyorsa _INCOMPLETE (tampon değişmez)"""
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            if self.eof:
+                raise
+            return _INCOMPLETE
+        # Blok sonunda biten değer (ör. yarım sayı) eksik okunmuş olabilir
+        if end == len(self.buffer) and not self.eof:
+            return _INCOMPLETE
+        self.pos = end
+        return value
+
+    def value(self) -> Any:
+        chars = self.block_chars
+        while True:
+            value = self.buffered_value()
+            if value is not _INCOMPLETE:
+                return value
+            self._fill(chars)
+            chars = max(chars, len(self.buffer))
+
+    def values(self) -> Iterator[Any]:
+        """Art arda yazılmış değerler (NDJSON)"""
+        while self.peek():
+            yield self.value()
+
+    def array_items(self) -> Iterator[Any]:
+        """Açılış '[' okunduktan sonra dizinin elemanları, tek tek"""
+        while True:
+            char = self.peek(_WHITESPACE + ',')
+            if char in ('', ']'):
+                if char:
+                    self.advance()
+                return
+            yield self.value()
+
+
+def iter_json_values(file_path: str, block_chars: int = BLOCK_CHARS) -> Iterator[Any]:
+    """
+    JSON dosyasındaki kayıtları tek tek üret: en üst düzeydeki dizi elemanları ya da
+    art arda yazılmış değerler (NDJSON). Bellekte en fazla birkaç blok ve tek kayıt tutulur.
+    """
+    with open(file_path, 'r', encoding='utf-8-sig') as file:
+        reader = _JsonReader(file, block_chars)
+        if reader.peek() == '[':
+            reader.advance()
+            yield from reader.array_items()
+        else:
+            yield from reader.values()
+
+
+def _wrapped_records(reader: _JsonReader) -> Iterator[Dict[str, Any]]:
+    """
+    Bir bloğa sığmayan üst düzey nesne ({"meta": {...}, "data": [...]}): alanlar sırayla okunur,
+    ilk elemanı nesne olan dizinin elemanları kayıt olarak akıtılır. Böyle bir dizi yoksa nesnenin kendisi tek kayıttır.
+    """
+    reader.advance()
+    fields: Dict[str, Any] = {}
+    while reader.peek(_WHITESPACE + ',') not in ('', '}'):
+        key = reader.value()
+        if reader.peek() != ':':
+            raise ValueError(f"Expected ':' after object key {key!r}")
+        reader.advance()
+        if reader.peek() != '[':
+            fields[key] = reader.value()
+            continue
+        reader.advance()
+        items = reader.array_items()
+        first = next(items, _INCOMPLETE)
+        if isinstance(first, dict):
+            yield first
+            for value in items:
+                yield value if isinstance(value, dict) else {'value': value}
+            return
+        fields[key] = ([] if first is _INCOMPLETE else [first]) + list(items)
+    yield fields
+
+
+def iter_records(file_path: str, block_chars: int = BLOCK_CHARS) -> Iterator[Dict[str, Any]]:
+    """
+    Tablo satırları: dict olmayan kayıtlar {'value': ...} olarak sarılır. Dosya tek bir nesneyse
+    ve içinde nesne listesi varsa (ör. {"data": [...]}) satırlar o listeden gelir; büyük
+    sarmalayıcı nesnelerde liste de eleman eleman okunur.
+    """
+    with open(file_path, 'r', encoding='utf-8-sig') as file:
+        reader = _JsonReader(file, block_chars)
+        first = reader.peek()
+        if first == '[':
+            reader.advance()
+            values = reader.array_items()
+        elif first == '{':
+            head = reader.buffered_value()
+            if head is _INCOMPLETE:
+                yield from _wrapped_records(reader)
+                return
+            values = chain([head], reader.values())
+        else:
+            values = reader.values()
+
+        head = list(islice(values, 2))
+        if len(head) == 1 and isinstance(head[0], dict):
+            nested = next((value for value in head[0].values()
+                           if isinstance(value, list) and value and all(isinstance(item, dict) for item in value)), None)
+            if nested is not None:
+                yield from nested
+                return
+        for value in head:
+            yield value if isinstance(value, dict) else {'value': value}
+        for value in values:
+            yield value if isinstance(value, dict) else {'value': value}
+
+
+# infer_dtype sonucu bunlardan biriyse sütunda iç içe değer yoktur (hücre hücre kontrol gerekmez)
+_SCALAR_INFERRED = frozenset({
+    'string', 'empty', 'integer', 'floating', 'mixed-integer-float', 'boolean', 'decimal', 'bytes',
+})
+
+
+def _flatten_frame(df: pd.DataFrame) -> pd.DataFrame:
+    parts: List[pd.DataFrame] = []
+    for col in df.columns:
+        values = df[col]
+        if values.dtype != 'object' or pd.api.types.infer_dtype(values, skipna=True) in _SCALAR_INFERRED:
+            parts.append(values.to_frame())
+            continue
+        is_dict = values.map(lambda value: isinstance(value, dict))
+        if is_dict.any():
+            nested = pd.DataFrame.from_records([value if flag else {} for value, flag in zip(values, is_dict)], index=df.index)
+            nested = _flatten_frame(nested)
+            parts.append(nested.rename(columns=lambda name: f"{col}.{name}"))
+        else:
+            parts.append(values.map(lambda value: _LIST_ENCODER.encode(value) if isinstance(value, list) else value).to_frame())
+    return pd.concat(parts, axis=1) if parts else df
+
+
+def flatten_records(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    İç içe kayıtları noktalı sütun adlarıyla düzleştir ('user.id'). Liste değerleri JSON metni
+    olarak tutulur ki kategorik sayaçlar hash'leyebilsin. Düz sütunlar hücre hücre dolaşılmaz.
+    """
+    return _flatten_frame(pd.DataFrame.from_records(records)).infer_objects()
+
+
+def iter_frames(file_path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Kayıtları `chunk_rows` satırlık düzleştirilmiş DataFrame partileri halinde üret"""
+    records = iter_records(file_path)
+    while True:
+        batch = list(islice(records, chunk_rows))
+        if not batch:
+            return
+        yield flatten_records(batch)
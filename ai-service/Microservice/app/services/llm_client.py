@@ -0,0 +1,339 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.config import settings
+from app.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LLM_REQUESTS = registry.counter(
+    'report_agent_llm_requests_total', 'LLM completion attempts by outcome', ('outcome',)
+)
+
+# Tekrar denenebilecek hatalar (429, zaman aşımı, bağlantı, 5xx)
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError, asyncio.TimeoutError)
+
+
+class LLMUnavailableError(Exception):
+    """LLM kapalı, sıra bekleme süresi aşıldı ya da tekrar denemeler tükendi"""
+
+
+class TokenBucket:
+    """İstek/dakika sınırı; jetonlar önceden ayrılır, bekleme süresi çağırana döner"""
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """Bir jeton ayır ve beklenmesi gereken süreyi döndür; max_wait aşılırsa ayırma yapılmaz"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if wait > max_wait:
+                raise LLMUnavailableError(f"LLM rate limit wait {wait:.1f}s exceeds {max_wait:.1f}s")
+            self._tokens -= 1.0
+            return wait
+
+    def refund(self):
+        """Kullanılmadan bırakılan jetonu geri koy"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1.0)
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+class _SharedCall:
+    """Aynı istemi bekleyen çağıranların paylaştığı tek LLM isteği"""
+
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: "asyncio.Future[str]"):
+        self.task = task
+        self.waiters = 0
+
+
+class LLMClient:
+    """Süreç genelinde paylaşılan, bağlantı havuzlu ve eşzamanlılığı sınırlı chat completion istemcisi"""
+
+    def __init__(self, api_key: str = "", enabled: bool = True, model: str = "gpt-3.5-turbo",
+                 max_concurrency: int = 4, requests_per_minute: int = 60, burst: int = 10,
+                 timeout_seconds: float = 30.0, max_retries: int = 3, acquire_timeout_seconds: float = 10.0,
+                 max_connections: int = 20, backoff_base_seconds: float = 0.5, backoff_max_seconds: float = 20.0):
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max(0, max_retries)
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.bucket = TokenBucket(max(1, requests_per_minute) / 60.0, burst)
+        self.enabled = bool(enabled and api_key)
+
+        self.client: Optional[AsyncOpenAI] = None
+        if self.enabled:
+            # SDK'nın kendi tekrar denemesi kapalı: bütçe ve bekleme burada yönetilir
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=httpx.Timeout(timeout_seconds, connect=min(10.0, timeout_seconds)),
+            )
+            self.client = AsyncOpenAI(api_key=api_key, max_retries=0, timeout=timeout_seconds,
+                                      http_client=http_client)
+
+        # asyncio.Semaphore ilk kullanıldığı event loop'a bağlanır; loop değişirse yeniden oluşturulur
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        # Eşzamanlı gelen aynı istemler tek isteğe indirilir (istem anahtarı -> paylaşılan çağrı)
+        self._shared: Dict[str, _SharedCall] = {}
+        self._in_flight = 0
+        self._waiting = 0
+
+    @classmethod
+    def from_settings(cls) -> "LLMClient":
+        return cls(
+            api_key=settings.openai_api_key,
+            enabled=settings.llm_enabled,
+            model=settings.llm_model,
+            max_concurrency=settings.llm_max_concurrency,
+            requests_per_minute=settings.llm_requests_per_minute,
+            burst=settings.llm_burst,
+            timeout_seconds=settings.llm_timeout_seconds,
+            max_retries=settings.llm_max_retries,
+            acquire_timeout_seconds=settings.llm_acquire_timeout_seconds,
+            max_connections=settings.llm_max_connections,
+            backoff_base_seconds=settings.llm_backoff_base_seconds,
+            backoff_max_seconds=settings.llm_backoff_max_seconds,
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+            self._shared = {}
+        return self._semaphore
+
+    async def _acquire(self, semaphore: asyncio.Semaphore):
+        """Hız sınırı jetonu ve eşzamanlılık slotu al; bekleme süresi aşılırsa LLMUnavailableError"""
+        wait = self.bucket.reserve(self.acquire_timeout_seconds)
+        # Slot alınamazsa istek gönderilmez; ayrılan jeton sonraki isteklere kalır
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.acquire_timeout_seconds)
+            finally:
+                self._waiting -= 1
+        except asyncio.TimeoutError:
+            self.bucket.refund()
+            LLM_REQUESTS.inc(outcome='queue_timeout')
+            raise LLMUnavailableError("Timed out waiting for an LLM slot")
+        except asyncio.CancelledError:
+            self.bucket.refund()
+            raise
+        self._in_flight += 1
+
+    def _release(self, semaphore: asyncio.Semaphore):
+        self._in_flight -= 1
+        semaphore.release()
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Tekrar denenecekse bekleme süresi; bütçe bittiyse LLMUnavailableError"""
+        LLM_REQUESTS.inc(outcome='retryable_error')
+        if attempt >= self.max_retries:
+            raise LLMUnavailableError(f"LLM request failed after {attempt + 1} attempts: {error}") from error
+        delay = self._backoff(attempt, error)
+        logger.warning(f"LLM request failed ({type(error).__name__}), retrying in {delay:.2f}s")
+        return delay
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int = 500,
+                       temperature: float = 0.7) -> str:
+        """
+        Chat completion; 429/5xx/zaman aşımında jitter'lı üstel geri çekilme ile tekrar dener.
+        Aynı istem zaten yanıt bekliyorsa yeni istek gönderilmez, o isteğin sonucu paylaşılır.
+        """
+        if not self.enabled:
+            raise LLMUnavailableError("LLM client is disabled")
+
+        semaphore = self._get_semaphore()
+        key = json.dumps([messages, max_tokens, temperature], ensure_ascii=False, sort_keys=True)
+        shared = self._shared.get(key)
+        if shared is None:
+            shared = _SharedCall(asyncio.ensure_future(self._complete(semaphore, messages, max_tokens, temperature)))
+            self._shared[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget(key, shared))
+        else:
+            LLM_REQUESTS.inc(outcome='coalesced')
+
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        finally:
+            # Bekleyen kalmadıysa (ör. istemci ayrıldı) istek iptal edilir
+            shared.waiters -= 1
+            if not shared.waiters and not shared.task.done():
+                shared.task.cancel()
+
+    def _forget(self, key: str, shared: _SharedCall):
+        if self._shared.get(key) is shared:
+            del self._shared[key]
+
+    async def _complete(self, semaphore: asyncio.Semaphore, messages: List[Dict[str, str]],
+                        max_tokens: int, temperature: float) -> str:
+        """Tek bir chat completion isteği (tekrar denemeleriyle)"""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(semaphore)
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature
+                    ),
+                    self.timeout_seconds
+                )
+                LLM_REQUESTS.inc(outcome='success')
+                return response.choices[0].message.content.strip()
+            except RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(attempt, e)
+            except Exception:
+                LLM_REQUESTS.inc(outcome='error')
+                raise
+            finally:
+                self._release(semaphore)
+
+            # Geri çekilme sırasında slot bırakılır; başka istekler ilerleyebilir
+            await asyncio.sleep(delay)
+
+        raise LLMUnavailableError("LLM retry budget exhausted")
+
+    async def stream(self, messages: List[Dict[str, str]], max_tokens: int = 500,
+                     temperature: float = 0.7) -> AsyncIterator[str]:
+        """
+        Chat completion'ı parça parça verir. İlk parça gelmeden oluşan hatalar tekrar denenir;
+        sonrasında tekrar denemek metni çoğaltacağından hata LLMUnavailableError olarak iletilir.
+        Parçalar arası bekleme de timeout_seconds ile sınırlıdır.
+        """
+        if not self.enabled:
+            raise LLMUnavailableError("LLM client is disabled")
+
+        semaphore = self._get_semaphore()
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(semaphore)
+            started = False
+            response = None
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stream=True
+                    ),
+                    self.timeout_seconds
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout_seconds)
+                    except StopAsyncIteration:
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        started = True
+                        yield delta
+                LLM_REQUESTS.inc(outcome='success')
+                return
+            except RETRYABLE_ERRORS as e:
+                if started:
+                    LLM_REQUESTS.inc(outcome='error')
+                    raise LLMUnavailableError(f"LLM stream interrupted: {e}") from e
+                delay = self._retry_delay(attempt, e)
+            except Exception:
+                LLM_REQUESTS.inc(outcome='error')
+                raise
+            finally:
+                # Tüketici akışı erken bırakırsa bağlantı havuza geri verilir
+                try:
+                    if response is not None:
+                        await response.close()
+                finally:
+                    self._release(semaphore)
+
+            await asyncio.sleep(delay)
+
+        raise LLMUnavailableError("LLM retry budget exhausted")
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """
+        Tam jitter'lı üstel bekleme; sunucu Retry-After gönderdiyse en az o kadar.
+        Retry-After backoff_max_seconds'ı aşarsa beklemek yerine LLMUnavailableError.
+        """
+        delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            if retry_after > self.backoff_max_seconds:
+                raise LLMUnavailableError(
+                    f"LLM asked to retry after {retry_after:.1f}s, more than {self.backoff_max_seconds:.1f}s"
+                ) from error
+            delay = max(delay, retry_after)
+        return min(delay, self.backoff_max_seconds)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Retry-After başlığı (saniye ya da HTTP tarihi) saniye olarak; yoksa/okunamazsa None"""
+        response = getattr(error, 'response', None)
+        value = response.headers.get('retry-after') if response is not None else None
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'in_flight': self._in_flight,
+            'waiting': self._waiting,
+            'max_concurrency': self.max_concurrency,
+            'shared_requests': len(self._shared),
+            'rate_tokens_available': round(self.bucket.available(), 2),
+        }
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
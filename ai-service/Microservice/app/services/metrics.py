@@ -0,0 +1,244 @@
+import contextvars
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = tuple(float(2 ** power) for power in range(24, 36))  # 16 MB .. 32 GB
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_bytes() -> int:
+    """Sürecin anlık RSS'i (Linux'ta /proc, diğerlerinde tepe RSS)"""
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Etiketli, yalnızca artan sayaç"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Etiketli, sabit kovalı histogram (Prometheus kümülatif kova biçimi)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # kova sayıları + [toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    bucket_labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(cumulative)}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Süreç genelindeki metrikler; /metrics uç noktası Prometheus metin biçiminde döker"""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DURATION_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, gauges: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """Kayıtlı metrikler + anlık değerler (ör. önbellek istatistikleri) gauge olarak"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, values in (gauges or {}).items():
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'report_agent_stage_duration_seconds', 'Duration of analysis pipeline stages', ('stage',)
+)
+REQUEST_SECONDS = registry.histogram(
+    'report_agent_request_duration_seconds', 'Duration of instrumented HTTP requests', ('endpoint', 'status')
+)
+REQUEST_PEAK_RSS = registry.histogram(
+    'report_agent_request_peak_rss_bytes', 'Highest process RSS observed at stage boundaries of a request',
+    ('endpoint',), buckets=BYTES_BUCKETS
+)
+ROWS_PROCESSED = registry.counter(
+    'report_agent_rows_processed_total', 'Rows (PDF: pages) parsed from uploaded files', ('file_type',)
+)
+BYTES_PROCESSED = registry.counter(
+    'report_agent_bytes_processed_total', 'Bytes of uploaded files parsed', ('file_type',)
+)
+STAGE_ERRORS = registry.counter(
+    'report_agent_stage_errors_total', 'Analysis stages that raised an exception', ('stage',)
+)
+
+
+class RequestTrace:
+    """Bir isteğin aşama süreleri ve gözlenen tepe RSS'i"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.peak_rss = current_rss_bytes()
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float):
+        rss = current_rss_bytes()
+        with self._lock:
+            self.stages.append((name, seconds))
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing başlığı: aşama adı ve milisaniye cinsinden süre"""
+        with self._lock:
+            stages = list(self.stages)
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ', '.join(parts)
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar('request_trace', default=None)
+
+
+def start_request(endpoint: str) -> Tuple[RequestTrace, contextvars.Token]:
+    trace = RequestTrace(endpoint)
+    return trace, _current_trace.set(trace)
+
+
+def finish_request(trace: RequestTrace, token: contextvars.Token, status: int):
+    _current_trace.reset(token)
+    REQUEST_SECONDS.observe(trace.elapsed(), endpoint=trace.endpoint, status=str(status))
+    REQUEST_PEAK_RSS.observe(float(max(trace.peak_rss, current_rss_bytes())), endpoint=trace.endpoint)
+
+
+@contextmanager
+def stage(name: str):
+    """Aşama süresini histograma ve (varsa) aktif isteğin dökümüne yazar"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(name, seconds)
+
+
+async def timed(name: str, awaitable):
+    """Bir awaitable'ı aşama olarak ölçer (gather ile eşzamanlı yürüyen aşamalar için)"""
+    with stage(name):
+        return await awaitable
+
+
+def record_input(file_data: Optional[Dict[str, Any]], file_path: str):
+    """Parse edilen dosyanın satır ve byte sayısını say"""
+    if not file_data:
+        return
+    try:
+        file_bytes = os.path.getsize(file_path)
+    except OSError:
+        file_bytes = 0
+    file_type = file_data.get('file_type', 'unknown')
+    if file_type == 'excel':
+        rows = sum(sheet.get('shape', (0,))[0] for sheet in file_data.get('sheets', {}).values())
+    elif file_type == 'pdf':
+        rows = file_data.get('processed_pages', file_data.get('page_count', 0))
+    elif 'shape' in file_data:
+        rows = file_data['shape'][0]
+    else:
+        rows = len(file_data.get('data') or [])
+    ROWS_PROCESSED.inc(rows, file_type=file_type)
+    BYTES_PROCESSED.inc(file_bytes, file_type=file_type)
@@ -1,71 +1,145 @@
-from openai import AsyncOpenAI
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional
 import json
 import asyncio
+import logging
 
 from app.config import settings
+from app.services.analysis_context import AnalysisContext
+from app.services.chunk_index import ChunkIndex
+from app.services.tabular import TABLE_FILE_TYPES
+from app.services.llm_client import LLMClient
+from app.services.worker_pool import WorkerPool, run_blocking
+from app.services.metrics import stage
 
-class OpenAIService:
-    def __init__(self):
+logger = logging.getLogger(__name__)
+
+ANALYST_SYSTEM_PROMPT = "Sen bir iş analisti ve veri uzmanısın. Türkçe cevap ver."
+# LLM cevap veremediğinde dönen metin (önbelleğe alınmaz)
+ANSWER_UNAVAILABLE_MESSAGE = "Sorunuzla ilgili analiz yapıldı ancak detaylı cevap şu anda verilemedi. Temel veri incelemesi tamamlandı."
 
-        self.client = None
-    async def get_analysis_insights(self, prompt: str) -> str:
-        """Analiz için OpenAI'den insights al"""
-        if not self.client:
-            return self._get_mock_analysis_response()
+class OpenAIService:
+    def __init__(self, worker_pool: WorkerPool = None, llm_client: LLMClient = None):
+        # Paylaşılan istemci verilmezse ayarlardan oluşturulur (bağımsız kullanım için)
+        self.llm = llm_client if llm_client is not None else LLMClient.from_settings()
+        self.worker_pool = worker_pool
+    
+    @property
+    def llm_enabled(self) -> bool:
+        return self.llm.enabled
+    
+    async def get_analysis_insights(self, prompt: str, fallback: bool = True) -> Optional[str]:
+        """Analiz için OpenAI'den insights al (fallback=False ise hata/kapalıyken None)"""
+        if not self.llm_enabled:
+            return self._get_mock_analysis_response() if fallback else None
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Sen bir iş analisti ve veri uzmanısın. Türkçe cevap ver."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content.strip()
+            with stage('llm_insights'):
+                return await self.llm.complete(
+                    [
+                        {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=500,
+                    temperature=0.7
+                )
             
         except Exception as e:
-            print(f"OpenAI API error: {e}")
-            return self._get_mock_analysis_response()
+            logger.error(f"OpenAI API error: {e}")
+            return self._get_mock_analysis_response() if fallback else None
     
-    async def ask_question(self, file_data: Dict[str, Any], question: str) -> str:
-        """Dosya hakkında soru sor"""
-        if not self.client:
-            return self._get_mock_question_response(question, file_data)
+    async def suggest_action_items(self, prompt: str) -> List[Dict[str, Any]]:
+        """LLM'den JSON dizi olarak eylem önerileri al (kapalıyken/hata durumunda boş liste)"""
+        if not self.llm_enabled:
+            return []
         
         try:
-            # Dosya verisini özet olarak hazırla
-            data_summary = self._prepare_data_summary(file_data)
-            
-            prompt = f"""
-            Aşağıdaki veri analizi sonuçlarına dayanarak kullanıcının sorusunu cevapla:
+            with stage('llm_action_items'):
+                content = await self.llm.complete(
+                    [
+                        {"role": "system", "content": ANALYST_SYSTEM_PROMPT + " Yalnızca geçerli JSON döndür."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=400,
+                    temperature=0.4
+                )
             
-            Veri Özeti:
-            {data_summary}
+            # Model JSON'u kod bloğu içinde döndürebilir
+            start, end = content.find('['), content.rfind(']')
+            items = json.loads(content[start:end + 1]) if start != -1 and end > start else []
+            return [item for item in items if isinstance(item, dict)]
             
-            Kullanıcının Sorusu: {question}
-            
-            Lütfen veri analiz sonuçlarına dayanarak detaylı ve faydalı bir cevap ver.
-            """
-            
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Sen bir veri analisti ve business intelligence uzmanısın. Türkçe cevap ver."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"OpenAI action item error: {e}")
+            return []
+    
+    async def ask_question(self, file_data: Dict[str, Any], question: str,
+                           context: Optional[AnalysisContext] = None, index: Optional[ChunkIndex] = None) -> str:
+        """Dosya hakkında soru sor (indeks verilirse yalnızca soruyla ilgili parçalar gönderilir)"""
+        if not self.llm_enabled:
+            # Veri tabanlı cevap pandas yoğun - event loop'u bloklamamak için havuzda üret
+            return await run_blocking(self.worker_pool, self._get_mock_question_response, question, file_data, context)
+        
+        try:
+            with stage('llm_answer'):
+                return await self.llm.complete(
+                    self._question_messages(file_data, question, index),
+                    max_tokens=300,
+                    temperature=0.7
+                )
             
         except Exception as e:
-            print(f"OpenAI API error: {e}")
-            return f"Sorunuzla ilgili analiz yapıldı ancak detaylı cevap şu anda verilemedi. Temel veri incelemesi tamamlandı."
+            logger.error(f"OpenAI API error: {e}")
+            return ANSWER_UNAVAILABLE_MESSAGE
+    
+    async def stream_answer(self, file_data: Dict[str, Any], question: str,
+                            context: Optional[AnalysisContext] = None,
+                            index: Optional[ChunkIndex] = None) -> AsyncIterator[str]:
+        """ask_question'ın parça parça hali; LLM kapalıyken veri tabanlı cevap tek parça olarak gelir"""
+        if not self.llm_enabled:
+            yield await run_blocking(self.worker_pool, self._get_mock_question_response, question, file_data, context)
+            return
+        
+        emitted = False
+        try:
+            with stage('llm_answer'):
+                async for delta in self.llm.stream(
+                    self._question_messages(file_data, question, index),
+                    max_tokens=300,
+                    temperature=0.7
+                ):
+                    emitted = True
+                    yield delta
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            # Metnin bir kısmı gönderildiyse yedek cevap eklenemez; hata çağırana iletilir
+            if emitted:
+                raise
+            yield ANSWER_UNAVAILABLE_MESSAGE
+    
+    def _question_messages(self, file_data: Dict[str, Any], question: str,
+                           index: Optional[ChunkIndex] = None) -> List[Dict[str, str]]:
+        """Soru-cevap için LLM mesajları (indeks varsa yalnızca ilgili parçalar)"""
+        # Dosya verisini özet olarak hazırla
+        if index is not None:
+            data_summary = index.build_context(question, settings.ask_context_tokens, settings.ask_top_k)
+        else:
+            data_summary = self._prepare_data_summary(file_data)
+        
+        prompt = f"""
+        Aşağıdaki veri analizi sonuçlarına dayanarak kullanıcının sorusunu cevapla:
+        
+        Veri Özeti:
+        {data_summary}
+        
+        Kullanıcının Sorusu: {question}
+        
+        Lütfen veri analiz sonuçlarına dayanarak detaylı ve faydalı bir cevap ver.
+        """
+        
+        return [
+            {"role": "system", "content": "Sen bir veri analisti ve business intelligence uzmanısın. Türkçe cevap ver."},
+            {"role": "user", "content": prompt}
+        ]
     
     def _prepare_data_summary(self, file_data: Dict[str, Any]) -> str:
         """Dosya verisini özet olarak hazırla"""
@@ -92,12 +166,13 @@ class OpenAIService:
         Bu analiz temel istatistiksel yöntemler kullanılarak gerçekleştirildi.
         """
     
-    def _get_mock_question_response(self, question: str, file_data: Dict[str, Any]) -> str:
+    def _get_mock_question_response(self, question: str, file_data: Dict[str, Any],
+                                    context: Optional[AnalysisContext] = None) -> str:
         """Gerçek veriye dayalı soru cevaplama"""
         question_lower = question.lower()
         
         # Dosya verilerini analiz et
-        stats_summary = self._analyze_file_data_for_questions(file_data)
+        stats_summary = self._analyze_file_data_for_questions(file_data, context)
         
         # Ana bulgular soruları
         if any(word in question_lower for word in ['ana bulgular', 'ana bulgu', 'temel bulgular', 'sonuçlar']):
@@ -171,7 +246,8 @@ class OpenAIService:
             • "Hangi trendler var?"
             """
     
-    def _analyze_file_data_for_questions(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_file_data_for_questions(self, file_data: Dict[str, Any],
+                                         context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """Dosya verilerini soru cevaplama için analiz et"""
         summary = {
             'total_rows': 0,
@@ -189,52 +265,32 @@ class OpenAIService:
         }
         
         try:
-            if file_data.get('file_type') in ['csv', 'excel']:
+            if file_data.get('file_type') == 'excel' or file_data.get('file_type') in TABLE_FILE_TYPES:
                 # CSV/Excel verilerini analiz et
-                if 'data' in file_data and file_data['data']:
-                    import pandas as pd
-                    df = pd.DataFrame(file_data['data'])
-                    
-                    summary['total_rows'] = len(df)
-                    
-                    # Numerik sütunları tespit et (daha gelişmiş)
-                    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+                context = context or AnalysisContext(file_data)
+                sheet = context.main
+                if sheet is not None:
+                    summary['total_rows'] = sheet.row_count
                     
-                    # String sütunları sayıya çevirmeyi dene
-                    for col in df.columns:
-                        if col not in numeric_cols and df[col].dtype == 'object':
-                            try:
-                                # Virgülleri nokta yap ve sayıya çevir
-                                converted = pd.to_numeric(df[col].astype(str).str.replace(',', '.'), errors='coerce')
-                                if not converted.isna().all():
-                                    df[col] = converted
-                                    numeric_cols.append(col)
-                            except:
-                                continue
+                    # Numerik sütunlar + sayıya çevrilebilen string sütunlar (virgül -> nokta)
+                    numeric_cols = sheet.native_numeric_columns + sheet.convertible_columns
+                    df = sheet.frame_with(numeric_cols)
                     
                     summary['numeric_columns'] = len(numeric_cols)
                     
                     # Zaman bilgisi tespit et
-                    date_cols = []
-                    for col in df.columns:
-                        if any(word in col.lower() for word in ['tarih', 'date', 'time', 'zaman']):
-                            try:
-                                df[col] = pd.to_datetime(df[col], errors='coerce')
-                                if not df[col].isna().all():
-                                    date_cols.append(col)
-                                    min_date = df[col].min()
-                                    max_date = df[col].max()
-                                    summary['time_period'] = f"{min_date.strftime('%Y-%m-%d')} - {max_date.strftime('%Y-%m-%d')}"
-                            except:
-                                continue
+                    date_cols = sheet.date_columns
+                    for col in date_cols:
+                        dates = sheet.parse_dates(col)
+                        summary['time_period'] = f"{dates.min().strftime('%Y-%m-%d')} - {dates.max().strftime('%Y-%m-%d')}"
                     
                     if len(numeric_cols) > 0:
                         # Ana istatistikler - daha detaylı
                         stats_text = []
                         for col in numeric_cols[:3]:  # İlk 3 sütun
-                            clean_data = df[col].dropna()
-                            if len(clean_data) > 0:
-                                mean_val = clean_data.mean()
+                            stats = sheet.column_stats(col)
+                            if stats['count'] > 0:
+                                mean_val = stats['mean']
                                 if mean_val > 1000000:
                                     stats_text.append(f"• {col.replace('_', ' ').title()}: Ort. {mean_val/1000000:.1f}M")
                                 elif mean_val > 1000:
@@ -246,18 +302,16 @@ class OpenAIService:
                         # Gelişmiş trend bilgisi
                         trend_texts = []
                         for col in numeric_cols[:2]:  # İlk 2 sütun için trend
-                            clean_data = df[col].dropna()
-                            if len(clean_data) > 1:
-                                std_val = clean_data.std()
-                                mean_val = clean_data.mean()
+                            stats = sheet.column_stats(col)
+                            if stats['count'] > 1:
+                                std_val = stats['std']
+                                mean_val = stats['mean']
                                 cv = (std_val / mean_val * 100) if mean_val != 0 else 0
                                 
                                 # Zaman serisi trend analizi
-                                if date_cols and len(clean_data) > 5:
-                                    df_sorted = df.sort_values(date_cols[0])
-                                    values = df_sorted[col].dropna()
-                                    first_quarter = values.head(len(values)//4).mean()
-                                    last_quarter = values.tail(len(values)//4).mean()
+                                quarters = sheet.quarter_means(col, date_cols[0]) if date_cols and stats['count'] > 5 else None
+                                if quarters is not None:
+                                    first_quarter, last_quarter, _ = quarters
                                     
                                     if last_quarter > first_quarter * 1.1:
                                         trend_texts.append(f"📈 **{col.replace('_', ' ').title()}**: Artış trendi (%{((last_quarter-first_quarter)/first_quarter*100):.1f})")
@@ -278,39 +332,40 @@ class OpenAIService:
                         # KPI bilgisi - daha anlamlı
                         kpi_texts = []
                         for col in numeric_cols[:3]:
-                            clean_data = df[col].dropna()
-                            if len(clean_data) > 0:
-                                total_val = clean_data.sum()
-                                count_val = len(clean_data)
-                                unit = "MWh" if 'mwh' in col.lower() else ""
+                            stats = sheet.column_stats(col)
+                            if stats['count'] > 0:
+                                total_val = stats['sum']
+                                count_val = stats['count']
+                                unit = sheet.schema.unit(col)
                                 kpi_texts.append(f"🔢 **{col.replace('_', ' ').title()}**: Toplam {total_val:,.0f} {unit}, {count_val} kayıt")
                         summary['kpi_info'] = '\n            '.join(kpi_texts)
                         
                         # Ekstrem değerler
                         extreme_texts = []
                         for col in numeric_cols[:2]:
-                            clean_data = df[col].dropna()
-                            if len(clean_data) > 0:
-                                max_val = clean_data.max()
-                                min_val = clean_data.min()
+                            stats = sheet.column_stats(col)
+                            if stats['count'] > 0:
+                                max_val = stats['max']
+                                min_val = stats['min']
                                 extreme_texts.append(f"📊 **{col.replace('_', ' ').title()}**: En Yüksek {max_val:,.2f}, En Düşük {min_val:,.2f}")
                         summary['extremes'] = '\n            '.join(extreme_texts)
                         
                         summary['analysis_count'] = len(numeric_cols)
                     
                     # Kategorik veri analizi
-                    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+                    categorical_cols = [col for col in df.select_dtypes(include=['object']).columns
+                                        if col not in date_cols]
                     categorical_info = []
                     for col in categorical_cols[:2]:  # İlk 2 kategorik sütun
                         if col not in date_cols:  # Tarih sütunları hariç
-                            unique_count = df[col].nunique()
-                            most_common = df[col].mode().iloc[0] if len(df[col].mode()) > 0 else "N/A"
+                            unique_count, most_common, _ = sheet.category_profile(col)
+                            most_common = most_common if most_common is not None else "N/A"
                             categorical_info.append(f"📋 **{col.replace('_', ' ').title()}**: {unique_count} farklı değer, En yaygın: {most_common}")
                     summary['categorical_info'] = '\n            '.join(categorical_info)
                     
                     # Öneriler - daha akıllı
                     recommendations = []
-                    missing_count = df.isnull().sum().sum()
+                    missing_count = sheet.missing_cells
                     if missing_count > 0:
                         recommendations.append(f"🔴 **Yüksek Öncelik**: {missing_count} eksik veri tespit edildi, tamamlanması önerilir")
                     
@@ -333,7 +388,7 @@ class OpenAIService:
                     summary['recommendations'] = '\n            '.join(recommendations)
                     
                     # Veri kalitesi değerlendirmesi
-                    missing_ratio = df.isnull().sum().sum() / (len(df) * len(df.columns))
+                    missing_ratio = sheet.missing_cells / (sheet.row_count * sheet.column_count)
                     if missing_ratio > 0.1:
                         summary['data_quality'] = f'İyileştirilebilir (%{missing_ratio*100:.1f} eksik veri)'
                     elif missing_ratio > 0.05:
@@ -343,7 +398,7 @@ class OpenAIService:
                     
                     # Genel veri insights
                     insights = []
-                    if len(df) > 1000:
+                    if sheet.row_count > 1000:
                         insights.append("📊 Büyük veri seti - istatistiksel analizler güvenilir")
                     if len(numeric_cols) > 3:
                         insights.append("🔢 Çok sayıda numerik sütun - kapsamlı metrik analizi mümkün")
@@ -355,7 +410,7 @@ class OpenAIService:
                     summary['data_insights'] = ' | '.join(insights)
         
         except Exception as e:
-            print(f"Question analysis error: {str(e)}")
+            logger.error(f"Question analysis error: {str(e)}")
             summary['main_stats'] = f'Analiz hatası: {str(e)}'
             
         return summary
\ No newline at end of file
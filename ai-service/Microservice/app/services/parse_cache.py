@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.fingerprint import file_fingerprint, FileFingerprint
+from app.services.tabular import TabularData
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+
+# FileProcessor çıktısının biçimi değiştiğinde artırılır; eski bellek/disk girdileri eşleşmez
+PARSE_FORMAT_VERSION = 5
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Parse sonucunun bellekte kapladığı yaklaşık byte miktarı"""
+    if isinstance(value, TabularData):
+        return int(value.frame.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 64 + sum(estimate_nbytes(v) for v in value)
+    if isinstance(value, str):
+        return 49 + len(value)
+    return 32
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ParseCache:
+    """
+    Parse sonuçları için içerik adresli önbellek.
+    Bellek katmanı byte bütçeli LRU; disk katmanı (opsiyonel) tabloları Parquet olarak saklar.
+    Dönen file_data paylaşımlıdır, çağıranlar değiştirmemelidir.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_writes': 0, 'disk_errors': 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get_or_load(self, file_path: str, loader: Callable[[], Optional[Dict[str, Any]]],
+                    options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Önbellekte varsa döner, yoksa loader ile parse edip saklar"""
+        try:
+            fingerprint = file_fingerprint(file_path)
+        except OSError:
+            # Dosya yoksa/okunamıyorsa hatayı işlemciye bırak
+            return loader()
+
+        options_key = self._options_key(options)
+        memory_key = f"{fingerprint.key}|{options_key}"
+
+        cached = self._get_memory(memory_key)
+        if cached is not None:
+            return cached
+
+        # Aynı dosya için eşzamanlı parse'ları tek işleme indir
+        with self._lock:
+            key_lock = self._inflight.setdefault(memory_key, threading.Lock())
+
+        with key_lock:
+            try:
+                cached = self._get_memory(memory_key)
+                if cached is not None:
+                    return cached
+
+                disk_path = self._disk_path(fingerprint, options_key)
+                file_data = self._read_disk(disk_path)
+                if file_data is not None:
+                    with self._lock:
+                        self._stats['disk_hits'] += 1
+                    self._put_memory(memory_key, file_data)
+                    return file_data
+
+                with self._lock:
+                    self._stats['misses'] += 1
+
+                file_data = loader()
+                if file_data is not None:
+                    self._put_memory(memory_key, file_data)
+                    self._write_disk(disk_path, file_data)
+                return file_data
+            finally:
+                with self._lock:
+                    self._inflight.pop(memory_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss sayaçları ve doluluk bilgisi"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'memory_bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'disk_enabled': self.disk_dir is not None,
+            })
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    # --- bellek katmanı ---
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._stats['memory_hits'] += 1
+            return entry[0]
+
+    def _put_memory(self, key: str, file_data: Dict[str, Any]):
+        nbytes = estimate_nbytes(file_data)
+        if nbytes > self.max_bytes:
+            logger.info(f"Parse result ({nbytes} bytes) exceeds memory cache budget, not cached in memory")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (file_data, nbytes)
+            self._current_bytes += nbytes
+            while self._current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_bytes
+                self._stats['evictions'] += 1
+
+    # --- disk katmanı ---
+
+    @staticmethod
+    def _options_key(options: Optional[Dict[str, Any]]) -> str:
+        if not options:
+            return f"v{PARSE_FORMAT_VERSION}-default"
+        encoded = json.dumps(options, sort_keys=True, default=str).encode('utf-8')
+        return f"v{PARSE_FORMAT_VERSION}-{hashlib.blake2b(encoded, digest_size=8).hexdigest()}"
+
+    def _disk_path(self, fingerprint: FileFingerprint, options_key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, f"{fingerprint.digest}-{options_key}")
+
+    def _read_disk(self, directory: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not directory or not os.path.exists(os.path.join(directory, META_FILE)):
+            return None
+        try:
+            with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            return self._decode(meta, directory)
+        except Exception as e:
+            logger.warning(f"Parse cache disk read failed ({directory}): {e}")
+            with self._lock:
+                self._stats['disk_errors'] += 1
+            return None
+
+    def _write_disk(self, directory: Optional[str], file_data: Dict[str, Any]):
+        if not directory or os.path.exists(directory):
+            return
+        tmp_dir = f"{directory}.tmp-{uuid.uuid4().hex}"
+        try:
+            os.makedirs(tmp_dir)
+            frames = []
+            meta = self._encode(file_data, frames)
+            for name, frame in frames:
+                frame.to_parquet(os.path.join(tmp_dir, name), index=False)
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as file:
+                json.dump(meta, file, ensure_ascii=False, default=_json_default)
+            os.replace(tmp_dir, directory)
+            with self._lock:
+                self._stats['disk_writes'] += 1
+            self._enforce_disk_budget()
+        except Exception as e:
+            logger.warning(f"Parse cache disk write skipped ({directory}): {e}")
+            with self._lock:
+                self._stats['disk_errors'] += 1
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _enforce_disk_budget(self):
+        """Disk bütçesi aşılırsa en eski girdileri sil"""
+        if not self.disk_max_bytes:
+            return
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if not os.path.isdir(path) or '.tmp-' in name:
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+            total += size
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def _encode(self, value: Any, frames: list) -> Any:
+        if isinstance(value, TabularData):
+            name = f"table_{len(frames)}.parquet"
+            frames.append((name, value.frame))
+            return {'__tabular__': name}
+        if isinstance(value, dict):
+            return {str(k): self._encode(v, frames) for k, v in value.items()}
+        if isinstance(value, tuple):
+            return {'__tuple__': [self._encode(v, frames) for v in value]}
+        if isinstance(value, list):
+            return [self._encode(v, frames) for v in value]
+        return value
+
+    def _decode(self, value: Any, directory: str) -> Any:
+        if isinstance(value, dict):
+            if '__tabular__' in value:
+                return TabularData(pd.read_parquet(os.path.join(directory, value['__tabular__'])))
+            if '__tuple__' in value:
+                return tuple(self._decode(v, directory) for v in value['__tuple__'])
+            return {k: self._decode(v, directory) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._decode(v, directory) for v in value]
+        return value
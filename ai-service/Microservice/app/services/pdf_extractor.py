@@ -0,0 +1,165 @@
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Tuple
+
+import fitz
+
+from app.services.text_stats import TextStats
+
+PAGE_RANGE_PATTERN = r'^\s*\d+\s*(-\s*\d*\s*)?(,\s*\d+\s*(-\s*\d*\s*)?)*$'
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Sayfa grupları için paylaşılan süreç havuzu (ilk kullanımda oluşturulur)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def parse_page_range(spec: Optional[str], page_count: int) -> List[int]:
+    """'1-5,8,10-' biçimindeki 1 tabanlı aralığı 0 tabanlı sayfa listesine çevirir"""
+    if not spec:
+        return list(range(page_count))
+    if not re.match(PAGE_RANGE_PATTERN, spec):
+        raise ValueError(f"Invalid page range: {spec}")
+
+    pages = set()
+    for part in spec.split(','):
+        start, _, end = part.partition('-')
+        first = int(start)
+        last = int(end) if end.strip() else (page_count if '-' in part else first)
+        pages.update(range(max(first, 1) - 1, min(last, page_count)))
+    return sorted(pages)
+
+
+def looks_tabular(page: "fitz.Page", min_edges: int = 2) -> bool:
+    """
+    Ucuz ön kontrol: find_tables varsayılan olarak vektör çizgilerinden tablo çıkarır,
+    yatay ve dikey çizgisi olmayan sayfada tablo aranmaz.
+    """
+    horizontal = vertical = 0
+    for path in page.get_cdrawings():
+        for item in path.get('items', ()):
+            if item[0] == 're':
+                horizontal += 2
+                vertical += 2
+            elif item[0] == 'l':
+                start, end = item[1], item[2]
+                if abs(start[1] - end[1]) < 1:
+                    horizontal += 1
+                elif abs(start[0] - end[0]) < 1:
+                    vertical += 1
+            if horizontal >= min_edges and vertical >= min_edges:
+                return True
+    return False
+
+
+def extract_pages(file_path: str, page_numbers: List[int], min_edges: int = 2) -> Tuple[List[str], List[Dict[str, Any]], int]:
+    """Süreç havuzunda çalışır: verilen sayfaların metni, tabloları ve tablo aranan sayfa sayısı"""
+    texts = []
+    tables = []
+    scanned = 0
+    with fitz.open(file_path) as doc:
+        for page_num in page_numbers:
+            page = doc.load_page(page_num)
+            texts.append(page.get_text())
+
+            # Tablolar varsa çıkar (yalnızca tablo görünümlü sayfalarda)
+            if not looks_tabular(page, min_edges):
+                continue
+            scanned += 1
+            for table in page.find_tables():
+                tables.append({
+                    'page': page_num + 1,
+                    'data': table.extract()
+                })
+    return texts, tables, scanned
+
+
+class PdfExtractor:
+    """
+    PDF metin ve tablo çıkarıcı.
+    Sayfalar gruplara bölünüp süreç havuzunda işlenir; find_tables yalnızca çizgi içeren sayfalarda çalışır.
+    """
+
+    def __init__(self, workers: int = 1, pages_per_task: int = 32, parallel_min_pages: int = 64,
+                 max_pages: int = 0, min_edges: int = 2):
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.parallel_min_pages = parallel_min_pages
+        self.max_pages = max_pages
+        self.min_edges = min_edges
+
+    def extract(self, file_path: str, page_range: Optional[str] = None, max_pages: Optional[int] = None) -> Dict[str, Any]:
+        with fitz.open(file_path) as doc:
+            page_count = len(doc)
+
+        pages = parse_page_range(page_range, page_count)
+        limit = max_pages or self.max_pages
+        if limit:
+            pages = pages[:limit]
+
+        batches = [pages[i:i + self.pages_per_task] for i in range(0, len(pages), self.pages_per_task)]
+        if self.workers > 1 and len(pages) >= self.parallel_min_pages and len(batches) > 1:
+            results = self._extract_parallel(file_path, batches)
+        else:
+            results = [extract_pages(file_path, batch, self.min_edges) for batch in batches]
+
+        texts: List[str] = []
+        tables: List[Dict[str, Any]] = []
+        scanned = 0
+        # Metin istatistikleri sayfalar sırayla gelirken biriktirilir
+        text_stats = TextStats()
+        for batch_texts, batch_tables, batch_scanned in results:
+            for text in batch_texts:
+                text_stats.update(text)
+            texts.extend(batch_texts)
+            tables.extend(batch_tables)
+            scanned += batch_scanned
+
+        # [sayfa no (1 tabanlı), text_content içindeki başlangıç] - soru-cevap parçaları sayfaya bağlanır
+        page_offsets = []
+        offset = 0
+        for page_num, text in zip(pages, texts):
+            page_offsets.append([page_num + 1, offset])
+            offset += len(text)
+
+        result = {
+            'file_type': 'pdf',
+            'text_content': ''.join(texts),
+            'tables': tables,
+            'page_count': page_count,
+            'processed_pages': len(pages),
+            'table_scanned_pages': scanned,
+            'page_offsets': page_offsets,
+            'text_stats': text_stats.summary()
+        }
+        if len(pages) < page_count:
+            result['truncated'] = True
+        return result
+
+    def _extract_parallel(self, file_path: str, batches: List[List[int]]) -> List[Tuple[List[str], List[Dict[str, Any]], int]]:
+        try:
+            pool = _get_pool(self.workers)
+            futures = [pool.submit(extract_pages, file_path, batch, self.min_edges) for batch in batches]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            # Çöken havuz bir sonraki istekte yeniden kurulur; bu istek sıralı işlenir
+            _reset_pool()
+            return [extract_pages(file_path, batch, self.min_edges) for batch in batches]
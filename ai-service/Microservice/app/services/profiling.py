@@ -0,0 +1,46 @@
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.streaming_stats import CategoricalStats
+
+# Korelasyon: geniş sheet'lerde ilk N sayısal sütun, uzun sheet'lerde eşit aralıklı N satır kullanılır
+CORRELATION_MAX_COLUMNS = 64
+CORRELATION_MAX_ROWS = 50000
+CORRELATION_TOP_PAIRS = 10
+# Kategorik profil: sınırlı sayaç (Misra-Gries) + HyperLogLog, sütun parça parça beslenir
+CATEGORY_TOP_VALUES = 10
+CATEGORY_SKETCH_CAPACITY = 256
+CATEGORY_CHUNK_ROWS = 100000
+
+
+def top_correlations(df: pd.DataFrame, numeric_cols: List[Any], top_pairs: int = CORRELATION_TOP_PAIRS,
+                     max_columns: int = CORRELATION_MAX_COLUMNS, max_rows: int = CORRELATION_MAX_ROWS) -> List[Dict[str, Any]]:
+    """Mutlak değerce en güçlü korelasyonlu sütun çiftleri (tüm matris yerine)"""
+    cols = list(numeric_cols[:max_columns])
+    if len(cols) < 2:
+        return []
+    frame = df[cols]
+    if len(frame) > max_rows:
+        frame = frame.iloc[np.linspace(0, len(frame) - 1, max_rows).astype('int64')]
+    matrix = frame.corr().to_numpy()
+
+    first, second = np.triu_indices(len(cols), k=1)
+    values = matrix[first, second]
+    finite = np.isfinite(values)
+    first, second, values = first[finite], second[finite], values[finite]
+    order = np.argsort(-np.abs(values), kind='stable')[:top_pairs]
+    return [
+        {'columns': [str(cols[first[i]]), str(cols[second[i]])], 'correlation': round(float(values[i]), 4)}
+        for i in order
+    ]
+
+
+def categorical_profile(values: pd.Series, top_values: int = CATEGORY_TOP_VALUES,
+                        capacity: int = CATEGORY_SKETCH_CAPACITY, chunk_rows: int = CATEGORY_CHUNK_ROWS) -> Dict[str, Any]:
+    """Sayım, farklı değer tahmini ve en sık değerler - bellek sütunun kardinalitesinden bağımsız"""
+    stats = CategoricalStats(capacity)
+    for start in range(0, len(values), chunk_rows):
+        stats.update(values.iloc[start:start + chunk_rows])
+    return stats.summary(top_values)
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.services.fingerprint import file_fingerprint
+
+
+class AnalysisResultStore:
+    """Dosya parmak izi + analyzer sürümüne göre analiz sonuçlarını TTL'li LRU olarak saklar"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, version: str):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def key_for(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Analiz anahtarı; dosya okunamıyorsa None (önbellek atlanır)"""
+        try:
+            fingerprint = file_fingerprint(file_path)
+        except OSError:
+            return None
+        extra = ','.join(f"{k}={options[k]}" for k in sorted(options)) if options else ''
+        return f"{fingerprint.digest}:{fingerprint.size}:{self.version}:{extra}"
+
+    def get(self, key: Optional[str]) -> Optional[Any]:
+        if key is None or self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            stored_at, result = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return result
+
+    def put(self, key: Optional[str], result: Any):
+        if key is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, key: Optional[str]):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            stats['ttl_seconds'] = self.ttl_seconds
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from typing import Any, List, Tuple
+
+
+class Reservoir:
+    """
+    Vektörize rezervuar örnekleme (Algorithm R).
+    Gelen her parti için hangi satırın hangi slota yazılacağını planlar; veriyi çağıran saklar.
+    """
+
+    def __init__(self, capacity: int, seed: int = 0):
+        self.capacity = capacity
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def plan(self, batch_len: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(slot indeksleri, parti içi pozisyonlar) döner"""
+        start = self.seen
+        self.seen += batch_len
+
+        fill = max(0, min(batch_len, self.capacity - start))
+        slots = np.arange(start, start + fill)
+        positions = np.arange(fill)
+
+        if fill < batch_len:
+            rest = np.arange(fill, batch_len)
+            # Global indeksi i olan satır k/(i+1) olasılıkla rastgele bir slota yazılır
+            draws = self._rng.integers(0, start + rest + 1)
+            accepted = draws < self.capacity
+            slots = np.concatenate([slots, draws[accepted]])
+            positions = np.concatenate([positions, rest[accepted]])
+            # Aynı slota birden çok yazım varsa sıralı semantik gereği sonuncusu kalır
+            _, last = np.unique(slots[::-1], return_index=True)
+            keep = np.sort(len(slots) - 1 - last)
+            slots, positions = slots[keep], positions[keep]
+
+        return slots, positions
+
+
+class ValueReservoir(Reservoir):
+    """Sayısal değerler için rezervuar - yaklaşık quantile hesabında kullanılır"""
+
+    def __init__(self, capacity: int, seed: int = 0):
+        super().__init__(capacity, seed)
+        self.values = np.empty(0, dtype='float64')
+
+    def update(self, values: np.ndarray):
+        slots, positions = self.plan(len(values))
+        if not len(slots):
+            return
+        size = max(len(self.values), int(slots.max()) + 1)
+        if size > len(self.values):
+            self.values = np.concatenate([self.values, np.empty(size - len(self.values))])
+        self.values[slots] = values[positions]
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        if not len(self.values):
+            return [float('nan')] * len(qs)
+        return [float(v) for v in np.quantile(self.values, qs)]
+
+
+class TopKCounter:
+    """
+    Misra-Gries (birleştirilebilir özet) ile sınırlı bellekte sık değer sayımı.
+    Tahminler alt sınırdır; hata en fazla toplam / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.total = 0
+        self.exact = True
+
+    def update(self, values: pd.Series):
+        if len(values):
+            self.update_counts(values.value_counts(sort=False))
+
+    def update_counts(self, batch: pd.Series):
+        """Önceden sayılmış (değer -> adet) partiyi özete ekle"""
+        merged = self.counts.add(batch, fill_value=0)
+        if len(merged) > self.capacity:
+            threshold = merged.nlargest(self.capacity + 1).iloc[-1]
+            merged = merged[merged > threshold] - threshold
+            self.exact = False
+        self.counts = merged.astype('int64')
+        self.total += int(batch.sum())
+
+    def top(self, k: int) -> List[Tuple[Any, int]]:
+        top = self.counts.nlargest(k)
+        return [(value, int(count)) for value, count in top.items()]
+
+
+def _leading_zeros(values: np.ndarray) -> np.ndarray:
+    """uint64 dizisinde baştaki sıfır bit sayısı; float64'e çevirmeden (2^k'nın hemen altı yuvarlanmaz) ikili aramayla"""
+    values = values.copy()
+    zeros = np.zeros(len(values), dtype='uint8')
+    for shift in (32, 16, 8, 4, 2, 1):
+        # Üstteki `shift` bit sıfırsa say ve sola kaydır
+        top_clear = values < np.uint64(1 << (64 - shift))
+        zeros[top_clear] += shift
+        values[top_clear] <<= np.uint64(shift)
+    return zeros
+
+
+class HyperLogLog:
+    """Sabit bellekli (2^p register) yaklaşık farklı değer sayacı"""
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype='uint8')
+
+    def update(self, values: Any, unique: bool = False):
+        """unique=True: değerler zaten tekil (ör. value_counts index'i), tekrar gruplanmaz"""
+        values = np.asarray(values, dtype=object)
+        if not len(values):
+            return
+        hashes = pd.util.hash_array(values, categorize=not unique).astype('uint64')
+        index = (hashes >> np.uint64(64 - self.p)).astype('int64')
+        remaining = (hashes << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        np.maximum.at(self.registers, index, _leading_zeros(remaining) + 1)
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype('float64')))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return float(self.m * np.log(self.m / zeros))  # Küçük aralık düzeltmesi
+        return float(raw)
@@ -0,0 +1,13 @@
+from typing import Any
+
+from app.services.fast_json import dumps
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Proxy'lerin (nginx) olayları tamponlamaması için
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Server-Sent Events biçiminde tek olay; veri JSON olarak tek satırda gönderilir"""
+    payload = dumps(data).decode("utf-8")
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,329 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional
+
+from app.services.column_schema import infer_schema
+from app.services.sketches import Reservoir, ValueReservoir, TopKCounter, HyperLogLog
+
+
+class OrderedBlockSums:
+    """
+    Değerleri geliş sırasıyla (count, sum) bloklarında tutar. Blok sayısı max_blocks'u aşınca
+    komşu bloklar birleştirilir; böylece ilk/son çeyrek ortalamaları sabit bellekle hesaplanır.
+    """
+
+    def __init__(self, max_blocks: int = 1024, block_size: int = 16):
+        self.max_blocks = max_blocks
+        self.block_size = block_size
+        self.counts: List[int] = []
+        self.sums: List[float] = []
+        self._pending_count = 0
+        self._pending_sum = 0.0
+
+    def update(self, values: np.ndarray):
+        if not len(values):
+            return
+        need = self.block_size - self._pending_count
+        head, rest = values[:need], values[need:]
+        self._pending_count += len(head)
+        self._pending_sum += float(head.sum())
+        if self._pending_count >= self.block_size:
+            self._flush_pending()
+
+        full = len(rest) // self.block_size
+        if full:
+            block_sums = rest[:full * self.block_size].reshape(full, self.block_size).sum(axis=1)
+            self.counts.extend([self.block_size] * full)
+            self.sums.extend(block_sums.tolist())
+        tail = rest[full * self.block_size:]
+        self._pending_count += len(tail)
+        self._pending_sum += float(tail.sum())
+
+        while len(self.counts) > self.max_blocks:
+            self._compact()
+
+    def _flush_pending(self):
+        self.counts.append(self._pending_count)
+        self.sums.append(self._pending_sum)
+        self._pending_count = 0
+        self._pending_sum = 0.0
+
+    def _compact(self):
+        counts, sums = self.counts, self.sums
+        self.counts = [counts[i] + (counts[i + 1] if i + 1 < len(counts) else 0) for i in range(0, len(counts), 2)]
+        self.sums = [sums[i] + (sums[i + 1] if i + 1 < len(sums) else 0.0) for i in range(0, len(sums), 2)]
+        self.block_size *= 2
+
+    def _blocks(self):
+        counts = self.counts + ([self._pending_count] if self._pending_count else [])
+        sums = self.sums + ([self._pending_sum] if self._pending_count else [])
+        return counts, sums
+
+    @staticmethod
+    def _prefix_mean(counts: List[int], sums: List[float], k: int) -> float:
+        taken, total = 0, 0.0
+        for count, block_sum in zip(counts, sums):
+            if taken + count <= k:
+                taken += count
+                total += block_sum
+            else:
+                # Kısmi blok: blok ortalamasıyla orantılı pay
+                total += block_sum * (k - taken) / count
+                taken = k
+            if taken >= k:
+                break
+        return total / k if k else float('nan')
+
+    def head_mean(self, k: int) -> float:
+        counts, sums = self._blocks()
+        return self._prefix_mean(counts, sums, k)
+
+    def tail_mean(self, k: int) -> float:
+        counts, sums = self._blocks()
+        return self._prefix_mean(counts[::-1], sums[::-1], k)
+
+
+class RunningColumnStats:
+    """Sayısal sütun için artımlı istatistikler (Welford/Chan ortalama ve varyans birleştirme)"""
+
+    def __init__(self, reservoir_size: int = 10000, seed: int = 0):
+        self.count = 0
+        self.nulls = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.reservoir = ValueReservoir(reservoir_size, seed)
+        self.blocks = OrderedBlockSums()
+
+    def update(self, values: np.ndarray):
+        mask = ~np.isnan(values)
+        clean = values[mask]
+        self.nulls += len(values) - len(clean)
+        if not len(clean):
+            return
+
+        batch_count = len(clean)
+        batch_mean = float(clean.mean())
+        batch_m2 = float(((clean - batch_mean) ** 2).sum())
+        delta = batch_mean - self.mean
+        new_count = self.count + batch_count
+        self.mean += delta * batch_count / new_count
+        self.m2 += batch_m2 + delta * delta * self.count * batch_count / new_count
+        self.count = new_count
+
+        self.total += float(clean.sum())
+        self.minimum = min(self.minimum, float(clean.min()))
+        self.maximum = max(self.maximum, float(clean.max()))
+        self.reservoir.update(clean)
+        self.blocks.update(clean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+    def summary(self) -> Dict[str, Any]:
+        q1, median, q3 = self.reservoir.quantiles([0.25, 0.5, 0.75])
+        quarter = self.count // 4
+        return {
+            'count': self.count,
+            'nulls': self.nulls,
+            'sum': self.total,
+            'mean': self.mean if self.count else float('nan'),
+            'std': self.std,
+            'min': self.minimum if self.count else float('nan'),
+            'max': self.maximum if self.count else float('nan'),
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            # Dosya sırasına göre ilk/son çeyrek ortalamaları (tarih sıralıysa trend için kullanılır)
+            'first_quarter_mean': self.blocks.head_mean(quarter) if quarter else float('nan'),
+            'last_quarter_mean': self.blocks.tail_mean(quarter) if quarter else float('nan'),
+        }
+
+
+class CategoricalStats:
+    """Kategorik sütun için sınırlı bellekli sayaçlar"""
+
+    def __init__(self, top_k_capacity: int = 256):
+        self.count = 0
+        self.nulls = 0
+        self.top = TopKCounter(top_k_capacity)
+        self.distinct = HyperLogLog()
+
+    def update(self, values: pd.Series):
+        clean = values.dropna()
+        self.nulls += len(values) - len(clean)
+        self.count += len(clean)
+        if not len(clean):
+            return
+        # Parti bir kez sayılır; HLL yalnızca tekil değerleri hash'ler
+        batch = clean.value_counts(sort=False)
+        self.top.update_counts(batch)
+        self.distinct.update(batch.index.to_numpy(), unique=True)
+
+    def summary(self, top_k: int = 10) -> Dict[str, Any]:
+        # Sayaç taşmadıysa farklı değer sayısı kesindir; tahmin dolu satır sayısını aşamaz
+        distinct = len(self.top.counts) if self.top.exact else min(int(round(self.distinct.estimate())), self.count)
+        return {
+            'count': self.count,
+            'nulls': self.nulls,
+            'distinct': distinct,
+            'distinct_exact': self.top.exact,
+            'top_values': [[str(value), count] for value, count in self.top.top(top_k)],
+        }
+
+
+class CsvStreamAccumulator:
+    """CSV parçalarını tek geçişte işleyip sütun istatistikleri ve satır örneklemi biriktirir"""
+
+    def __init__(self, sample_rows: int = 10000, seed: int = 0):
+        self.columns: List[str] = []
+        self.data_types: Dict[str, str] = {}
+        self.numeric_columns: List[str] = []
+        self.coerced_columns: List[str] = []
+        self.object_columns: List[str] = []
+        self.date_column: Optional[str] = None
+        self.date_format: Optional[str] = None
+        self.date_sorted = True
+        self._last_date = None
+        self._date_min = None
+        self._date_max = None
+        self.row_count = 0
+        self.null_counts: Dict[str, int] = {}
+        self.numeric: Dict[str, RunningColumnStats] = {}
+        self.categorical: Dict[str, CategoricalStats] = {}
+        self._row_reservoir = Reservoir(sample_rows, seed)
+        self._sample: Optional[pd.DataFrame] = None
+        self._slot_index = pd.Index([], dtype='int64')
+
+    def _init_schema(self, chunk: pd.DataFrame):
+        """Sütun rolleri ilk parçanın örnekleminden bir kez çıkarılır, sonraki parçalar aynı şemayla işlenir"""
+        schema = infer_schema(chunk)
+        self.columns = chunk.columns.tolist()
+        self.data_types = chunk.dtypes.astype(str).to_dict()
+        self.null_counts = {col: 0 for col in self.columns}
+        native = chunk.select_dtypes(include=['number']).columns.tolist()
+        self.object_columns = [col for col in self.columns if chunk[col].dtype == 'object']
+
+        if native:
+            self.numeric_columns = native
+        else:
+            # Sayısal sütun yoksa virgüllü sayı içeren string sütunları sayıya çevir
+            self.coerced_columns = [col for col in self.object_columns if col in schema.convertible_columns]
+            self.numeric_columns = list(self.coerced_columns)
+
+        for col in self.numeric_columns:
+            self.numeric[col] = RunningColumnStats()
+        for col in self.object_columns:
+            self.categorical[col] = CategoricalStats()
+
+        self.date_column = schema.date_column
+        if self.date_column is not None:
+            self.date_format = schema.date_format(self.date_column)
+
+    def add_columns(self, chunk: pd.DataFrame) -> List[str]:
+        """
+        Sonraki bir parçada ilk kez görülen sütunları şemaya ekle; önceki satırlar bu sütunlarda
+        boş sayılır. Rol, sütunun bu parçadaki tipinden belirlenir.
+        """
+        added = [col for col in chunk.columns if col not in self.null_counts]
+        for col in added:
+            dtype = chunk[col].dtype
+            numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            self.columns.append(col)
+            self.data_types[col] = str(dtype)
+            self.null_counts[col] = self.row_count
+            if numeric:
+                self.numeric_columns.append(col)
+                self.numeric[col] = RunningColumnStats()
+                self.numeric[col].nulls = self.row_count
+            elif dtype == 'object':
+                self.object_columns.append(col)
+                self.categorical[col] = CategoricalStats()
+                self.categorical[col].nulls = self.row_count
+            if self._sample is not None:
+                self._sample[col] = pd.Series(index=self._sample.index, dtype='float64' if numeric else 'object')
+        return added
+
+    @staticmethod
+    def _coerce(values: pd.Series) -> pd.Series:
+        return pd.to_numeric(values.astype(str).str.replace(',', '.'), errors='coerce')
+
+    def update(self, chunk: pd.DataFrame):
+        if not self.columns:
+            self._init_schema(chunk)
+
+        for col, nulls in chunk.isnull().sum().items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + int(nulls)
+
+        for col, stats in self.numeric.items():
+            values = chunk[col]
+            if col in self.coerced_columns:
+                values = self._coerce(values)
+            elif values.dtype == 'object':
+                values = pd.to_numeric(values, errors='coerce')
+            stats.update(values.to_numpy(dtype='float64', na_value=np.nan))
+
+        for col, stats in self.categorical.items():
+            stats.update(chunk[col])
+
+        if self.date_column is not None:
+            self._update_dates(chunk[self.date_column])
+
+        self._update_sample(chunk)
+        self.row_count += len(chunk)
+
+    def _update_dates(self, values: pd.Series):
+        dates = pd.to_datetime(values, format=self.date_format, errors='coerce').dropna()
+        if dates.empty:
+            return
+        if self.date_sorted:
+            if not dates.is_monotonic_increasing or (self._last_date is not None and dates.iloc[0] < self._last_date):
+                self.date_sorted = False
+        self._last_date = dates.iloc[-1]
+        self._date_min = dates.min() if self._date_min is None else min(self._date_min, dates.min())
+        self._date_max = dates.max() if self._date_max is None else max(self._date_max, dates.max())
+
+    def _update_sample(self, chunk: pd.DataFrame):
+        slots, positions = self._row_reservoir.plan(len(chunk))
+        if not len(slots):
+            return
+        rows = chunk.iloc[positions].reset_index(drop=True)
+        if self._sample is None:
+            self._sample = rows
+            self._slot_index = pd.Index(slots)
+            return
+        new_slots = ~np.isin(slots, self._slot_index)
+        if new_slots.any():
+            self._sample = pd.concat([self._sample, rows[new_slots]], ignore_index=True)
+            self._slot_index = self._slot_index.append(pd.Index(slots[new_slots]))
+        replace = ~new_slots
+        if replace.any():
+            targets = self._slot_index.get_indexer(slots[replace])
+            self._sample.iloc[targets] = rows[replace].to_numpy()
+
+    def sample_frame(self) -> pd.DataFrame:
+        """Tüm dosyayı temsil eden rastgele satır örneklemi"""
+        if self._sample is None:
+            return pd.DataFrame(columns=self.columns)
+        return self._sample.infer_objects()
+
+    def finalize(self) -> Dict[str, Any]:
+        """Analiz aşamalarının kullandığı, JSON'a çevrilebilir özet"""
+        return {
+            'row_count': self.row_count,
+            'columns': self.columns,
+            'numeric_columns': self.numeric_columns,
+            'coerced_columns': self.coerced_columns,
+            'object_columns': self.object_columns,
+            'date_column': self.date_column,
+            'date_sorted': self.date_column is not None and self.date_sorted,
+            'date_range': [str(self._date_min), str(self._date_max)] if self._date_min is not None else None,
+            'null_counts': self.null_counts,
+            'data_types': self.data_types,
+            'numeric_stats': {col: stats.summary() for col, stats in self.numeric.items()},
+            'categorical_stats': {col: stats.summary() for col, stats in self.categorical.items()},
+        }
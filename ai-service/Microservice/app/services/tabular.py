@@ -0,0 +1,60 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Iterator, Optional
+
+# Tek tablodan oluşan dosya türleri - analizde 'main' adlı tek sheet olarak işlenir (JSON kayıtları düzleştirilir)
+TABLE_FILE_TYPES = ('csv', 'parquet', 'feather', 'arrow', 'json', 'ndjson')
+
+
+class TabularData:
+    """DataFrame tabanlı kolonsal tablo - JSON kayıtları yalnızca istenirse üretilir"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __bool__(self) -> bool:
+        return len(self.frame) > 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Kayıtları tek tek üret (tüm listeyi belleğe almadan)"""
+        return self.iter_records()
+
+    @property
+    def columns(self) -> List[str]:
+        return self.frame.columns.tolist()
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    def column(self, name: str) -> np.ndarray:
+        """Sütunu NumPy dizisi olarak döner (mümkünse kopyasız)"""
+        return self.frame[name].to_numpy()
+
+    def iter_records(self, chunk_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """Kayıtları parça parça dict olarak üret"""
+        for start in range(0, len(self.frame), chunk_size):
+            for record in self.frame.iloc[start:start + chunk_size].to_dict('records'):
+                yield record
+
+    def to_records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Eski `df.to_dict('records')` çıktısı - sadece gerçekten gerekiyorsa kullanın"""
+        frame = self.frame if limit is None else self.frame.head(limit)
+        return frame.to_dict('records')
+
+    def to_json(self, limit: Optional[int] = None) -> str:
+        """JSON kayıt listesi (NaN -> null, tarihler ISO formatında)"""
+        frame = self.frame if limit is None else self.frame.head(limit)
+        return frame.to_json(orient='records', date_format='iso', force_ascii=False)
+
+
+def as_frame(data: Any) -> pd.DataFrame:
+    """TabularData ya da eski kayıt listesinden DataFrame elde et"""
+    if isinstance(data, TabularData):
+        return data.frame
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data)
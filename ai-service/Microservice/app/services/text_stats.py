@@ -0,0 +1,122 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from app.services.sketches import Reservoir, ValueReservoir
+
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+CURRENCY_PATTERN = re.compile(r'([\$€£¥₺])\s*(\d+(?:,\d{3})*(?:\.\d{2})?)')
+PERCENTAGE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)%')
+FINANCIAL_PATTERN = re.compile(r'revenue|profit|income', re.IGNORECASE)
+# Yüzde histogramı aralıkları: [0-1), [1-5), ..., [100-)
+PERCENTAGE_BINS = (0.0, 1.0, 5.0, 10.0, 25.0, 50.0, 100.0)
+# Sayı ve para birimi için saklanan örnek değer sayısı
+EXAMPLE_VALUES = 100
+
+
+def _bin_labels() -> List[str]:
+    edges = [f"{edge:g}" for edge in PERCENTAGE_BINS]
+    return [f"{low}-{high}" for low, high in zip(edges, edges[1:])] + [f"{edges[-1]}+"]
+
+
+PERCENTAGE_LABELS = _bin_labels()
+
+
+class TextStats:
+    """PDF metni için sayfa sayfa beslenen sınırlı bellekli sayaçlar"""
+
+    def __init__(self, examples: int = EXAMPLE_VALUES, seed: int = 0):
+        self.pages = 0
+        self.word_count = 0
+        self.number_count = 0
+        self.number_sum = 0.0
+        self.number_min = float('inf')
+        self.number_max = float('-inf')
+        self.number_examples = ValueReservoir(examples, seed)
+        self.currency_counts: Dict[str, int] = {}
+        self.currency_totals: Dict[str, float] = {}
+        self.currency_examples: List[str] = []
+        self._currency_reservoir = Reservoir(examples, seed)
+        self.percentage_counts = np.zeros(len(PERCENTAGE_LABELS), dtype='int64')
+        self.financial_terms = False
+
+    def update(self, text: str):
+        self.pages += 1
+        self.word_count += len(text.split())
+        self._update_numbers(NUMBER_PATTERN.findall(text))
+        self._update_currencies(CURRENCY_PATTERN.findall(text))
+
+        percentages = PERCENTAGE_PATTERN.findall(text)
+        if percentages:
+            bins = np.searchsorted(PERCENTAGE_BINS, np.asarray(percentages, dtype='float64'), side='right') - 1
+            self.percentage_counts += np.bincount(bins, minlength=len(PERCENTAGE_LABELS))
+
+        if not self.financial_terms:
+            self.financial_terms = FINANCIAL_PATTERN.search(text) is not None
+
+    def _update_numbers(self, matches: List[str]):
+        if not matches:
+            return
+        values = np.asarray(matches, dtype='float64')
+        self.number_count += len(values)
+        self.number_sum += float(values.sum())
+        self.number_min = min(self.number_min, float(values.min()))
+        self.number_max = max(self.number_max, float(values.max()))
+        self.number_examples.update(values)
+
+    def _update_currencies(self, matches: List[tuple]):
+        if not matches:
+            return
+        for symbol, amount in matches:
+            self.currency_counts[symbol] = self.currency_counts.get(symbol, 0) + 1
+            self.currency_totals[symbol] = self.currency_totals.get(symbol, 0.0) + float(amount.replace(',', ''))
+        # Rezervuar slotları sırayla dolar; dolduktan sonra mevcut örneklerin yerine yazılır
+        slots, positions = self._currency_reservoir.plan(len(matches))
+        for slot, position in zip(slots, positions):
+            symbol, amount = matches[position]
+            if slot < len(self.currency_examples):
+                self.currency_examples[slot] = f"{symbol}{amount}"
+            else:
+                self.currency_examples.append(f"{symbol}{amount}")
+
+    def summary(self) -> Dict[str, Any]:
+        currency_count = sum(self.currency_counts.values())
+        return {
+            'pages': self.pages,
+            'word_count': self.word_count,
+            'numbers': {
+                'count': self.number_count,
+                'sum': self.number_sum,
+                'min': self.number_min if self.number_count else None,
+                'max': self.number_max if self.number_count else None,
+                'examples': [float(value) for value in self.number_examples.values],
+            },
+            'currencies': {
+                'count': currency_count,
+                'by_symbol': dict(self.currency_counts),
+                'totals': dict(self.currency_totals),
+                'examples': list(self.currency_examples),
+            },
+            'percentages': {
+                'count': int(self.percentage_counts.sum()),
+                'histogram': dict(zip(PERCENTAGE_LABELS, (int(count) for count in self.percentage_counts))),
+            },
+            'has_financial_data': currency_count > 0 or self.financial_terms,
+        }
+
+
+def analyze_pages(pages: Iterable[str]) -> Dict[str, Any]:
+    """Sayfa metinlerini tek geçişte işle - bellek kullanımı sayfa sayısından bağımsız"""
+    stats = TextStats()
+    for text in pages:
+        stats.update(text)
+    return stats.summary()
+
+
+def iter_page_texts(file_data: Dict[str, Any]) -> Iterator[str]:
+    """text_content'i page_offsets sınırlarından sayfa sayfa dilimle (kopyayı sayfa boyutunda tutar)"""
+    text = file_data.get('text_content') or ''
+    starts = [offset for _, offset in file_data.get('page_offsets') or []] or [0]
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        yield text[start:end]
@@ -0,0 +1,193 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from app.services.sketches import Reservoir
+
+ROW_BATCH = 4096
+
+
+class SheetRows:
+    """Bir sheet'ten okunan ham satırlar"""
+
+    def __init__(self, name: str, header: Tuple, rows: List[Tuple], total_rows: int, sampled: bool):
+        self.name = name
+        self.header = header
+        self.rows = rows
+        self.total_rows = total_rows
+        self.sampled = sampled
+
+
+class LoadedSheet:
+    """DataFrame'e dönüştürülmüş sheet ve satır sınırı bilgisi"""
+
+    def __init__(self, frame: pd.DataFrame, total_rows: int, sampled: bool = False):
+        self.frame = frame
+        self.total_rows = total_rows
+        self.sampled = sampled
+
+    @property
+    def truncated(self) -> bool:
+        return len(self.frame) < self.total_rows
+
+
+class WorkbookLoader:
+    """
+    Excel çalışma kitabını tek seferde açıp tüm sheet'leri okur.
+    .xlsx dosyaları openpyxl read-only modunda satır satır akıtılır; sheet başına satır sınırı
+    (ilk N satır ya da rezervuar örneklemi) ve sheet'lerin DataFrame'e paralel dönüşümü opsiyoneldir.
+    """
+
+    def __init__(self, row_limit: int = 0, limit_mode: str = 'head', sheet_workers: int = 1, seed: int = 0):
+        if limit_mode not in ('head', 'sample'):
+            raise ValueError(f"Unknown Excel row limit mode: {limit_mode}")
+        self.row_limit = row_limit
+        self.limit_mode = limit_mode
+        self.sheet_workers = max(1, sheet_workers)
+        self.seed = seed
+
+    def load(self, file_path: str) -> Dict[str, LoadedSheet]:
+        """sheet adı -> LoadedSheet; sheet sırası korunur"""
+        if os.path.splitext(file_path)[1].lower() == '.xls':
+            return self._load_legacy(file_path)
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        executor = ThreadPoolExecutor(max_workers=self.sheet_workers) if self.sheet_workers > 1 else None
+        try:
+            sheets = {}
+            for worksheet in workbook.worksheets:
+                sheet_rows = self._read_rows(worksheet)
+                # Sonraki sheet okunurken öncekinin DataFrame dönüşümü arka planda sürer
+                sheets[sheet_rows.name] = (
+                    executor.submit(self._convert, sheet_rows) if executor is not None else self._convert(sheet_rows)
+                )
+            if executor is not None:
+                sheets = {name: future.result() for name, future in sheets.items()}
+            return sheets
+        finally:
+            workbook.close()
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _load_legacy(self, file_path: str) -> Dict[str, LoadedSheet]:
+        """Eski .xls formatı: kitap bir kez açılır, sheet'ler aynı nesneden parse edilir"""
+        sheets = {}
+        with pd.ExcelFile(file_path) as excel_file:
+            for sheet_name in excel_file.sheet_names:
+                df = excel_file.parse(sheet_name)
+                total_rows = len(df)
+                sampled = False
+                if self.row_limit and total_rows > self.row_limit:
+                    if self.limit_mode == 'sample':
+                        df = df.sample(n=self.row_limit, random_state=self.seed).sort_index()
+                        sampled = True
+                    else:
+                        df = df.head(self.row_limit)
+                    df = df.reset_index(drop=True)
+                sheets[sheet_name] = LoadedSheet(df, total_rows, sampled)
+        return sheets
+
+    def _read_rows(self, worksheet) -> SheetRows:
+        rows_iter = worksheet.iter_rows(values_only=True)
+        header = next(rows_iter, None) or ()
+        if not self.row_limit:
+            rows = list(rows_iter)
+            total_rows = self._trim_trailing(rows)
+            return SheetRows(worksheet.title, header, rows, total_rows, sampled=False)
+        if self.limit_mode == 'sample':
+            return self._sample_rows(worksheet.title, header, rows_iter)
+        return self._head_rows(worksheet.title, header, rows_iter)
+
+    def _head_rows(self, name: str, header: Tuple, rows_iter) -> SheetRows:
+        rows = []
+        total_rows = 0
+        for index, row in enumerate(rows_iter, start=1):
+            if len(rows) < self.row_limit:
+                rows.append(row)
+            if not self._is_empty(row):
+                total_rows = index
+        # Sondaki boş satırlar veri sayılmaz
+        del rows[total_rows:]
+        return SheetRows(name, header, rows, total_rows, sampled=False)
+
+    def _sample_rows(self, name: str, header: Tuple, rows_iter) -> SheetRows:
+        reservoir = Reservoir(self.row_limit, self.seed)
+        slots: List[Optional[Tuple[int, Tuple]]] = []
+        batch: List[Tuple] = []
+        seen = 0
+        last_data_row = 0
+
+        def flush(batch_rows: List[Tuple], offset: int):
+            slot_ids, positions = reservoir.plan(len(batch_rows))
+            for slot, position in zip(slot_ids.tolist(), positions.tolist()):
+                if slot >= len(slots):
+                    slots.extend([None] * (slot + 1 - len(slots)))
+                slots[slot] = (offset + position, batch_rows[position])
+
+        for row in rows_iter:
+            batch.append(row)
+            seen += 1
+            if not self._is_empty(row):
+                last_data_row = seen
+            if len(batch) >= ROW_BATCH:
+                flush(batch, seen - len(batch))
+                batch = []
+        if batch:
+            flush(batch, seen - len(batch))
+
+        # Sondaki boş satırlar örneklemden çıkarılır, kalanlar dosya sırasına dizilir
+        kept = sorted(entry for entry in slots if entry is not None and entry[0] < last_data_row)
+        return SheetRows(name, header, [row for _, row in kept], last_data_row, sampled=last_data_row > self.row_limit)
+
+    @staticmethod
+    def _is_empty(row: Tuple) -> bool:
+        return all(value is None for value in row)
+
+    def _trim_trailing(self, rows: List[Tuple]) -> int:
+        while rows and self._is_empty(rows[-1]):
+            rows.pop()
+        return len(rows)
+
+    @staticmethod
+    def _column_names(header: Tuple, width: int) -> List[Any]:
+        """pd.read_excel ile aynı başlıklar: boşlar 'Unnamed: i', tekrarlar 'ad.1' olur"""
+        names = []
+        seen: Dict[Any, int] = {}
+        for index in range(width):
+            name = header[index] if index < len(header) else None
+            if name is None:
+                name = f"Unnamed: {index}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(name)
+        return names
+
+    def _convert(self, sheet_rows: SheetRows) -> LoadedSheet:
+        return LoadedSheet(self._to_frame(sheet_rows), sheet_rows.total_rows, sheet_rows.sampled)
+
+    def _to_frame(self, sheet_rows: SheetRows) -> pd.DataFrame:
+        header, rows = sheet_rows.header, sheet_rows.rows
+        # Sondaki tamamen boş sütunları at
+        width = 0
+        for row in [header] + rows:
+            for index in range(len(row) - 1, width - 1, -1):
+                if row[index] is not None:
+                    width = index + 1
+                    break
+        columns = self._column_names(header, width)
+        if not rows:
+            return pd.DataFrame(columns=columns)
+        frame = pd.DataFrame([row[:width] for row in rows], columns=columns)
+        # Boş hücreler read_excel'deki gibi NaN olsun (object sütunlarda None kalmasın)
+        for index, dtype in enumerate(frame.dtypes):
+            if dtype == object:
+                values = frame.iloc[:, index]
+                frame.isetitem(index, values.where(values.notna(), np.nan))
+        return frame
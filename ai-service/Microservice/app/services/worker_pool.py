@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturatedError(Exception):
+    """Havuzdaki çalışan + bekleyen iş sayısı sınırı aşıldı"""
+
+
+class WorkerPool:
+    """
+    CPU yoğun parse/analiz işlerini event loop dışında çalıştıran sınırlı havuz.
+    Aynı anda en fazla max_workers iş çalışır, queue_depth kadarı sırada bekler;
+    fazlası PoolSaturatedError ile reddedilir.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, use_processes: bool = False,
+                 process_initializer: Optional[Callable] = None):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-worker')
+        self._processes: Optional[ProcessPoolExecutor] = None
+        if use_processes:
+            self._processes = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=process_initializer
+            )
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {'completed': 0, 'failed': 0, 'rejected': 0}
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Fonksiyonu thread havuzunda çalıştır (event loop bloklanmaz)"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.queue_depth:
+                self._stats['rejected'] += 1
+                raise PoolSaturatedError(
+                    f"Worker pool is saturated ({self._pending} running/queued tasks)"
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            # İsteğe bağlı bağlam (ör. aşama ölçümleri) havuz thread'inde de görünsün
+            context = contextvars.copy_context()
+            result = await loop.run_in_executor(self._threads, partial(context.run, fn, *args, **kwargs))
+            with self._lock:
+                self._stats['completed'] += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def run_isolated(self, fn: Callable, *args) -> Any:
+        """
+        Havuz thread'i içinden çağrılır: süreç havuzu açıksa işi ayrı süreçte çalıştırıp bekler.
+        fn modül seviyesinde, argümanlar ve sonuç pickle edilebilir olmalı.
+        """
+        if self._processes is None:
+            return fn(*args)
+        return self._processes.submit(fn, *args).result()
+
+    def warm_up(self):
+        """Süreç havuzundaki çalışanları önceden başlat (ağır kütüphaneler ilk toplu işten önce yüklenir)"""
+        if self._processes is None:
+            return
+        for _ in range(self.max_workers):
+            self._processes.submit(os.getpid)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'pending': self._pending,
+                'max_workers': self.max_workers,
+                'queue_depth': self.queue_depth,
+                'process_pool': self._processes is not None,
+            })
+        return stats
+
+    def shutdown(self):
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_blocking(pool: Optional[WorkerPool], fn: Callable, *args, **kwargs) -> Any:
+    """Havuz verilmişse havuzda, verilmemişse doğrudan çalıştır"""
+    if pool is None:
+        return fn(*args, **kwargs)
+    return await pool.run(fn, *args, **kwargs)
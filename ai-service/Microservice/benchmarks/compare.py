@@ -0,0 +1,57 @@
+"""
+İki benchmark sonucunu karşılaştırır; eşiği aşan yavaşlama varsa 1 ile çıkar.
+
+    python -m benchmarks.compare base.json current.json --threshold 1.10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Any, List, Tuple
+
+
+def _load(path: str) -> Tuple[Dict[str, Any], Dict[Tuple[str, str], Dict[str, Any]]]:
+    with open(path, 'r', encoding='utf-8') as file:
+        report = json.load(file)
+    return report.get('meta', {}), {(row['case'], row['stage']): row for row in report['results']}
+
+
+def _ratio(new: float, old: float) -> float:
+    return new / old if old else float('inf') if new else 1.0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('base')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=1.10, help='Allowed slowdown ratio (median wall time)')
+    parser.add_argument('--min-seconds', type=float, default=0.005, help='Ignore stages faster than this in both runs')
+    args = parser.parse_args(argv)
+
+    base_meta, base = _load(args.base)
+    current_meta, current = _load(args.current)
+    print(f"base: {base_meta.get('commit')}  current: {current_meta.get('commit')}")
+    print(f"{'case':<24} {'stage':<24} {'base s':>9} {'curr s':>9} {'ratio':>7} {'rss MB':>15}")
+
+    regressions = []
+    for key in sorted(set(base) & set(current)):
+        old, new = base[key], current[key]
+        old_wall, new_wall = old['wall_s']['median'], new['wall_s']['median']
+        ratio = _ratio(new_wall, old_wall)
+        flag = ''
+        if ratio > args.threshold and max(old_wall, new_wall) >= args.min_seconds:
+            flag = '  SLOWER'
+            regressions.append(key)
+        print(f"{key[0]:<24} {key[1]:<24} {old_wall:>9.4f} {new_wall:>9.4f} {ratio:>7.2f} "
+              f"{old['peak_rss_mb']:>7.1f}>{new['peak_rss_mb']:<7.1f}{flag}")
+
+    for key in sorted(set(base) ^ set(current)):
+        print(f"{key[0]:<24} {key[1]:<24} only in {'base' if key in base else 'current'}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than {args.threshold:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import os
+
+import fitz
+import numpy as np
+import openpyxl
+import pandas as pd
+
+SEED = 42
+CHUNK_ROWS = 500000
+REGIONS = ['Marmara', 'Ege', 'Akdeniz', 'İç Anadolu', 'Karadeniz', 'Doğu Anadolu', 'Güneydoğu Anadolu']
+
+# Satır sayıları; wide şekiller metrik sütun sayısını artırır
+SIZES = {'small': 10_000, 'medium': 1_000_000, 'large': 10_000_000}
+SHAPES = {'narrow': 2, 'wide': 200}
+PDF_PAGES = {'small': 10, 'medium': 100, 'large': 400}
+FORMATS = ['csv', 'xlsx', 'json', 'pdf']
+MAX_CELLS = 250_000_000  # large + wide CSV/JSON onlarca GB olmasın
+XLSX_MAX_ROWS = 1_000_000  # Excel sheet sınırı 1.048.576 satır
+XLSX_MAX_CELLS = 20_000_000  # Geniş xlsx üretimi saatler sürmesin
+
+
+def _frame(rng: np.random.Generator, start: int, rows: int, metrics: int) -> pd.DataFrame:
+    """Tarih + bölge + metrik sütunlarından oluşan sentetik enerji verisi"""
+    index = np.arange(start, start + rows)
+    data = {
+        'tarih': pd.Timestamp('2020-01-01') + pd.to_timedelta(index, unit='h'),
+        'bolge': np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), rows)],
+        'uretim_mwh': np.round(100 + index * 0.0001 + rng.normal(0, 15, rows), 2),
+    }
+    for metric in range(1, metrics):
+        data[f"metrik_{metric}"] = np.round(rng.normal(50 * metric, 10, rows), 3)
+    frame = pd.DataFrame(data)
+    frame.loc[rng.random(rows) < 0.01, 'uretim_mwh'] = np.nan
+    return frame
+
+
+def _chunks(rows: int, metrics: int):
+    rng = np.random.default_rng(SEED)
+    for start in range(0, rows, CHUNK_ROWS):
+        yield _frame(rng, start, min(CHUNK_ROWS, rows - start), metrics)
+
+
+def make_csv(path: str, rows: int, metrics: int):
+    for index, chunk in enumerate(_chunks(rows, metrics)):
+        chunk.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+
+
+def make_xlsx(path: str, rows: int, metrics: int, sheets: int = 3):
+    """Aynı şemada birden çok sheet; toplam satır sheet'lere bölünür"""
+    workbook = openpyxl.Workbook(write_only=True)
+    per_sheet = max(1, rows // sheets)
+    for sheet_index in range(sheets):
+        worksheet = workbook.create_sheet(f"Sheet{sheet_index + 1}")
+        header_written = False
+        for chunk in _chunks(per_sheet, metrics):
+            if not header_written:
+                worksheet.append(chunk.columns.tolist())
+                header_written = True
+            chunk['tarih'] = chunk['tarih'].dt.to_pydatetime()
+            chunk = chunk.astype(object).where(chunk.notna(), None)  # Boş hücreler NaN değil boş yazılsın
+            for row in chunk.itertuples(index=False, name=None):
+                worksheet.append(row)
+    workbook.save(path)
+
+
+def make_json(path: str, rows: int, metrics: int):
+    """Kayıt listesi biçiminde JSON (parça parça yazılır)"""
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('[')
+        for index, chunk in enumerate(_chunks(rows, metrics)):
+            chunk['tarih'] = chunk['tarih'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            body = chunk.to_json(orient='records', force_ascii=False)[1:-1]
+            if body:
+                file.write((',' if index else '') + body)
+        file.write(']')
+
+
+def make_pdf(path: str, pages: int):
+    """Metin ağırlıklı rapor; her 10 sayfada bir çizgili tablo"""
+    rng = np.random.default_rng(SEED)
+    doc = fitz.open()
+    for page_index in range(pages):
+        page = doc.new_page()
+        for line in range(36):
+            value = rng.normal(100, 15)
+            page.insert_text(
+                (50, 50 + line * 18),
+                f"Bölge {REGIONS[line % len(REGIONS)]} üretimi {value:.1f} MWh, değişim %{value / 20:.1f}, gelir ₺{value * 1000:,.0f}"
+            )
+        if page_index % 10 == 0:
+            top = 720
+            for row in range(6):
+                page.draw_line((50, top + row * 14), (550, top + row * 14))
+            for column in range(5):
+                page.draw_line((50 + column * 125, top), (50 + column * 125, top + 70))
+            for row in range(5):
+                for column in range(4):
+                    page.insert_text((55 + column * 125, top + 11 + row * 14), f"{rng.integers(0, 1000)}", fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def dataset_rows(file_format: str, size: str, shape: str) -> int:
+    """Formata göre sınırlandırılmış satır sayısı (PDF için sayfa sayısı)"""
+    if file_format == 'pdf':
+        return PDF_PAGES[size]
+    columns = SHAPES[shape] + 2
+    rows = min(SIZES[size], MAX_CELLS // columns)
+    if file_format == 'xlsx':
+        rows = min(rows, XLSX_MAX_ROWS, XLSX_MAX_CELLS // columns)
+    return rows
+
+
+def dataset_path(data_dir: str, file_format: str, size: str, shape: str) -> str:
+    """Veri setini yoksa üretir ve yolunu döner (sonraki çalıştırmalar aynı dosyayı kullanır)"""
+    os.makedirs(data_dir, exist_ok=True)
+    if file_format == 'pdf':
+        path = os.path.join(data_dir, f"report_{size}.pdf")
+    else:
+        path = os.path.join(data_dir, f"{shape}_{size}.{file_format}")
+    if os.path.exists(path):
+        return path
+
+    tmp_path = f"{path}.tmp"
+    rows, metrics = dataset_rows(file_format, size, shape), SHAPES[shape]
+    if file_format == 'csv':
+        make_csv(tmp_path, rows, metrics)
+    elif file_format == 'xlsx':
+        make_xlsx(tmp_path, rows, metrics)
+    elif file_format == 'json':
+        make_json(tmp_path, rows, metrics)
+    elif file_format == 'pdf':
+        make_pdf(tmp_path, rows)
+    else:
+        raise ValueError(f"Unknown benchmark format: {file_format}")
+    os.replace(tmp_path, path)
+    return path
+
@@ -0,0 +1,251 @@
+"""
+ai-service analiz hattı için tekrarlanabilir benchmark.
+
+Kullanım (ai-service/Microservice dizininden):
+    python -m benchmarks.run --sizes small --formats csv,xlsx,json,pdf --output benchmarks/results/current.json
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/current.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Callable
+
+from benchmarks.generators import SIZES, SHAPES, FORMATS, dataset_path, dataset_rows
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.dirname(BENCHMARK_DIR)
+
+
+# --- ölçüm yardımcıları ---
+
+def _read_status_kb(field: str) -> int:
+    with open('/proc/self/status', 'r') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _reset_peak_rss() -> bool:
+    """Linux'ta VmHWM sıfırlanır; böylece her aşamanın kendi tepe RSS'i ölçülür"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _current_rss_mb() -> float:
+    try:
+        return _read_status_kb('VmRSS') / 1024
+    except (OSError, KeyError):
+        return float('nan')
+
+
+def _peak_rss_mb() -> float:
+    try:
+        return _read_status_kb('VmHWM') / 1024
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(fn: Callable[[], Any], repeat: int, trace_alloc: bool) -> Dict[str, Any]:
+    """Duvar saati (her tekrar), tepe RSS ve opsiyonel tracemalloc tepe tahsisi"""
+    runs = []
+    peak_rss = 0.0
+    rss_delta = 0.0
+    for _ in range(repeat):
+        before = _current_rss_mb()
+        _reset_peak_rss()
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+        peak = _peak_rss_mb()
+        peak_rss = max(peak_rss, peak)
+        rss_delta = max(rss_delta, peak - before)
+
+    result = {
+        'wall_s': {'min': min(runs), 'median': statistics.median(runs), 'runs': runs},
+        'peak_rss_mb': round(peak_rss, 1),
+        'rss_delta_mb': round(rss_delta, 1),
+    }
+    if trace_alloc:
+        # tracemalloc zamanlamayı bozduğu için ayrı bir çalıştırmada ölçülür
+        tracemalloc.start()
+        fn()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['alloc_peak_mb'] = round(traced_peak / (1024 * 1024), 1)
+    return result
+
+
+# --- tek bir vaka (ayrı süreçte çalışır) ---
+
+def run_case(case: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Bir dosya için parse, analiz aşamaları ve uç noktaları ölçer"""
+    logging.disable(logging.INFO)
+    sys.path.insert(0, SERVICE_DIR)
+
+    from app.services.file_processor import FileProcessor
+    from app.services.ai_analyzer import AIAnalyzer
+    from app.services.analysis_context import AnalysisContext
+
+    path, repeat, trace_alloc = case['path'], case['repeat'], case['trace_alloc']
+    results = []
+
+    def record(stage: str, fn: Callable[[], Any]):
+        measured = measure(fn, repeat, trace_alloc)
+        measured.update({'case': case['name'], 'stage': stage})
+        results.append(measured)
+
+    processor = FileProcessor()
+    record('process_file', lambda: processor.process_file(path))
+
+    file_data = processor.process_file(path)
+    if file_data is None:
+        raise RuntimeError(f"Benchmark file could not be processed: {path}")
+
+    analyzer = AIAnalyzer()
+    record('analysis_context', lambda: AnalysisContext(file_data))
+
+    # Aşamalar analyze_data ile aynı sırada, önceki aşamanın çıktısıyla çalışır
+    context = AnalysisContext(file_data)
+    basic = analyzer._perform_basic_analysis(file_data, context)
+    kpis = analyzer._extract_kpis(context, basic)
+    trends = analyzer._identify_trends(context, basic)
+
+    record('basic_analysis', lambda: analyzer._perform_basic_analysis(file_data, AnalysisContext(file_data)))
+    record('ai_summary', lambda: asyncio.run(analyzer._perform_ai_analysis(file_data, basic)))
+    record('extract_kpis', lambda: analyzer._extract_kpis(AnalysisContext(file_data), basic))
+    record('identify_trends', lambda: analyzer._identify_trends(AnalysisContext(file_data), basic))
+    record('action_items', lambda: asyncio.run(analyzer._generate_action_items(kpis, trends)))
+    record('analyze_data', lambda: asyncio.run(analyzer.analyze_data(file_data)))
+
+    if case['endpoints']:
+        _run_endpoints(case, record)
+    return results
+
+
+def _run_endpoints(case: Dict[str, Any], record: Callable):
+    from fastapi.testclient import TestClient
+    from app.main import app, parse_cache
+
+    body = {'file_path': case['path'], 'file_type': case['format']}
+
+    with TestClient(app) as client:
+        def post(url: str, payload: Dict[str, Any]):
+            response = client.post(url, json=payload)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}: {response.text[:200]}")
+            return response
+
+        def cold_analyze():
+            parse_cache.clear()
+            post('/analyze', {**body, 'force': True})
+
+        record('endpoint_analyze_cold', cold_analyze)
+        record('endpoint_analyze_cached', lambda: post('/analyze', body))
+        # Cevap önbelleği ilk çağrıdan sonra dolar; soğuk ölçüm her seferinde yeniden cevaplar
+        question = {'file_path': case['path'], 'question': 'Ana bulgular neler?'}
+        record('endpoint_ask_cold', lambda: post('/ask', {**question, 'force': True}))
+        record('endpoint_ask_cached', lambda: post('/ask', question))
+
+
+# --- komut satırı ---
+
+def _metadata() -> Dict[str, Any]:
+    sys.path.insert(0, SERVICE_DIR)
+    import fitz
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'pymupdf': fitz.version[0],
+    }
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the ai-service analysis pipeline')
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--sizes', default='small', help=f"Comma separated: {', '.join(SIZES)}")
+    parser.add_argument('--shapes', default=','.join(SHAPES), help=f"Comma separated: {', '.join(SHAPES)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--trace-alloc', action='store_true', help='Also measure peak Python allocations (tracemalloc)')
+    parser.add_argument('--no-endpoints', action='store_true', help='Skip FastAPI endpoint measurements')
+    parser.add_argument('--data-dir', default=os.path.join(BENCHMARK_DIR, 'data'))
+    parser.add_argument('--output', default=None, help='JSON result file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    cases = []
+    for file_format in _split(args.formats):
+        for size in _split(args.sizes):
+            # PDF'in şekli yok, yalnızca sayfa sayısı değişir
+            for shape in (['narrow'] if file_format == 'pdf' else _split(args.shapes)):
+                name = f"{file_format}/{size}" if file_format == 'pdf' else f"{file_format}/{size}/{shape}"
+                print(f"[benchmark] preparing {name}", file=sys.stderr)
+                cases.append({
+                    'name': name,
+                    'format': file_format,
+                    'rows': dataset_rows(file_format, size, shape),
+                    'path': dataset_path(args.data_dir, file_format, size, shape),
+                    'repeat': args.repeat,
+                    'trace_alloc': args.trace_alloc,
+                    'endpoints': not args.no_endpoints,
+                })
+
+    results = []
+    for case in cases:
+        print(f"[benchmark] running {case['name']}", file=sys.stderr)
+        # Her vaka temiz bir süreçte: önbellekler ve bellek tepe değerleri birbirini etkilemez
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            case_results = executor.submit(run_case, case).result()
+        for result in case_results:
+            result.update({'rows': case['rows'], 'file_bytes': os.path.getsize(case['path'])})
+        results.extend(case_results)
+
+    report = {'meta': _metadata(), 'results': results}
+    encoded = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(encoded)
+        print(f"[benchmark] results written to {args.output}", file=sys.stderr)
+    else:
+        print(encoded)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
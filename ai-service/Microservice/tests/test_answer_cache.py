@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.answer_cache import AnswerCache, normalize_question, question_directions
+
+SCOPE = 'rapor'
+
+
+@pytest.fixture
+def fuzzy_cache():
+    return AnswerCache(100, 3600, 0.85, 'v')
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ("Which region has the highest consumption?", "Which region has the lowest consumption?"),
+    ("Elektrik tüketiminin en yüksek olduğu ay hangisi?", "Elektrik tüketiminin en düşük olduğu ay hangisi?"),
+    ("What is the max production per plant?", "What is the min production per plant?"),
+    ("Üretimde artış olan bölgeler hangileri?", "Üretimde azalış olan bölgeler hangileri?"),
+    ("Which months show an increase in sales?", "Which months show a decrease in sales?"),
+    ("Hangi santral hedefe ulaştı?", "Hangi santral hedefe ulaşmadı değil mi?"),
+    ("2023 satışları ne kadar?", "2024 satışları ne kadar?"),
+])
+def test_fuzzy_match_rejects_opposite_questions(fuzzy_cache, cached, asked):
+    fuzzy_cache.put(SCOPE, cached, 'cevap')
+    assert fuzzy_cache.get(SCOPE, asked) is None
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ("Which region has the highest consumption?", "which region has highest consumption"),
+    ("Elektrik tüketiminin en yüksek olduğu ay hangisi?", "Elektrik tüketiminin en yüksek olduğu ay hangisidir?"),
+])
+def test_fuzzy_match_accepts_rephrasings(fuzzy_cache, cached, asked):
+    fuzzy_cache.put(SCOPE, cached, 'cevap')
+    assert fuzzy_cache.get(SCOPE, asked) == 'cevap'
+
+
+def test_exact_only_by_default_threshold():
+    cache = AnswerCache(100, 3600, 1.0, 'v')
+    cache.put(SCOPE, "Toplam üretim nedir?", 'cevap')
+    assert cache.get(SCOPE, "toplam üretim ne?") == 'cevap'  # normalize edilmiş birebir eşleşme
+    assert cache.get(SCOPE, "toplam üretimi") is None
+
+
+def test_question_directions():
+    assert question_directions(normalize_question("En düşük değer?")) == {'min'}
+    assert question_directions(normalize_question("Düşüş gösteren metrikler")) == {'down'}
+    assert question_directions(normalize_question("Yükselen ve en yüksek metrikler")) == {'up', 'max'}
+    assert question_directions(normalize_question("Toplam üretim")) == frozenset()
@@ -0,0 +1,99 @@
+import pytest
+
+from app.services import csv_checkpoint
+from app.services.csv_checkpoint import CsvCheckpointStore, GUARD_BYTES
+from tests.test_streaming_stats import ROWS, _analyze, _frame, _kpis, _streaming_processor
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'uretim.csv'
+    _frame(0, ROWS).to_csv(path, index=False)
+    return str(path)
+
+
+def _incremental_processor(tmp_path):
+    processor = _streaming_processor()
+    processor.checkpoint_store = CsvCheckpointStore(str(tmp_path / 'checkpoints'))
+    processor.incremental_min_bytes = 0
+    return processor
+
+
+def _load(store: CsvCheckpointStore, path: str, sample_rows: int = 100):
+    with open(path, 'rb') as file:
+        size = file.seek(0, 2)
+        return store.load(path, file, size, sample_rows)
+
+
+def _checkpointed(tmp_path, csv_path) -> CsvCheckpointStore:
+    """Dosyanın tamamı için kontrol noktası (biriktirici yerine yer tutucu)"""
+    store = CsvCheckpointStore(str(tmp_path / 'checkpoints'))
+    with open(csv_path, 'rb') as file:
+        store.save(csv_path, file, file.seek(0, 2), 100, None)
+    return store
+
+
+def _overwrite(path: str, position: int, data: bytes):
+    with open(path, 'r+b') as file:
+        file.seek(position)
+        file.write(data)
+
+
+def test_incremental_run_after_append_matches_full_pass(tmp_path, csv_path):
+    incremental = _incremental_processor(tmp_path)
+    _analyze(incremental, csv_path)
+    assert incremental.checkpoint_store.stats()['checkpoints'] == 1
+
+    _frame(ROWS, 500).to_csv(csv_path, mode='a', header=False, index=False)
+    # Kontrol noktası pickle'dan okunup yalnızca eklenen satırlarla birleştirilir
+    resumed = _analyze(incremental, csv_path)
+    full = _analyze(_streaming_processor(), csv_path)
+
+    assert _kpis(resumed) == _kpis(full)
+    assert resumed['trends'] == full['trends']
+
+
+def test_checkpoint_kept_after_append(tmp_path, csv_path):
+    store = _checkpointed(tmp_path, csv_path)
+    _frame(ROWS, 10).to_csv(csv_path, mode='a', header=False, index=False)
+    assert _load(store, csv_path) is not None
+
+
+def test_checkpoint_discarded_when_file_shrank(tmp_path, csv_path):
+    store = _checkpointed(tmp_path, csv_path)
+    with open(csv_path, 'r+b') as file:
+        file.truncate(file.seek(0, 2) - 100)
+    assert _load(store, csv_path) is None
+
+
+def test_checkpoint_discarded_when_head_changed(tmp_path, csv_path):
+    store = _checkpointed(tmp_path, csv_path)
+    _overwrite(csv_path, 0, b'#')
+    assert _load(store, csv_path) is None
+
+
+def test_checkpoint_discarded_when_tail_changed(tmp_path, csv_path):
+    store = _checkpointed(tmp_path, csv_path)
+    with open(csv_path, 'rb') as file:
+        size = file.seek(0, 2)
+    assert size > 2 * GUARD_BYTES
+    _overwrite(csv_path, size - 10, b'#')
+    assert _load(store, csv_path) is None
+
+
+def test_checkpoint_discarded_on_version_or_sample_mismatch(tmp_path, csv_path, monkeypatch):
+    store = _checkpointed(tmp_path, csv_path)
+    assert _load(store, csv_path, sample_rows=200) is None
+    monkeypatch.setattr(csv_checkpoint, 'CHECKPOINT_VERSION', csv_checkpoint.CHECKPOINT_VERSION + '-next')
+    assert _load(store, csv_path) is None
+
+
+def test_changed_rows_reprocessed_from_start(tmp_path, csv_path):
+    incremental = _incremental_processor(tmp_path)
+    _analyze(incremental, csv_path)
+
+    # İşlenmiş son satırlar değişir ve dosya büyür: sonuç baştan tam geçişle aynı olmalı
+    _frame(ROWS - 50, 550).to_csv(csv_path, index=False)
+    rewritten = _analyze(incremental, csv_path)
+    full = _analyze(_streaming_processor(), csv_path)
+    assert _kpis(rewritten) == _kpis(full)
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app.services.json_records import iter_json_values, iter_records
+
+RECORDS = [{'id': i, 'user': {'name': f"u{i}"}, 'tags': ['a', 'b'][:i % 3]} for i in range(50)]
+
+
+def _write(tmp_path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('block_chars', [1, 7, 64, 1 << 20])
+def test_array_and_ndjson_values_across_block_boundaries(tmp_path, block_chars):
+    array = _write(tmp_path, 'a.json', '﻿ ' + json.dumps(RECORDS + [12345, 'x']))
+    ndjson = _write(tmp_path, 'a.ndjson', '\n'.join(json.dumps(record) for record in RECORDS) + '\n\n123')
+
+    assert list(iter_json_values(array, block_chars)) == RECORDS + [12345, 'x']
+    assert list(iter_json_values(ndjson, block_chars)) == RECORDS + [123]
+
+
+@pytest.mark.parametrize('block_chars', [1, 7, 64, 1 << 20])
+def test_wrapped_records_are_streamed_from_the_record_array(tmp_path, block_chars):
+    # Bloktan büyük sarmalayıcı alan alan, küçüğü tek seferde okunur; sonuç aynı olmalı
+    wrapped = {'meta': {'source': 'api', 'count': 50}, 'labels': ['x', 'y'], 'data': RECORDS + [7], 'next': None}
+    path = _write(tmp_path, 'w.json', json.dumps(wrapped))
+
+    assert list(iter_records(path, block_chars)) == RECORDS + [{'value': 7}]
+
+
+@pytest.mark.parametrize('block_chars', [1, 1 << 20])
+def test_object_without_record_array_is_a_single_record(tmp_path, block_chars):
+    document = {'total': 3, 'labels': ['x', 'y'], 'empty': []}
+    path = _write(tmp_path, 'o.json', json.dumps(document))
+
+    assert list(iter_records(path, block_chars)) == [document]
+
+
+def test_ndjson_with_nested_record_lists_is_not_unwrapped(tmp_path):
+    lines = [{'order': i, 'items': [{'sku': 'a'}, {'sku': 'b'}]} for i in range(3)]
+    path = _write(tmp_path, 'o.ndjson', '\n'.join(json.dumps(line) for line in lines))
+
+    assert list(iter_records(path)) == lines
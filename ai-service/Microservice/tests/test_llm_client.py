@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.llm_client import LLMClient, LLMUnavailableError
+
+
+def _client(**kwargs) -> LLMClient:
+    client = LLMClient(api_key='', **kwargs)
+    client.enabled = True
+    return client
+
+
+def _rate_limited(retry_after: str) -> RateLimitError:
+    request = httpx.Request('POST', 'https://api.example/v1/chat/completions')
+    response = httpx.Response(429, headers={'retry-after': retry_after}, request=request)
+    return RateLimitError('rate limited', response=response, body=None)
+
+
+def test_retry_after_is_honoured_up_to_backoff_max():
+    client = _client(backoff_base_seconds=0.01, backoff_max_seconds=5.0)
+    assert client._backoff(0, _rate_limited('3')) == 3.0
+    with pytest.raises(LLMUnavailableError):
+        client._backoff(0, _rate_limited('120'))
+    assert client._backoff(0, _rate_limited('soon')) <= 0.01
+
+
+def test_queue_timeout_returns_rate_token():
+    client = _client(max_concurrency=1, burst=3, acquire_timeout_seconds=0.05)
+
+    async def scenario():
+        semaphore = client._get_semaphore()
+        await client._acquire(semaphore)
+        before = client.bucket.available()
+        with pytest.raises(LLMUnavailableError):
+            await client._acquire(semaphore)
+        return before, client.bucket.available()
+
+    before, after = asyncio.run(scenario())
+    assert after >= before
+
+
+class _FakeStream:
+    def __init__(self, parts):
+        self.parts = parts
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for part in self.parts:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+
+    async def close(self):
+        self.closed = True
+
+
+def test_stream_closed_when_consumer_stops_early():
+    stream = _FakeStream(['a', 'b', 'c'])
+    client = _client()
+
+    async def create(**kwargs):
+        return stream
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def scenario():
+        chunks = client.stream([{'role': 'user', 'content': 'x'}])
+        first = await chunks.__anext__()
+        await chunks.aclose()
+        return first
+
+    assert asyncio.run(scenario()) == 'a'
+    assert stream.closed and client.stats()['in_flight'] == 0
+
+
+def _completion_client(calls):
+    client = _client()
+
+    async def create(**kwargs):
+        calls.append(kwargs['messages'])
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=' cevap '))])
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client
+
+
+def test_identical_concurrent_prompts_share_one_request():
+    calls = []
+    client = _completion_client(calls)
+    same = [{'role': 'user', 'content': 'özet'}]
+    other = [{'role': 'user', 'content': 'eylemler'}]
+
+    async def scenario():
+        return await asyncio.gather(client.complete(same), client.complete(list(same)), client.complete(other))
+
+    assert asyncio.run(scenario()) == ['cevap', 'cevap', 'cevap']
+    assert len(calls) == 2 and client.stats()['shared_requests'] == 0
+
+
+def test_shared_request_cancelled_when_last_waiter_leaves():
+    calls = []
+    client = _completion_client(calls)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(client.complete([{'role': 'user', 'content': 'x'}]))
+        await asyncio.sleep(0.01)
+        shared = next(iter(client._shared.values())).task
+        waiter.cancel()
+        await asyncio.wait([shared], timeout=1)
+        return shared.cancelled()
+
+    assert asyncio.run(scenario())
+    assert client.stats()['in_flight'] == 0
@@ -0,0 +1,21 @@
+from app.services import parse_cache
+from app.services.parse_cache import ParseCache
+
+
+def test_format_version_invalidates_memory_and_disk_entries(tmp_path, monkeypatch):
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b\n1,2\n')
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {'file_type': 'csv', 'rows': 1}
+
+    ParseCache(1 << 20, str(tmp_path / 'cache')).get_or_load(str(path), loader)
+    cache = ParseCache(1 << 20, str(tmp_path / 'cache'))
+    assert cache.get_or_load(str(path), loader) == {'file_type': 'csv', 'rows': 1}
+    assert len(loads) == 1 and cache.stats()['disk_hits'] == 1
+
+    monkeypatch.setattr(parse_cache, 'PARSE_FORMAT_VERSION', parse_cache.PARSE_FORMAT_VERSION + 1)
+    cache.get_or_load(str(path), loader)
+    assert len(loads) == 2 and cache.stats()['misses'] == 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from app.services.analysis_context import SampledSheet
+from app.services.csv_sampler import sample_csv
+
+
+def _autoregressive_csv(path, rows: int, phi: float = 0.995) -> np.ndarray:
+    """Güçlü otokorelasyonlu seri: ardışık satırlar birbirine çok benzer"""
+    noise = np.random.default_rng(7).normal(size=rows)
+    values = np.empty(rows)
+    values[0] = noise[0]
+    for index in range(1, rows):
+        values[index] = phi * values[index - 1] + noise[index]
+    pd.DataFrame({'deger': values}).to_csv(path, index=False)
+    return values
+
+
+def _coverage(path, values: np.ndarray, clustered: bool, trials: int = 40) -> float:
+    hits = 0
+    for seed in range(trials):
+        df, sampling = sample_csv(str(path), 1_500, cluster_rows=32, seed=seed)
+        sheet = SampledSheet('main', df, sampling['estimated_total_rows'],
+                             sampling['cluster_sizes'] if clustered else None)
+        low, high = sheet.mean_interval('deger')
+        hits += low <= values.mean() <= high
+    return hits / trials
+
+
+def test_cluster_intervals_cover_autocorrelated_mean(tmp_path):
+    path = tmp_path / 'ar.csv'
+    values = _autoregressive_csv(path, 100_000)
+    # Kümeler basit rastgele örneklem sayılırsa aralık çok dar kalır
+    assert _coverage(path, values, clustered=False) < 0.6
+    assert _coverage(path, values, clustered=True) >= 0.85
+
+
+def test_cluster_sizes_match_sample_rows(tmp_path):
+    path = tmp_path / 'blank.csv'
+    lines = ['a,b'] + [f"{i},{i % 7}" if i % 50 else '' for i in range(20_000)]
+    path.write_text('\n'.join(lines) + '\n')
+    df, sampling = sample_csv(str(path), 640, cluster_rows=32)
+    assert sampling['method'] == 'stratified'
+    assert sum(sampling['cluster_sizes']) == len(df)
+    assert len(sampling['cluster_sizes']) == sampling['strata']
+
+
+def test_unclustered_interval_matches_simple_random_sample():
+    values = np.random.default_rng(3).normal(10, 2, 500)
+    sheet = SampledSheet('main', pd.DataFrame({'deger': values}), 50_000)
+    low, high = sheet.mean_interval('deger')
+    correction = np.sqrt((50_000 - 500) / (50_000 - 1))
+    margin = 1.96 * values.std(ddof=1) / np.sqrt(500) * correction
+    assert np.isclose(high - low, 2 * margin)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.ai_analyzer import AIAnalyzer
+from app.services.file_processor import FileProcessor
+from app.services.sketches import HyperLogLog, _leading_zeros
+from app.services.streaming_stats import CategoricalStats
+
+ROWS = 20_000
+CHUNK_ROWS = 3_000
+
+
+def _frame(start: int, rows: int) -> pd.DataFrame:
+    """Saatlik tarih + bölge + üretim; üretimde eksik değerler, kayit_no her satırda farklı"""
+    rng = np.random.default_rng(start)
+    index = np.arange(start, start + rows)
+    production = np.round(100 + index * 0.001 + rng.normal(0, 15, rows), 2)
+    production[rng.random(rows) < 0.01] = np.nan
+    return pd.DataFrame({
+        'tarih': (pd.Timestamp('2020-01-01') + pd.to_timedelta(index, unit='h')).strftime('%Y-%m-%d %H:%M'),
+        'bolge': rng.choice(['Marmara', 'Ege', 'Akdeniz'], rows),
+        'kayit_no': [f"K{i:07d}" for i in index],
+        'uretim_mwh': production,
+    })
+
+
+def _analyze(processor: FileProcessor, path: str):
+    return asyncio.run(AIAnalyzer().analyze_data(processor.process_file(path)))
+
+
+def _kpis(result) -> dict:
+    return {kpi['name']: kpi['value'] for kpi in result['kpis']}
+
+
+def _streaming_processor() -> FileProcessor:
+    return FileProcessor(stream_threshold_bytes=1, chunk_rows=CHUNK_ROWS)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'uretim.csv'
+    _frame(0, ROWS).to_csv(path, index=False)
+    return str(path)
+
+
+def test_streamed_kpis_match_in_memory(csv_path):
+    exact = _kpis(_analyze(FileProcessor(stream_threshold_bytes=10 ** 12), csv_path))
+    streamed = _kpis(_analyze(_streaming_processor(), csv_path))
+
+    assert streamed.keys() == exact.keys()
+    for name, value in exact.items():
+        if name.endswith('Çeşit Sayısı'):
+            # Misra-Gries taşınca HyperLogLog tahmini kullanılır; satır sayısını aşmaz
+            assert value * 0.95 <= streamed[name] <= ROWS, name
+        else:
+            assert streamed[name] == pytest.approx(value, rel=1e-9), name
+    assert streamed['Bolge Çeşit Sayısı'] == 3
+
+
+def test_leading_zeros_matches_bit_length():
+    values = [1, 3, 2 ** 40 - 1, 2 ** 53 - 1, 2 ** 53 + 1, 2 ** 63 - 1, 2 ** 63, 2 ** 64 - 1]
+    expected = [64 - value.bit_length() for value in values]
+    assert _leading_zeros(np.array(values, dtype='uint64')).tolist() == expected
+
+
+def test_hyperloglog_estimate_and_merge():
+    left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(np.arange(0, 60_000))
+    right.update(np.arange(40_000, 100_000))
+    both.update(np.arange(0, 100_000))
+    left.merge(right)
+
+    np.testing.assert_array_equal(left.registers, both.registers)
+    assert both.estimate() == pytest.approx(100_000, rel=0.05)
+
+
+def test_categorical_distinct_is_exact_until_overflow_and_capped_after():
+    small = CategoricalStats(top_k_capacity=8)
+    small.update(pd.Series(['a', 'b', 'a', None, 'c']))
+    summary = small.summary()
+    assert (summary['distinct'], summary['distinct_exact'], summary['nulls']) == (3, True, 1)
+    assert summary['top_values'][0] == ['a', 2]
+
+    unique = CategoricalStats(top_k_capacity=8)
+    for start in range(0, 50_000, 5_000):
+        unique.update(pd.Series([f"v{i}" for i in range(start, start + 5_000)]))
+    summary = unique.summary()
+    assert not summary['distinct_exact']
+    assert summary['distinct'] <= unique.count
+    assert summary['distinct'] == pytest.approx(50_000, rel=0.05)
+
+
+def test_streamed_json_keeps_fields_first_seen_after_first_batch(tmp_path):
+    path = tmp_path / 'log.ndjson'
+    rng = np.random.default_rng(7)
+    late_rows = set(range(ROWS // 2, ROWS, 3))
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(ROWS):
+            record = {'latency_ms': round(float(rng.gamma(2, 30)), 2), 'method': str(rng.choice(['GET', 'POST']))}
+            if i in late_rows:
+                record['retry_count'] = int(rng.integers(0, 5))
+            file.write(json.dumps(record) + '\n')
+
+    exact = _kpis(_analyze(FileProcessor(stream_threshold_bytes=10 ** 12), str(path)))
+    streamed_data = _streaming_processor().process_file(str(path))
+    streamed = _kpis(asyncio.run(AIAnalyzer().analyze_data(streamed_data)))
+
+    assert 'retry_count' in streamed_data['columns']
+    assert streamed_data['stream_stats']['null_counts']['retry_count'] == ROWS - len(late_rows)
+    assert streamed == pytest.approx(exact, rel=1e-9)